@@ -0,0 +1,5 @@
+# Cog 간 로딩 순서 의존성입니다. {확장 이름: [먼저 로드되어야 하는 확장 이름, ...]}
+# setup()이나 cog_load에서 다른 Cog의 객체나 상태를 직접 사용하는 경우에만 적습니다.
+# (실행 중에 dispatch되는 이벤트는 로딩 순서와 관계가 없으므로 적지 않습니다)
+# 여기에 없는 Cog들은 서로 독립적인 것으로 보고 동시에 로드합니다.
+COG_DEPENDENCIES = {}
@@ -1,42 +1,102 @@
+import asyncio
+
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import re
+from typing import Dict, List, Tuple
+
 from core.overwatch_bot import OverwatchBot
+from core.job_scheduler import Interval
+from core.metrics import metrics
+from core.utiles import NumberAllocator
+from core.local.repository.auto_vc_repository import AutoVcGenerator
 
 class AutoVcCog(commands.Cog):
+    CLEANUP_CONCURRENCY = 5  # 정리 시 동시에 보낼 REST 요청 수 (라우트별 rate limit은 discord.py가 처리합니다)
+
     def __init__(self, bot: OverwatchBot):
         self.bot = bot
         self.managed_channels = set() # 메모리에 자동 생성된 채널 ID를 캐싱
+        self.generators: Dict[int, AutoVcGenerator] = {} # 생성기 채널 설정 캐시 {generator_channel_id: AutoVcGenerator}
+        self.allocators: Dict[int, NumberAllocator] = {} # 생성기별 채널 번호 할당기 {generator_channel_id: NumberAllocator}
+        self.numbered_channels: Dict[int, Dict[int, int]] = {} # {generator_channel_id: {번호: channel_id}}
+        self.channel_numbers: Dict[int, Tuple[int, int]] = {} # {channel_id: (generator_channel_id, 번호)}
+        self._creation_locks: Dict[int, asyncio.Lock] = {}
 
     async def cog_load(self):
         """Cog가 로드될 때 (봇 시작 시) 데이터베이스에서 상태를 복원합니다."""
         all_managed_ids = await self.bot.db.auto_vc.get_all_managed_channels()
         self.managed_channels = set(all_managed_ids)
         print(f"[AutoVC] {len(self.managed_channels)}개의 관리 채널 정보를 DB에서 복원했습니다.")
-        self.cleanup_check.start()
+        generators = await self.bot.db.auto_vc.get_all_generators(self.bot.guild_id)
+        self.generators = {g.generator_channel_id: g for g in generators}
+        print(f"[AutoVC] {len(self.generators)}개의 생성기 설정을 DB에서 불러왔습니다.")
+        await self.bot.scheduler.register("auto_vc_cleanup", Interval(minutes=10), self.cleanup_check)
 
     def cog_unload(self):
-        """Cog가 언로드될 때 (봇 종료 또는 리로드 시) 루프를 중지합니다."""
-        self.cleanup_check.cancel()
+        """Cog가 언로드될 때 (봇 종료 또는 리로드 시) 주기 작업을 해제합니다."""
+        self.bot.scheduler.unregister("auto_vc_cleanup")
 
-    @tasks.loop(minutes=10)
     async def cleanup_check(self):
-        """주기적으로 DB와 실제 채널 상태를 동기화합니다."""
-        if not self.bot.is_ready():
-            await self.bot.wait_until_ready()
+        """
+        주기적으로 DB와 실제 채널 상태를 동기화합니다.
+        채널과 접속 멤버는 게이트웨이 캐시에서 확인하고, 캐시에 없는 채널만 REST로 조회합니다.
+        """
+        semaphore = asyncio.Semaphore(self.CLEANUP_CONCURRENCY)
+        channels: List[discord.abc.GuildChannel] = []
+        missing_ids: List[int] = []
+        for channel_id in list(self.managed_channels):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                missing_ids.append(channel_id)
+            else:
+                channels.append(channel)
+        metrics.inc("cache", "channels:hit", len(channels))
+        metrics.inc("cache", "channels:miss", len(missing_ids))
+
+        stale_ids: List[int] = []
+        if missing_ids:
+            fetched = await asyncio.gather(*(self._fetch_channel(channel_id, semaphore) for channel_id in missing_ids))
+            for channel_id, channel in zip(missing_ids, fetched):
+                if channel is None:
+                    stale_ids.append(channel_id)
+                elif channel is not False:
+                    channels.append(channel)
+
+        empty_channels = [
+            ch for ch in channels
+            if isinstance(ch, discord.VoiceChannel) and not any(m for m in ch.members if not m.bot)
+        ]
+        deleted = await asyncio.gather(*(self._delete_channel(ch, semaphore) for ch in empty_channels))
+        stale_ids.extend(ch.id for ch, ok in zip(empty_channels, deleted) if ok)
+
+        if stale_ids:
+            await self.remove_channels_from_db(stale_ids)
+            print(f"[AutoVC Cleanup] {len(stale_ids)}개의 자동 생성 채널을 정리했습니다.")
+
+    async def _fetch_channel(self, channel_id: int, semaphore: asyncio.Semaphore):
+        """채널을 REST로 조회합니다. 삭제된 채널이면 None, 조회에 실패하면 False를 반환합니다."""
+        async with semaphore:
+            try:
+                return await self.bot.fetch_channel(channel_id)
+            except discord.NotFound:
+                return None
+            except Exception as e:
+                print(f"[AutoVC Cleanup] 채널 조회 중 오류 발생 (ID: {channel_id}): {e}")
+                return False
 
-        all_managed_ids = list(self.managed_channels)
-        for channel_id in all_managed_ids:
+    async def _delete_channel(self, channel: discord.VoiceChannel, semaphore: asyncio.Semaphore) -> bool:
+        """채널을 삭제하고, DB에서도 지워야 하는지 여부를 반환합니다."""
+        async with semaphore:
             try:
-                channel = await self.bot.fetch_channel(channel_id)
-                if isinstance(channel, discord.VoiceChannel) and not any(m for m in channel.members if not m.bot):
-                    await channel.delete(reason="주기적인 자동 생성 채널 정리")
-                    await self.remove_channel_from_db(channel.id)
+                await channel.delete(reason="주기적인 자동 생성 채널 정리")
+                return True
             except discord.NotFound:
-                await self.remove_channel_from_db(channel_id)
+                return True
             except Exception as e:
-                print(f"[AutoVC Cleanup] 채널 정리 중 오류 발생 (ID: {channel_id}): {e}")
+                print(f"[AutoVC Cleanup] 채널 정리 중 오류 발생 (ID: {channel.id}): {e}")
+                return False
 
     auto_vc_commands = app_commands.Group(name="자동통화방", description="자동 생성 통화방과 관련된 명령어입니다.",
                                     default_permissions=discord.Permissions(administrator=True))
@@ -45,21 +105,68 @@ class AutoVcCog(commands.Cog):
     @app_commands.rename(generator_channel="생성기채널", category="생성될카테고리", base_name="채널이름")
     async def setup_auto_vc(self, interaction: discord.Interaction, generator_channel: discord.VoiceChannel, category: discord.CategoryChannel, base_name: str):
         await self.bot.db.auto_vc.add_generator(generator_channel.id, category.id, base_name, interaction.guild.id)
+        self.generators[generator_channel.id] = AutoVcGenerator(generator_channel.id, category.id, base_name, interaction.guild.id)
         await interaction.response.send_message(f"자동 통화방이 설정되었습니다: {generator_channel.mention}에 접속하면 -> {category.name}에 `{base_name} N` 채널이 생성됩니다.", ephemeral=True)
 
     @auto_vc_commands.command(name="삭제", description="자동 생성 통화방 설정을 삭제합니다.")
     @app_commands.rename(generator_channel="설정된_생성기채널")
     async def remove_auto_vc(self, interaction: discord.Interaction, generator_channel: discord.VoiceChannel):
         await self.bot.db.auto_vc.remove_generator(generator_channel.id)
+        self.generators.pop(generator_channel.id, None)
+        self.allocators.pop(generator_channel.id, None)
+        self.numbered_channels.pop(generator_channel.id, None)
         await interaction.response.send_message(f"자동 통화방 설정이 삭제되었습니다: {generator_channel.mention}", ephemeral=True)
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 게이트웨이 캐시가 준비되면 기존 자동 생성 채널로 생성기별 번호 할당기를 구성합니다.
+        guild = self.bot.get_guild(self.bot.guild_id)
+        if not guild:
+            return
+        for generator in self.generators.values():
+            if generator.generator_channel_id not in self.allocators:
+                self._build_allocator(guild, generator)
+        print(f"[AutoVC] {len(self.allocators)}개 생성기의 채널 번호 정보를 구성했습니다.")
+
+    def _build_allocator(self, guild: discord.Guild, generator: AutoVcGenerator) -> NumberAllocator:
+        """카테고리의 관리 채널 이름에서 번호를 읽어 할당기를 다시 구성합니다."""
+        numbered: Dict[int, int] = {}
+        category = guild.get_channel(generator.category_id)
+        if isinstance(category, discord.CategoryChannel):
+            for ch in category.voice_channels:
+                if ch.id in self.managed_channels and ch.name.startswith(generator.base_name):
+                    match = re.search(r'(\d+)$', ch.name)
+                    if match:
+                        numbered.setdefault(int(match.group(1)), ch.id)
+
+        for number, channel_id in numbered.items():
+            self.channel_numbers[channel_id] = (generator.generator_channel_id, number)
+        self.numbered_channels[generator.generator_channel_id] = numbered
+        allocator = NumberAllocator(numbered.keys())
+        self.allocators[generator.generator_channel_id] = allocator
+        return allocator
+
+    def _release_number(self, channel_id: int):
+        entry = self.channel_numbers.pop(channel_id, None)
+        if entry is None:
+            return
+        generator_id, number = entry
+        numbered = self.numbered_channels.get(generator_id)
+        if numbered is not None and numbered.get(number) == channel_id:
+            del numbered[number]
+            self.allocators[generator_id].release(number)
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        # 음소거, 화면 공유 등 채널 이동이 없는 상태 변경은 무시합니다.
+        if before.channel == after.channel:
+            return
+
         if member.guild is None or member.guild.id != self.bot.guild_id:
             return
 
         if after.channel:
-            generator = await self.bot.db.auto_vc.get_generator(after.channel.id)
+            generator = self.generators.get(after.channel.id)
             if generator:
                 await self._create_and_move_user(member, generator)
 
@@ -73,54 +180,53 @@ class AutoVcCog(commands.Cog):
                 except Exception as e:
                     print(f"[AutoVC] 채널 삭제 중 오류 발생: {e}")
 
-    async def _create_and_move_user(self, member: discord.Member, generator_config):
+    async def _create_and_move_user(self, member: discord.Member, generator_config: AutoVcGenerator):
         guild = member.guild
         category = guild.get_channel(generator_config.category_id)
         if not category or not isinstance(category, discord.CategoryChannel):
             return
 
-        managed_channels = []
-        for ch in category.voice_channels:
-            if ch.id in self.managed_channels and ch.name.startswith(generator_config.base_name):
-                match = re.search(r'(\d+)$', ch.name)
-                if match:
-                    managed_channels.append((int(match.group(1)), ch))
-
-        managed_channels.sort(key=lambda x: x[0])
-        existing_numbers = {num for num, _ in managed_channels}
-
-        new_number = 1
-        while new_number in existing_numbers:
-            new_number += 1
-
-        new_channel_name = f"{generator_config.base_name} {new_number}"
-
-        # ✅ 채널 배치 계산 방식 교체
-        insert_index = 0
-        for i, (num, _) in enumerate(managed_channels):
-            if new_number < num:
-                break
-            insert_index = i + 1
-
-        if managed_channels:
-            if insert_index == 0:
-                position = managed_channels[0][1].position - 1
+        generator_id = generator_config.generator_channel_id
+        # 같은 생성기에 동시에 입장해도 번호가 겹치지 않도록 생성 과정을 생성기별로 직렬화합니다.
+        lock = self._creation_locks.setdefault(generator_id, asyncio.Lock())
+        async with lock:
+            allocator = self.allocators.get(generator_id) or self._build_allocator(guild, generator_config)
+            numbered = self.numbered_channels[generator_id]
+            new_number = allocator.allocate()
+            new_channel_name = f"{generator_config.base_name} {new_number}"
+
+            # 바로 앞 번호 채널 뒤에, 없으면 바로 뒤 번호 채널 앞에 배치합니다.
+            previous = allocator.predecessor(new_number)
+            following = allocator.successor(new_number)
+            previous_channel = guild.get_channel(numbered[previous]) if previous is not None else None
+            following_channel = guild.get_channel(numbered[following]) if following is not None else None
+            if previous_channel:
+                position = previous_channel.position + 1
+            elif following_channel:
+                position = following_channel.position - 1
             else:
-                position = managed_channels[insert_index - 1][1].position + 1
-        else:
-            position = category.position - 1
+                position = category.position - 1
 
-        overwrites = {member: discord.PermissionOverwrite(manage_channels=True, manage_roles=True)}
+            overwrites = {member: discord.PermissionOverwrite(manage_channels=True, manage_roles=True)}
+
+            try:
+                new_channel = await category.create_voice_channel(
+                    new_channel_name,
+                    overwrites=overwrites,
+                    position=position,
+                    user_limit=5,  # 기본 인원 제한 5명
+                    reason=f"{member.display_name}의 요청으로 자동 생성"
+                )
+            except (discord.Forbidden, discord.HTTPException) as e:
+                allocator.release(new_number)
+                print(f"자동 통화방 생성 실패: {e}")
+                return
+
+            numbered[new_number] = new_channel.id
+            self.channel_numbers[new_channel.id] = (generator_id, new_number)
 
         try:
-            new_channel = await category.create_voice_channel(
-                new_channel_name,
-                overwrites=overwrites,
-                position=position,
-                user_limit=5,  # 기본 인원 제한 5명
-                reason=f"{member.display_name}의 요청으로 자동 생성"
-            )
-            await self.add_channel_to_db(new_channel.id, member.id, guild.id, generator_config.generator_channel_id)
+            await self.add_channel_to_db(new_channel.id, member.id, guild.id, generator_id)
             await member.move_to(new_channel)
         except (discord.Forbidden, discord.HTTPException) as e:
             print(f"자동 통화방 생성 실패: {e}")
@@ -132,6 +238,13 @@ class AutoVcCog(commands.Cog):
     async def remove_channel_from_db(self, channel_id: int):
         await self.bot.db.auto_vc.remove_managed_channel(channel_id)
         self.managed_channels.discard(channel_id)
+        self._release_number(channel_id)
+
+    async def remove_channels_from_db(self, channel_ids: List[int]):
+        await self.bot.db.auto_vc.remove_managed_channels(channel_ids)
+        self.managed_channels.difference_update(channel_ids)
+        for channel_id in channel_ids:
+            self._release_number(channel_id)
 
     # --- User Commands ---
     vc = app_commands.Group(name="통화방", description="현재 속한 통화방을 관리합니다.")
@@ -3,10 +3,11 @@ from datetime import timezone, timedelta
 
 import discord
 import pytz
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import datetime
 from core.overwatch_bot import OverwatchBot
+from core.job_scheduler import Daily
 
 KST = timezone(timedelta(hours=9)) #datetime.datetime.now().astimezone().tzinfo #//pytz.timezone("Asia/Seoul")
 
@@ -16,13 +17,13 @@ class BirthdayCog(commands.Cog):
         self.channel = int(os.getenv("BIRTH_DAY_MESSAGE_SEND_CHANNEL"))
 
     async def cog_load(self):
-        if not self.check_birthdays.is_running():
-            print("[TASK] check_birthdays Started.")
-            self.check_birthdays.start()
+        # 매일 8시 실행. 8시에 봇이 꺼져 있었다면 재시작 직후 한 번 실행됩니다.
+        await self.bot.scheduler.register("check_birthdays", Daily(datetime.time(hour=8, minute=0, tzinfo=KST)), self.check_birthdays)
+        print("[TASK] check_birthdays Registered.")
 
     def cog_unload(self):
-        print("[TASK] check_birthdays Stopped.")
-        self.check_birthdays.cancel()
+        print("[TASK] check_birthdays Unregistered.")
+        self.bot.scheduler.unregister("check_birthdays")
 
     @app_commands.command(name="생일등록", description="당신의 생일을 등록합니다. (예: 01-15)")
     @app_commands.describe(생일="3월 8일 -> 03-08")
@@ -37,10 +38,10 @@ class BirthdayCog(commands.Cog):
         await self.bot.db.users.set_birthday(interaction.user.id, 생일)
         await interaction.response.send_message(f"{interaction.user.mention}님의 생일이 {생일}로 등록되었습니다.", ephemeral=True)
 
-    @tasks.loop(time=datetime.time(hour=8, minute=0, tzinfo=KST))  # 매일 8시 실행
-    async def check_birthdays(self):
+    async def check_birthdays(self, due_at: datetime.datetime = None):
+        # 재시작 직후 놓친 작업을 따라잡을 때는 예정되어 있던 날짜의 생일을 축하합니다.
         print("check_birthdays")
-        today = datetime.datetime.now(tz=KST).strftime("%m-%d")
+        today = (due_at or datetime.datetime.now(tz=KST)).astimezone(KST).strftime("%m-%d")
         users = await self.bot.db.users.get_users_with_birthday(today)
         channel = self.bot.get_channel(self.channel)
         birthday_user = []
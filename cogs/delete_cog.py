@@ -1,5 +1,8 @@
 import os
 import io
+import gzip
+import tempfile
+import time
 
 import discord
 from discord.ext import commands
@@ -11,6 +14,13 @@ from core import OverwatchBot
 
 
 class DeleteCog(commands.Cog):
+    MAX_DELETE = 10000             # 한 번에 삭제할 수 있는 최대 메시지 수
+    BULK_DELETE_SIZE = 100         # 디스코드 일괄 삭제 API가 한 번에 받는 최대 메시지 수
+    BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)  # 일괄 삭제 가능한 메시지 나이 (여유 5분)
+    LOG_SPOOL_SIZE = 1024 * 1024   # 압축 로그를 메모리에 두는 최대 크기, 넘으면 디스크로 넘어갑니다.
+    LOG_UPLOAD_MARGIN = 256 * 1024 # 첨부 용량 제한에서 남겨둘 여유분
+    PROGRESS_INTERVAL = 2.0        # 진행 상황 메시지 갱신 간격 (초)
+
     def __init__(self, bot: OverwatchBot):
         self.bot = bot
         try:
@@ -20,7 +30,7 @@ class DeleteCog(commands.Cog):
             self.delete_message_send_channel = None
 
     @commands.hybrid_command(name="삭제", description="메시지를 삭제하고, 삭제된 메시지 내용을 파일로 저장 및 전송합니다.")
-    @app_commands.describe(개수="삭제할 메시지 개수 (1~100개)")
+    @app_commands.describe(개수="삭제할 메시지 개수 (1~10000개, 100개 초과 시 일괄 삭제 모드)")
     @commands.has_permissions(manage_messages=True) # 명령어 실행에 '메시지 관리' 권한이 필요함을 명시
     @commands.bot_has_permissions(manage_messages=True) # 봇에게도 '메시지 관리' 권한이 필요함을 명시
     async def delete(self, ctx: commands.Context, 개수: int):
@@ -30,11 +40,15 @@ class DeleteCog(commands.Cog):
         else:
             send_method = ctx.send
 
-        if not (1 <= 개수 <= 100):
-            await send_method("1부터 100 사이의 숫자를 입력해주세요.")
+        if not (1 <= 개수 <= self.MAX_DELETE):
+            await send_method(f"1부터 {self.MAX_DELETE} 사이의 숫자를 입력해주세요.")
             return
 
         try:
+            if 개수 > 100:
+                await self._bulk_delete(ctx, 개수, send_method)
+                return
+
             deleted_messages = await ctx.channel.purge(limit=개수)
 
             if not deleted_messages:
@@ -45,20 +59,8 @@ class DeleteCog(commands.Cog):
                 await send_method(f"{len(deleted_messages)}개의 메시지를 삭제했습니다. (로그 채널이 설정되지 않음)")
                 return
 
-            log_lines = []
             seoul_timezone = timezone("Asia/Seoul")
-            for msg in reversed(deleted_messages):
-                # [시간][유저ID][유저태그] 닉네임 : 내용
-                log_line = (
-                    f"[{msg.created_at.astimezone(seoul_timezone).strftime('%Y-%m-%d %H:%M:%S')}] "
-                    f"[{msg.author.id}][{msg.author}] {msg.author.display_name} : {msg.content}"
-                )
-
-                if msg.attachments:
-                    for attachment in msg.attachments:
-                        log_line += f"\n    [첨부파일: {attachment.url}]"
-
-                log_lines.append(log_line)
+            log_lines = [self._format_log_line(msg, seoul_timezone) for msg in reversed(deleted_messages)]
 
             log_content = "\n".join(log_lines).encode('utf-8')
             log_file = io.BytesIO(log_content)
@@ -84,5 +86,206 @@ class DeleteCog(commands.Cog):
             await send_method(f"오류가 발생했습니다: {e}")
             print(f"삭제 명령어 실행 중 오류 발생: {e}")
 
+    @staticmethod
+    def _format_log_line(msg: discord.Message, tz) -> str:
+        # [시간][유저ID][유저태그] 닉네임 : 내용
+        log_line = (
+            f"[{msg.created_at.astimezone(tz).strftime('%Y-%m-%d %H:%M:%S')}] "
+            f"[{msg.author.id}][{msg.author}] {msg.author.display_name} : {msg.content}"
+        )
+
+        if msg.attachments:
+            for attachment in msg.attachments:
+                log_line += f"\n    [첨부파일: {attachment.url}]"
+        return log_line
+
+    async def _bulk_delete(self, ctx: commands.Context, limit: int, send_method):
+        """
+        100개 초과 삭제 모드입니다. 채널 기록을 100개씩 읽어 바로 삭제하고,
+        로그는 gzip으로 압축하며 임시 파일에 흘려 쓰므로 삭제 개수와 관계없이 메모리 사용량이 일정합니다.
+        압축된 로그가 첨부 용량 제한에 가까워지면 그때까지의 로그를 먼저 전송하고 새 파일에 이어 씁니다.
+        """
+        target_channel = self.bot.get_channel(self.delete_message_send_channel) if self.delete_message_send_channel else None
+        log = _SplitLogWriter(
+            channel=ctx.channel,
+            target_channel=target_channel,
+            author=ctx.author,
+            size_limit=ctx.guild.filesize_limit - self.LOG_UPLOAD_MARGIN,
+            spool_size=self.LOG_SPOOL_SIZE,
+        ) if target_channel else None
+
+        if ctx.interaction:
+            status = None
+            edit_status = ctx.interaction.edit_original_response
+        else:
+            status = await ctx.send(f"메시지 {limit}개 삭제를 시작합니다...")
+            edit_status = status.edit
+        report_failed = False
+
+        async def report(text: str):
+            # 인터랙션 토큰은 15분 후 만료되고 진행 메시지는 누군가 지울 수 있으므로,
+            # 수정에 실패하면 진행 상황 보고만 멈추고 삭제는 계속합니다.
+            nonlocal report_failed
+            if report_failed:
+                return
+            try:
+                await edit_status(content=text)
+            except discord.HTTPException as e:
+                report_failed = True
+                print(f"[Delete] 진행 상황 메시지를 수정하지 못해 보고를 중단합니다: {e}")
+
+        seoul_timezone = timezone("Asia/Seoul")
+        deleted = 0
+        last_report = time.monotonic()
+        chunk = []
+        try:
+            # 진행 상황 메시지는 삭제 대상에서 제외합니다.
+            async for msg in ctx.channel.history(limit=limit, before=status):
+                chunk.append(msg)
+                if len(chunk) < self.BULK_DELETE_SIZE:
+                    continue
+
+                deleted += await self._delete_chunk(ctx.channel, chunk, log, seoul_timezone)
+                chunk = []
+                if time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                    await report(f"메시지 삭제 중... ({deleted}/{limit})")
+                    last_report = time.monotonic()
+
+            if chunk:
+                deleted += await self._delete_chunk(ctx.channel, chunk, log, seoul_timezone)
+
+            if log and deleted:
+                await log.close(deleted)
+        except Exception:
+            # 이미 삭제된 메시지의 기록을 잃지 않도록, 중단되더라도 지금까지의 로그를 전송합니다.
+            if log and not log.closed and (log.lines or log.parts):
+                try:
+                    await log.close(deleted, aborted=True)
+                except Exception as e:
+                    print(f"[Delete] 중단된 삭제의 로그를 전송하지 못했습니다: {e}")
+            raise
+        finally:
+            if log:
+                log.discard()
+
+        if deleted == 0:
+            result = "삭제할 메시지가 없습니다."
+        elif not self.delete_message_send_channel:
+            result = f"{deleted}개의 메시지를 삭제했습니다. (로그 채널이 설정되지 않음)"
+        elif not target_channel:
+            result = f"로그 채널(ID: {self.delete_message_send_channel})을 찾을 수 없습니다. 메시지 {deleted}개만 삭제되었습니다."
+        else:
+            result = f"{deleted}개의 메시지를 삭제하고, 내역을 로그 채널에 전송했습니다. (파일 {log.parts}개)"
+
+        if ctx.interaction:
+            await report(result)
+            if report_failed:
+                await ctx.channel.send(f"{ctx.author.mention} {result}")
+        else:
+            if not report_failed:
+                await status.delete()
+            await send_method(result)
+
+    async def _delete_chunk(self, channel: discord.TextChannel, chunk, log, tz) -> int:
+        """최대 100개의 메시지를 로그에 기록한 뒤 삭제합니다. 14일이 지난 메시지는 하나씩 삭제합니다."""
+        if log:
+            for msg in chunk:
+                log.write_line(self._format_log_line(msg, tz))
+            await log.flush_if_full()
+
+        cutoff = discord.utils.utcnow() - self.BULK_DELETE_MAX_AGE
+        recent = [m for m in chunk if m.created_at > cutoff]
+        old = [m for m in chunk if m.created_at <= cutoff]
+
+        if len(recent) >= 2:
+            await channel.delete_messages(recent)
+        else:
+            old = recent + old
+
+        deleted = len(chunk)
+        for msg in old:
+            try:
+                await msg.delete()
+            except discord.NotFound:
+                deleted -= 1
+        return deleted
+
+
+class _SplitLogWriter:
+    """
+    삭제 로그를 gzip으로 압축해 SpooledTemporaryFile에 기록합니다.
+    압축된 크기가 `size_limit`를 넘으면 현재 파일을 전송하고 새 파일을 시작합니다.
+    """
+
+    def __init__(self, channel: discord.TextChannel, target_channel, author, size_limit: int, spool_size: int):
+        self.channel = channel
+        self.target_channel = target_channel
+        self.author = author
+        self.size_limit = size_limit
+        self.spool_size = spool_size
+        self.parts = 0
+        self.lines = 0
+        self._timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._spool = None
+        self._gzip = None
+        self._open()
+
+    def _open(self):
+        self._spool = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        self._gzip = gzip.GzipFile(fileobj=self._spool, mode="wb")
+        self._gzip.write(f"# 최신 메시지부터 오래된 순서로 기록되어 있습니다. (파일 {self.parts + 1})\n".encode("utf-8"))
+
+    def write_line(self, line: str):
+        self._gzip.write(line.encode("utf-8") + b"\n")
+        self.lines += 1
+
+    async def flush_if_full(self):
+        self._gzip.flush()
+        if self._spool.tell() >= self.size_limit:
+            await self._upload(final=False)
+            self._open()
+
+    @property
+    def closed(self) -> bool:
+        return self._spool is None
+
+    async def close(self, deleted: int, aborted: bool = False):
+        """
+        남은 로그를 전송합니다. `aborted`이면 삭제가 오류로 중단되었음을 함께 알립니다.
+        (중단된 경우 마지막 묶음은 로그에는 기록되었지만 일부만 삭제되었을 수 있습니다)
+        """
+        if self.lines or self.parts == 0:
+            await self._upload(final=True, deleted=deleted, aborted=aborted)
+        else:
+            # 마지막 파일이 용량 제한으로 이미 전송된 경우 요약 메시지만 보냅니다.
+            await self.target_channel.send(f"{self._summary(deleted, aborted)} (로그 {self.parts}개)")
+
+    def _summary(self, deleted: int, aborted: bool) -> str:
+        if aborted:
+            return (f"**{self.channel.mention}** 채널에서 **{self.author.mention}**님의 메시지 삭제가 오류로 중단되었습니다. "
+                    f"중단 전까지 **{deleted}개** 이상 삭제되었습니다.")
+        return f"**{self.channel.mention}** 채널에서 **{self.author.mention}**님이 메시지 **{deleted}개**를 삭제했습니다."
+
+    def discard(self):
+        if self._spool:
+            self._spool.close()
+            self._spool = None
+
+    async def _upload(self, final: bool, deleted: int = 0, aborted: bool = False):
+        self._gzip.close()
+        self._spool.seek(0)
+        self.parts += 1
+        filename = f"deleted_{self.channel.name}_{self.channel.id}_{self._timestamp}_part{self.parts}.txt.gz"
+        if final:
+            content = f"{self._summary(deleted, aborted)} (로그 {self.parts}/{self.parts})"
+        else:
+            content = f"**{self.channel.mention}** 채널 메시지 삭제 로그 (파일 {self.parts}, 계속)"
+        try:
+            await self.target_channel.send(content=content, file=discord.File(self._spool, filename=filename))
+        finally:
+            self.discard()
+            self.lines = 0
+
+
 async def setup(bot):
     await bot.add_cog(DeleteCog(bot)) 
\ No newline at end of file
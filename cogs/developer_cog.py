@@ -1,6 +1,11 @@
+import datetime
+
 import discord
 from discord.ext import commands
 from core.overwatch_bot import OverwatchBot
+from core.metrics import metrics
+
+STATS_FAMILIES = ("listener", "app_command", "sql", "rest")
 
 class DeveloperCog(commands.Cog):
     def __init__(self, bot: OverwatchBot):
@@ -38,11 +43,173 @@ class DeveloperCog(commands.Cog):
 
     @commands.command(name="sync")
     @commands.is_owner()
-    async def sync_cog(self, ctx: commands.Context):
-        guild_obj = discord.Object(id=self.bot.guild_id)
-        self.bot.tree.copy_global_to(guild=guild_obj)
-        await self.bot.tree.sync(guild=guild_obj)
-        await ctx.send(f"Successfully synced {len(self.bot.cogs)} cogs.")
+    async def sync_cog(self, ctx: commands.Context, mode: str = None):
+        """Syncs app commands if the command tree changed since the last sync. `!sync force` always syncs."""
+        synced = await self.bot.sync_commands(force=mode == "force")
+        if synced:
+            await ctx.send(f"Successfully synced {len(self.bot.cogs)} cogs.")
+        else:
+            await ctx.send("Command tree unchanged, sync skipped. Use `!sync force` to sync anyway.")
+
+    @commands.command(name="cache")
+    @commands.is_owner()
+    async def cache_info(self, ctx: commands.Context):
+        """Shows the user cache hit ratio."""
+        info = self.bot.db.users.cache_info()
+        await ctx.send(
+            f"User cache: {info.size}/{info.capacity} entries, "
+            f"{info.hits} hits / {info.misses} misses ({info.hit_ratio:.1%} hit ratio)"
+        )
+
+    @commands.command(name="rebuild_activity")
+    @commands.is_owner()
+    async def rebuild_activity(self, ctx: commands.Context, batch_size: int = 500):
+        """Recomputes the activity leaderboard rollup from daily_activity."""
+        await ctx.send("Rebuilding activity totals...")
+        rebuilt = await self.bot.db.users.rebuild_activity_totals(batch_size=batch_size)
+        await ctx.send(f"Rebuilt activity totals for {rebuilt} users.")
+
+    @commands.command(name="jobs")
+    @commands.is_owner()
+    async def jobs(self, ctx: commands.Context, run: str = None):
+        """Shows scheduled jobs with their last duration and lag. `!jobs <name>` runs a job now."""
+        if run:
+            try:
+                ran = await self.bot.scheduler.run_now(run)
+            except KeyError:
+                return await ctx.send(f"Unknown job '{run}'.")
+            if not ran:
+                return await ctx.send(f"Job '{run}' is already running.")
+            error = next(job.record.last_error for job in self.bot.scheduler.jobs if job.name == run)
+            return await ctx.send(f"Job '{run}' failed: `{error[:200]}`" if error else f"Job '{run}' finished.")
+
+        jobs = self.bot.scheduler.jobs
+        if not jobs:
+            return await ctx.send("No jobs are registered.")
+
+        embed = discord.Embed(title="Scheduled Jobs", color=discord.Color.blue())
+        for job in jobs:
+            record = job.record
+            avg = sum(job.durations) / len(job.durations) if job.durations else None
+            lines = [
+                f"Schedule: `{record.schedule}`",
+                f"Next run: {discord.utils.format_dt(job.next_run_at, 'R')}" + (" (running)" if job.running else ""),
+                f"Last run: {record.last_run_at or '-'}",
+                f"Last duration: {record.last_duration:.3f}s, lag: {record.last_lag:.3f}s" if record.last_duration is not None else "Last duration: -",
+                f"Avg duration ({len(job.durations)} runs): {avg:.3f}s" if avg is not None else "Avg duration: -",
+            ]
+            if record.last_error:
+                lines.append(f"Last error: `{record.last_error[:200]}`")
+            embed.add_field(name=job.name, value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="audit")
+    @commands.is_owner()
+    async def audit(self, ctx: commands.Context, user_id: int = None):
+        """Checks balances against the ledger. `!audit <user_id>` also shows recent ledger entries."""
+        ledger = self.bot.db.ledger
+        if user_id is None:
+            mismatches = await ledger.find_mismatches()
+            if not mismatches:
+                return await ctx.send("All balances match the ledger.")
+            lines = [f"`{a.user_id}` balance {a.balance}, expected {a.expected} ({a.balance - a.expected:+})" for a in mismatches]
+            return await ctx.send("Balance mismatches:\n" + "\n".join(lines))
+
+        audit = await ledger.audit_user(user_id)
+        if audit is None:
+            return await ctx.send(f"Unknown user `{user_id}`.")
+
+        embed = discord.Embed(
+            title=f"Balance audit: {user_id}",
+            color=discord.Color.green() if audit.ok else discord.Color.red()
+        )
+        embed.add_field(name="Balance", value=str(audit.balance))
+        embed.add_field(name="Expected", value=str(audit.expected))
+        embed.add_field(name="Since snapshot", value=f"{audit.entries_since_snapshot} entries after #{audit.snapshot_ledger_id}")
+        entries = await ledger.get_recent_entries(user_id)
+        if entries:
+            embed.add_field(name="Recent entries", value="\n".join(
+                f"#{e.id} {e.reason.name.lower()} {e.delta:+}" + (f" (ref {e.ref_id})" if e.ref_id else "")
+                + f" <t:{e.created_at}:R>"
+                for e in entries
+            ), inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="stats")
+    @commands.is_owner()
+    async def stats(self, ctx: commands.Context, family: str = None, limit: int = 5, by: str = "sum"):
+        """Shows the slowest listeners, commands, SQL and REST routes. `!stats sql 10 max`, `!stats reset`."""
+        if family == "reset":
+            metrics.reset()
+            return await ctx.send("Metrics reset.")
+        if family and family not in STATS_FAMILIES:
+            return await ctx.send(f"Unknown family '{family}'. Choose from: {', '.join(STATS_FAMILIES)}")
+        if by not in ("sum", "max", "count", "mean"):
+            return await ctx.send("Sort by one of: sum, max, count, mean")
+
+        for name in [family] if family else STATS_FAMILIES:
+            entries = metrics.top(name, limit=limit, by=by)
+            if not entries:
+                continue
+            lines = [f"{'count':>7} {'mean':>8} {'p99':>8} {'max':>8} {'total':>8}  name"]
+            for label, h in entries:
+                label = label if len(label) <= 70 else label[:67] + "..."
+                lines.append(
+                    f"{h.count:>7} {h.mean * 1000:>6.1f}ms {h.quantile(0.99) * 1000:>6.1f}ms "
+                    f"{h.max * 1000:>6.1f}ms {h.sum:>7.2f}s  {label}"
+                )
+            await ctx.send(f"**{name}** (top {len(entries)} by {by})\n```\n" + "\n".join(lines)[:1900] + "\n```")
+
+        if not family:
+            counters = ", ".join(f"{label}={value}" for (_, label), value in sorted(metrics.counters.items()))
+            uptime = discord.utils.format_dt(datetime.datetime.fromtimestamp(metrics.started_at, datetime.timezone.utc), 'R')
+            await ctx.send(f"Counters since {uptime}: {counters or '-'}"[:2000])
+
+    @commands.command(name="stalls")
+    @commands.is_owner()
+    async def stalls(self, ctx: commands.Context, arg: str = "3"):
+        """Shows the worst event loop stalls with the blocking stack. `!stalls reset` clears them."""
+        watchdog = self.bot.watchdog
+        if arg == "reset":
+            watchdog.reset()
+            return await ctx.send("Stall report reset.")
+
+        lag = metrics.histograms.get(("loop_lag", "event_loop"))
+        summary = (
+            f"Loop lag p50 {lag.quantile(0.5) * 1000:.1f}ms, p99 {lag.quantile(0.99) * 1000:.1f}ms, "
+            f"max {lag.max * 1000:.1f}ms over {lag.count} beats. "
+            if lag else ""
+        ) + f"{watchdog.stall_count} stalls over {watchdog.threshold * 1000:.0f}ms."
+        await ctx.send(summary)
+
+        for stall in watchdog.worst_stalls()[:int(arg) if arg.isdigit() else 3]:
+            header = (
+                f"**{stall.duration:.3f}s**{' (ongoing)' if stall.ongoing else ''} "
+                f"{discord.utils.format_dt(stall.started_at, 'R')} task: `{stall.task or '-'}`"
+            )
+            stack = "\n".join(stall.stack)
+            await ctx.send(f"{header}\n```py\n{stack[-(1900 - len(header)):]}\n```")
+
+    @commands.command(name="cogs")
+    @commands.is_owner()
+    async def extension_timings(self, ctx: commands.Context, limit: int = 10):
+        """
+        Shows the slowest extensions from the last startup, ranked by import/setup run time plus
+        cog_load time (including awaited DB I/O), and the total time of each concurrent load level.
+        """
+        timings = sorted(self.bot.extension_timings.values(), key=lambda t: t.cost, reverse=True)
+        if not timings:
+            return await ctx.send("No extension timings recorded.")
+
+        levels = ", ".join(f"{len(names)} cogs {seconds * 1000:.1f}ms" for names, seconds in self.bot.extension_levels)
+        lines = [f"Startup cog loading, {len(timings)} extensions. Levels: {levels}"]
+        for t in timings[:limit]:
+            status = f" ❌ {t.error}" if t.error else ""
+            lines.append(
+                f"`{t.name}` {t.cost * 1000:.1f}ms "
+                f"(import/setup {t.import_and_setup * 1000:.1f}ms, cog_load {t.cog_load * 1000:.1f}ms){status}"
+            )
+        await ctx.send("\n".join(lines)[:2000])
 
     @commands.command(name="list_commands")
     @commands.is_owner()
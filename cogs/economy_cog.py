@@ -10,6 +10,8 @@ import random
 import asyncio
 
 from core import OverwatchBot
+from core.game_odds import LABOR_TABLE, LADDER_TABLE, SLOT_TABLE
+from core.model import LedgerReason
 from core.utiles import money_to_string
 from view import RankingView
 
@@ -17,7 +19,8 @@ from view import RankingView
 class EconomyCog(commands.Cog):
     def __init__(self, bot: OverwatchBot):
         self.bot = bot
-        self.cooldowns = {}  # {command_name: {user_id: cooldown_end_time}}
+        self.cooldowns = self.bot.db.cooldowns  # 재시작 후에도 유지되는 쿨타임 저장소
+        self.labor_cooldown = datetime.timedelta(hours=1)
         self.ladder_cooldown = datetime.timedelta(hours=2)
         self.slot_machine_cooldown = datetime.timedelta(hours=2)
         self.emojis = {
@@ -32,22 +35,15 @@ class EconomyCog(commands.Cog):
         }
 
     def check_cooldown(self, command_name: str, user_id: int, cooldown: datetime.timedelta):
-        now = datetime.datetime.now()
-        command_cooldowns = self.cooldowns.get(command_name, {})
-        cooldown_end = command_cooldowns.get(user_id)
-
-        if cooldown_end and cooldown_end > now:
-            remaining = (cooldown_end - now).total_seconds()
+        remaining = self.cooldowns.remaining(command_name, user_id)
+        if remaining > 0:
             raise discord.app_commands.CommandOnCooldown(
                 cooldown=discord.app_commands.Cooldown(1, cooldown.total_seconds()),
                 retry_after=remaining
             )
 
     def set_cooldown(self, command_name: str, user_id: int, duration: datetime.timedelta):
-        now = datetime.datetime.now()
-        if command_name not in self.cooldowns:
-            self.cooldowns[command_name] = {}
-        self.cooldowns[command_name][user_id] = now + duration
+        self.cooldowns.set(command_name, user_id, duration)
 
     @app_commands.command(name="잔고", description="자신 또는 다른 유저의 재화를 확인합니다.")
     @app_commands.describe(유저="잔고를 확인할 유저")
@@ -83,14 +79,12 @@ class EconomyCog(commands.Cog):
         if 받는분.bot:
             return await interaction.response.send_message("봇에게는 송금할 수 없습니다.", ephemeral=True)
 
-        sender_model = await self.bot.db.users.get_or_create_user(interaction.user.id, interaction.user.display_name)
-        if sender_model.balance < 금액:
+        await self.bot.db.users.ensure_user(interaction.user.id, interaction.user.display_name)
+        await self.bot.db.users.ensure_user(받는분.id, 받는분.display_name)
+        # 잔고 확인과 송금은 조건부 차감으로 한 번에 처리됩니다.
+        if await self.bot.db.users.transfer(interaction.user.id, 받는분.id, 금액) is None:
             return await interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
 
-        await self.bot.db.users.get_or_create_user(받는분.id, 받는분.display_name)
-        await self.bot.db.users.update_balance(interaction.user.id, -금액)
-        await self.bot.db.users.update_balance(받는분.id, 금액)
-
         await interaction.response.send_message(f"{받는분.mention}님에게 {money_to_string(금액)}을 성공적으로 보냈습니다.")
 
     @app_commands.command(name="랭킹", description="서버 내 랭킹을 확인합니다.")
@@ -99,10 +93,10 @@ class EconomyCog(commands.Cog):
         await interaction.response.send_message("확인할 랭킹 종류를 선택하세요.", view=view, ephemeral=True)
 
     async def _send_leaderboard(self, interaction: discord.Interaction, ranking_type: str):
-        limit = 50
+        # 서버를 떠난 유저는 DB의 in_guild 플래그로 이미 제외되어 있습니다.
+        limit = 10
         if ranking_type == "activity":
             users = await self.bot.db.users.get_activity_leaderboard(limit=limit)
-            users = [u for u in users if interaction.guild.get_member(u.user_id)][:10]
             description = []
             medals = ["🥇", "🥈", "🥉"]
             for i, user in enumerate(users):
@@ -113,7 +107,6 @@ class EconomyCog(commands.Cog):
             title = "활동량 랭킹"
         else:
             users = await self.bot.db.users.get_balance_leaderboard(limit=limit)
-            users = [u for u in users if interaction.guild.get_member(u.user_id)][:10]
             description = []
             medals = ["🥇", "🥈", "🥉"]
             for i, user in enumerate(users):
@@ -156,33 +149,20 @@ class EconomyCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def give_money(self, interaction: Interaction, user: discord.User, money: int):
         before_user = await self.bot.db.users.get_or_create_user(user.id, user.display_name)
-        now_money = await self.bot.db.users.update_balance(user.id, money)
+        now_money = await self.bot.db.users.update_balance(user.id, money, LedgerReason.ADMIN_GRANT, ref_id=interaction.user.id)
 
         await interaction.response.send_message(f"{user.mention}님 에게 {money_to_string(money)}을 지급하였습니다.\n-# {money_to_string(before_user.balance)} -> {money_to_string(now_money)}", ephemeral=True)
 
     @app_commands.command(name="노동", description="노동을 통해 재화를 획득합니다. (쿨타임: 1시간)")
-    @app_commands.checks.cooldown(1, 3600)
     async def labor(self, interaction: Interaction):
+        self.check_cooldown("labor", interaction.user.id, self.labor_cooldown)
+        self.set_cooldown("labor", interaction.user.id, self.labor_cooldown)
         await interaction.response.defer()
         user = await self.bot.db.users.get_or_create_user(interaction.user.id, interaction.user.display_name)
 
-        chance = random.random() * 100
-        if chance <= 49.99999:
-            amount = random.randint(0, 10)
-        elif chance <= 79.99999:
-            amount = random.randint(10, 30)
-        elif chance <= 92.99999:
-            amount = random.randint(30, 50)
-        elif chance <= 97.99999:
-            amount = random.randint(50, 100)
-        elif chance <= 99.49999:
-            amount = random.randint(100, 500)
-        elif chance <= 99.99999:
-            amount = random.randint(500, 1000)
-        else:
-            amount = random.randint(1000, 10000)
-
-        await self.bot.db.users.update_balance(user.user_id, amount)
+        # 지급액 구간과 확률은 core/game_odds.py의 LABOR_TABLE에 정의되어 있습니다.
+        _, amount = LABOR_TABLE.sample_amount()
+        await self.bot.db.users.update_balance(user.user_id, amount, LedgerReason.LABOR)
         embed = discord.Embed(description=f"노동을 통해 {money_to_string(amount)} 재화를 획득했습니다.", color=discord.Color.green())
         await interaction.followup.send(embed=embed)
 
@@ -195,27 +175,33 @@ class EconomyCog(commands.Cog):
     ])
     async def ladder(self, interaction: Interaction, 베팅금액: app_commands.Range[int, 100], 배팅위치: app_commands.Choice[str]):
         self.check_cooldown("ladder", interaction.user.id, self.ladder_cooldown)
+        # 동시에 실행된 같은 명령어가 쿨타임 확인을 통과하지 못하도록 먼저 쿨타임을 겁니다.
+        self.set_cooldown("ladder", interaction.user.id, self.ladder_cooldown)
         await interaction.response.defer()
-        user = await self.bot.db.users.get_or_create_user(interaction.user.id, interaction.user.display_name)
-
-        if user.balance < 베팅금액:
-            return await interaction.followup.send("잔고가 부족합니다.", ephemeral=True)
+        await self.bot.db.users.ensure_user(interaction.user.id, interaction.user.display_name)
 
+        # 승패는 LADDER_TABLE에서 뽑고, 진 경우 선택하지 않은 위치 중 하나를 결과로 보여줍니다.
+        outcome = LADDER_TABLE.sample()
+        won = outcome.multiplier > 0
         positions = ["좌", "중", "우"]
-        actual_result = random.choice(positions)
+        actual_result = 배팅위치.value if won else random.choice([p for p in positions if p != 배팅위치.value])
+        reward = 베팅금액 * 2
+
+        # 베팅금 차감과 당첨금 지급을 잔고 조건과 함께 한 문장으로 처리합니다.
+        new_balance = await self.bot.db.users.try_debit(
+            interaction.user.id, 베팅금액, LedgerReason.LADDER, payout=int(베팅금액 * outcome.multiplier)
+        )
+        if new_balance is None:
+            self.cooldowns.reset("ladder", interaction.user.id)
+            return await interaction.followup.send("잔고가 부족합니다.", ephemeral=True)
 
-        if actual_result == 배팅위치.value:
-            reward = 베팅금액 * 2
-            new_balance = await self.bot.db.users.update_balance(user.user_id, reward)
+        if won:
             result_message = f"축하합니다! 사다리 결과는 **{actual_result}**입니다. {money_to_string(reward)} 재화를 획득했습니다!\n**{interaction.user.display_name}**님의 잔액: {money_to_string(new_balance)}(+{money_to_string(reward)})"
             color = discord.Color.green()
         else:
-            new_balance = await self.bot.db.users.update_balance(user.user_id, -베팅금액)
             result_message = f"아쉽습니다. 사다리 결과는 **{actual_result}**입니다. {money_to_string(베팅금액)} 재화를 잃었습니다.\n**{interaction.user.display_name}**님의 잔액: {money_to_string(new_balance)}(-{money_to_string(베팅금액)})"
             color = discord.Color.red()
 
-
-        self.set_cooldown("ladder", interaction.user.id, self.ladder_cooldown)
         embed = discord.Embed(title="사다리타기", description=f"선택한 위치: **{배팅위치.value}**\n결과: **{actual_result}**\n\n{result_message}", color=color)
         await interaction.followup.send(embed=embed)
 
@@ -223,8 +209,22 @@ class EconomyCog(commands.Cog):
     @app_commands.describe(베팅금액="베팅할 금액 (최소 100)")
     async def slot_machine(self, interaction: Interaction, 베팅금액: app_commands.Range[int, 100]):
         self.check_cooldown("slot_machine", interaction.user.id, self.slot_machine_cooldown)
-        user = await self.bot.db.users.get_or_create_user(interaction.user.id, interaction.user.display_name)
-        if user.balance < 베팅금액:
+        self.set_cooldown("slot_machine", interaction.user.id, self.slot_machine_cooldown)
+        await self.bot.db.users.ensure_user(interaction.user.id, interaction.user.display_name)
+
+        # 결과는 연출 전에 정하고, 베팅금 차감과 당첨금 지급을 한 문장으로 반영합니다.
+        # 배율과 확률은 core/game_odds.py의 SLOT_TABLE에 정의되어 있습니다.
+        outcome = SLOT_TABLE.sample()
+        multiplier = outcome.multiplier
+        if outcome.symbol:
+            result_emojis = [self.emojis[outcome.symbol]] * 3
+        else:  # 꽝: 서로 다른 그림 세 개
+            result_emojis = random.sample(list(self.emojis.values())[:-3], 3)
+
+        winnings = int(베팅금액 * multiplier)
+        new_balance = await self.bot.db.users.try_debit(interaction.user.id, 베팅금액, LedgerReason.SLOT, payout=winnings)
+        if new_balance is None:
+            self.cooldowns.reset("slot_machine", interaction.user.id)
             return await interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
 
         embed = discord.Embed(title="슬롯머신", description="슬롯머신을 돌리고 있습니다.", color=discord.Color.gold())
@@ -232,33 +232,6 @@ class EconomyCog(commands.Cog):
 
         await asyncio.sleep(1.8)
 
-        chance = random.random() * 100
-        multiplier = 0
-        result_emojis = []
-
-        if chance <= 79.99999:  # 꽝
-            multiplier = 0
-            result_emojis = random.sample(list(self.emojis.values())[:-3], 3)
-        elif chance <= 89.99999:  # 메달
-            multiplier = 2
-            result_emojis = [self.emojis['메달']] * 3
-        elif chance <= 94.99999:  # 보석
-            multiplier = 3
-            result_emojis = [self.emojis['보석']] * 3
-        elif chance <= 97.49999:  # 달러
-            multiplier = 5
-            result_emojis = [self.emojis['달러']] * 3
-        elif chance <= 99.49999:  # 주머니
-            multiplier = 7
-            result_emojis = [self.emojis['주머니']] * 3
-        else:  # 100
-            multiplier = 10
-            result_emojis = [self.emojis['100']] * 3
-
-        winnings = int(베팅금액 * multiplier)
-        final_balance_change = winnings - 베팅금액
-        new_balance = await self.bot.db.users.update_balance(user.user_id, final_balance_change)
-
         if multiplier == 0:
             description = f"아쉽습니다. {money_to_string(베팅금액)}을 잃었습니다.\n**{interaction.user.display_name}**님의 잔액: {money_to_string(new_balance)}(-{money_to_string(베팅금액)})"
             color = discord.Color.red()
@@ -266,7 +239,6 @@ class EconomyCog(commands.Cog):
             description = f"축하합니다! {money_to_string(winnings)}을 얻었습니다. (배율: {multiplier}배)\n\n**{interaction.user.display_name}**님의 잔액: {money_to_string(new_balance)}(+{money_to_string(winnings)})"
             color = discord.Color.green()
 
-        self.set_cooldown("slot_machine", interaction.user.id, self.slot_machine_cooldown)
         embed = discord.Embed(title="슬롯머신", description=description, color=color)
         await interaction.edit_original_response(content="".join(result_emojis), embeds=[embed])
 
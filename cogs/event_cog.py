@@ -1,25 +1,44 @@
+import asyncio
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import datetime
 import random
 import re
+from typing import List, Optional, Tuple
 
 from core import OverwatchBot
+from core.job_scheduler import Interval
+from core.model import LedgerReason, TemporaryRole
+from core.utiles import ExpiryQueue
 
 
 class EventCog(commands.Cog):
+    ROLE_REMOVAL_CONCURRENCY = 5  # 만료된 역할을 동시에 회수할 최대 요청 수
+    VOICE_CHECKPOINT_MINUTES = 5  # 진행 중인 음성 세션을 중간 정산하는 간격 (분)
+
     def __init__(self, bot: OverwatchBot):
         self.bot = bot
-        self.voice_sessions = {}  # {user_id: start_time_utc}
+        self.voice_sessions = {}  # {user_id: credited_until_utc} daily_activity에 정산된 마지막 시각
+        self.role_expiries: ExpiryQueue[Tuple[int, int]] = ExpiryQueue()  # {(user_id, role_id): expires_at}
+        self._role_expiry_task: Optional[asyncio.Task] = None
 
     async def cog_load(self):
-        if not self.check_expired_roles.is_running():
-            print("[TASK] check_expired_roles Started.")
-            self.check_expired_roles.start()
+        temporary_roles = await self.bot.db.shop.get_all_temporary_roles()
+        for temp_role in temporary_roles:
+            self._schedule_role_expiry(temp_role)
+        print(f"[TempRole] {len(temporary_roles)}개의 기간제 역할 만료 일정을 불러왔습니다.")
+        if self._role_expiry_task is None or self._role_expiry_task.done():
+            print("[TASK] expire_temporary_roles Started.")
+            self._role_expiry_task = asyncio.create_task(self._expire_temporary_roles())
+        await self.bot.scheduler.register("voice_checkpoint", Interval(minutes=self.VOICE_CHECKPOINT_MINUTES), self._checkpoint_voice_sessions)
+        print("[TASK] voice_checkpoint Registered.")
 
     def cog_unload(self):
-        print("[TASK] check_expired_roles Stopped.")
-        self.check_expired_roles.cancel()
+        print("[TASK] expire_temporary_roles Stopped.")
+        if self._role_expiry_task:
+            self._role_expiry_task.cancel()
+        print("[TASK] voice_checkpoint Unregistered.")
+        self.bot.scheduler.unregister("voice_checkpoint")
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -29,58 +48,148 @@ class EventCog(commands.Cog):
         if message.guild is None or message.guild.id != self.bot.guild_id:
             return
 
-        await self.bot.db.users.get_or_create_user(message.author.id, message.author.display_name)
-        await self.bot.db.users.log_message_activity(message.author.id)
+        # 메시지 활동량과 보상은 버퍼에 모았다가 주기적으로 한 번에 기록합니다.
+        self.bot.db.activity.record_message(message.author.id, message.author.display_name)
 
         # Disboard 범프 확인
         if (message.author.id == 302050872383242240 and
                 message.interaction and message.interaction.name == "bump"):
             user = message.interaction.user
             await self.bot.db.users.get_or_create_user(user.id, user.display_name)
-            await self.bot.db.users.update_balance(user.id, 500)
+            await self.bot.db.users.update_balance(user.id, 500, LedgerReason.BUMP)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState,
                                     after: discord.VoiceState):
-        if member.bot: return
+        # 음소거, 화면 공유 등 같은 채널 안에서의 상태 변경은 DB 접근 없이 무시합니다.
+        if member.bot or before.channel == after.channel:
+            return
         user_id = member.id
-        await self.bot.db.users.get_or_create_user(user_id, member.display_name)
+        now = datetime.datetime.now(datetime.timezone.utc)
 
         if not before.channel and after.channel:
-            self.voice_sessions[user_id] = datetime.datetime.now(datetime.timezone.utc)
+            await self.bot.db.users.get_or_create_user(user_id, member.display_name)
+            await self.bot.db.voice_sessions.start_session(user_id, now.isoformat())
+            self.voice_sessions[user_id] = now
         elif before.channel and not after.channel:
-            if user_id in self.voice_sessions:
-                start_time = self.voice_sessions.pop(user_id)
-                duration = int((datetime.datetime.now(datetime.timezone.utc) - start_time).total_seconds())
+            async with self.bot.db.transaction():
+                # 정산 기준 시각은 트랜잭션 락을 잡은 뒤에 꺼내야, 진행 중인 중간 정산이 커밋한 값을 읽습니다.
+                credited_until = self.voice_sessions.pop(user_id, None)
+                await self.bot.db.voice_sessions.end_session(user_id)
+                if credited_until:
+                    duration = int((now - credited_until).total_seconds())
+                    if duration > 0:
+                        await self.bot.db.users.log_voice_activity(user_id, duration)
+
+    async def _checkpoint_voice_sessions(self):
+        """진행 중인 음성 세션의 누적 시간을 daily_activity에 중간 정산합니다."""
+        if not self.voice_sessions:
+            return
+
+        # 메모리의 기준 시각은 항상 마지막으로 커밋된 정산 시각입니다.
+        # 퇴장 처리도 트랜잭션 락을 잡은 뒤에 기준 시각을 읽으므로, 여기서도 락 안에서 읽고 커밋된 뒤에만 옮깁니다.
+        # (정산이 롤백되면 기준 시각이 그대로 남아 퇴장 시 그 시간까지 함께 정산됩니다)
+        advanced = {}
+        async with self.bot.db.transaction():
+            now = datetime.datetime.now(datetime.timezone.utc)
+            snapshot = dict(self.voice_sessions)
+            for user_id, credited_until in snapshot.items():
+                duration = int((now - credited_until).total_seconds())
                 if duration > 0:
+                    advanced[user_id] = credited_until + datetime.timedelta(seconds=duration)
                     await self.bot.db.users.log_voice_activity(user_id, duration)
+            await self.bot.db.voice_sessions.checkpoint_sessions(
+                {user_id: until.isoformat() for user_id, until in advanced.items()}
+            )
+
+        # 정산 중에 퇴장 후 재입장한 유저는 새 세션이므로 건드리지 않습니다.
+        for user_id, until in advanced.items():
+            if self.voice_sessions.get(user_id) == snapshot[user_id]:
+                self.voice_sessions[user_id] = until
+
+    async def _rebuild_voice_sessions(self, guild: discord.Guild):
+        """
+        현재 길드의 음성 상태로 세션을 다시 구성합니다.
+        재시작 전 세션은 DB에 저장된 마지막 정산 시각(credited_until)까지 기록되어 있으므로,
+        지금도 음성 채널에 있는 멤버에게는 그 이후 시간을 정산 간격만큼까지 인정하고 현재 시각부터 새로 추적합니다.
+        (봇이 꺼져 있던 동안 계속 음성 채널에 있었는지는 알 수 없으므로 상한을 둡니다)
+        """
+        await self._checkpoint_voice_sessions()
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        max_credit = self.VOICE_CHECKPOINT_MINUTES * 60
+        members = [m for channel in guild.voice_channels + guild.stage_channels for m in channel.members if not m.bot]
+        persisted = await self.bot.db.voice_sessions.get_all_sessions()
+        recovered = 0
+        async with self.bot.db.transaction():
+            for member in members:
+                await self.bot.db.users.get_or_create_user(member.id, member.display_name)
+                credited_until = persisted.get(member.id)
+                if credited_until:
+                    duration = int((now - datetime.datetime.fromisoformat(credited_until)).total_seconds())
+                    if duration > 0:
+                        await self.bot.db.users.log_voice_activity(member.id, min(duration, max_credit))
+                        recovered += 1
+            await self.bot.db.voice_sessions.replace_all_sessions({m.id: now.isoformat() for m in members})
+        self.voice_sessions = {m.id: now for m in members}
+        print(f"[Voice] 현재 음성 채널에 있는 {len(members)}명의 세션을 복구했습니다. ({recovered}명 미정산 시간 반영)")
+
+    def _schedule_role_expiry(self, temp_role: TemporaryRole):
+        expires_at = datetime.datetime.fromisoformat(temp_role.expires_at)
+        self.role_expiries.push((temp_role.user_id, temp_role.role_id), expires_at)
+
+    @commands.Cog.listener()
+    async def on_temporary_role_updated(self, temp_role: TemporaryRole):
+        # 상점에서 기간제 역할을 구매(연장)하면 ShopCog가 dispatch합니다.
+        self._schedule_role_expiry(temp_role)
+
+    async def _expire_temporary_roles(self):
+        """다음 만료 시각까지 잠들었다가, 만료된 기간제 역할을 회수합니다."""
+        await self.bot.wait_until_ready()
+        while True:
+            expired = await self.role_expiries.wait_due()
+            try:
+                await self._remove_expired_roles(expired)
+            except Exception as e:
+                print(f"[TempRole] 만료 역할 처리 중 오류 발생: {e}")
 
-    @tasks.loop(hours=1)
-    async def check_expired_roles(self):
+    async def _remove_expired_roles(self, expired: List[Tuple[int, int]]):
         now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        expired_roles = await self.bot.db.shop.get_expired_roles(now_iso)
-        if not expired_roles: return
+        guild = self.bot.get_guild(self.bot.guild_id)
+        if guild:
+            semaphore = asyncio.Semaphore(self.ROLE_REMOVAL_CONCURRENCY)
+
+            async def remove(user_id: int, role_id: int):
+                member = guild.get_member(user_id)
+                role = guild.get_role(role_id)
+                if not member or not role or role not in member.roles:
+                    return
+                async with semaphore:
+                    # 처리 중에 역할을 다시 구매(연장)했다면 회수하지 않습니다.
+                    # 연장 이벤트가 먼저 도착했으면 메모리의 만료 일정으로, 아니면 DB의 만료 시각으로 확인합니다.
+                    if self.role_expiries.get((user_id, role_id)) is not None:
+                        return
+                    temp_role = await self.bot.db.shop.get_temporary_role(user_id, role_id)
+                    if temp_role and temp_role.expires_at > now_iso:
+                        return
+                    try:
+                        await member.remove_roles(role, reason="기간 만료")
+                    except discord.HTTPException as e:
+                        print(f"Failed to remove role {role.id}: {e}")
+
+            await asyncio.gather(*(remove(user_id, role_id) for user_id, role_id in expired))
+
+        await self.bot.db.shop.remove_expired_temporary_roles(expired, now_iso)
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 봇이 꺼져 있던 동안의 입장/퇴장을 반영하기 위해 길드 멤버 목록과 재적 여부를 일괄 동기화합니다.
         guild = self.bot.get_guild(self.bot.guild_id)
-        if not guild: return
-
-        removed_ids = []
-        for temp_role in expired_roles:
-            member = guild.get_member(temp_role.user_id)
-            role = guild.get_role(temp_role.role_id)
-            if member and role:
-                try:
-                    await member.remove_roles(role, reason="기간 만료")
-                except discord.HTTPException as e:
-                    print(f"Failed to remove role {role.id}: {e}")
-            removed_ids.append(temp_role.id)
-
-        if removed_ids:
-            await self.bot.db.shop.remove_temporary_roles_by_ids(removed_ids)
-
-    @check_expired_roles.before_loop
-    async def before_check_roles(self):
-        await self.bot.wait_until_ready()
+        if not guild:
+            return
+        await self.bot.db.users.sync_guild_members([m.id for m in guild.members if not m.bot])
+        print(f"[Members] {guild.member_count}명의 길드 멤버 정보를 동기화했습니다.")
+        await self._rebuild_voice_sessions(guild)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -90,6 +199,7 @@ class EventCog(commands.Cog):
         user = await self.bot.db.users.get_user(member.id)
 
         if user:
+            await self.bot.db.users.set_guild_membership(member.id, True)
             try:
                 await member.edit(nick=user.display_name)
             except discord.Forbidden:
@@ -109,6 +219,12 @@ class EventCog(commands.Cog):
 
         await self.bot.db.users.get_or_create_user(member.id, display_name)
 
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        if member.guild.id != self.bot.guild_id:
+            return
+        await self.bot.db.users.set_guild_membership(member.id, False)
+
 
 async def setup(bot: OverwatchBot):
     await bot.add_cog(EventCog(bot))
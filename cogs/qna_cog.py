@@ -1,16 +1,40 @@
+import asyncio
+
 import discord
 from discord import app_commands, Interaction, TextChannel, Embed
 from discord.ext import commands
-from typing import Optional
+from typing import Optional, Dict
 
 from core.overwatch_bot import OverwatchBot
 from core.local.repository.qna_repository import QnaRepository
+from core.model.qna_models import QnaChannel
 
 
 class QnaCog(commands.Cog):
+    REPOST_DELAY = 5.0  # 채널이 이 시간(초) 동안 조용해지면 고정 메시지를 다시 올립니다.
+
     def __init__(self, bot: OverwatchBot):
         self.bot = bot
         self.qna_repo: QnaRepository = self.bot.db.qna
+        self.channels: Dict[int, QnaChannel] = {}  # 등록된 질문 채널 캐시 {channel_id: QnaChannel}
+        self.last_message_ids: Dict[int, Optional[int]] = {}  # 게이트웨이 이벤트로 추적한 채널별 마지막 메시지 ID
+        self._repost_deadlines: Dict[int, float] = {}
+        self._repost_tasks: Dict[int, asyncio.Task] = {}
+
+    async def cog_load(self):
+        """등록된 질문 채널과 고정 메시지 정보를 메모리에 불러옵니다."""
+        self.channels = {c.channel_id: c for c in await self.qna_repo.get_all_channels()}
+        print(f"[QnA] {len(self.channels)}개의 질문 채널 정보를 DB에서 불러왔습니다.")
+
+    def cog_unload(self):
+        for task in self._repost_tasks.values():
+            task.cancel()
+
+    async def _set_pinned_message(self, qna_channel: QnaChannel, message_id: int, title: str, content: str):
+        await self.qna_repo.update_pinned_message(qna_channel.channel_id, message_id, title, content)
+        qna_channel.pinned_message_id = message_id
+        qna_channel.pinned_title = title
+        qna_channel.pinned_content = content
 
     qna_command = app_commands.Group(name="질문", description="스레드를 생성해 Q&A를 편리하게 도와줍니다.",
                                     default_permissions=discord.Permissions(administrator=True))
@@ -19,11 +43,10 @@ class QnaCog(commands.Cog):
     @app_commands.describe(channel="질문 채널로 지정할 텍스트 채널")
     @app_commands.checks.has_permissions(manage_messages=True)
     async def register_qna_channel(self, interaction: Interaction, channel: TextChannel):
-        existing = await self.qna_repo.get_channel_by_id(channel.id)
-        if existing:
+        if channel.id in self.channels:
             return await interaction.response.send_message(f"{channel.mention} 채널은 이미 질문 채널로 등록되어 있습니다.", ephemeral=True)
 
-        await self.qna_repo.add_channel(channel.id, interaction.guild.id)
+        self.channels[channel.id] = await self.qna_repo.add_channel(channel.id, interaction.guild.id)
         await interaction.response.send_message(f"{channel.mention} 채널을 질문 채널로 등록했습니다.", ephemeral=True)
 
     @qna_command.command(name="채널해제", description="해당 채널의 질문 자동화 기능을 비활성화합니다.")
@@ -31,6 +54,7 @@ class QnaCog(commands.Cog):
     @app_commands.checks.has_permissions(manage_messages=True)
     async def unregister_qna_channel(self, interaction: Interaction, channel: TextChannel):
         removed = await self.qna_repo.remove_channel(channel.id)
+        self.channels.pop(channel.id, None)
         if removed:
             await interaction.response.send_message(f"{channel.mention} 채널을 질문 채널에서 해제했습니다.", ephemeral=True)
         else:
@@ -40,7 +64,7 @@ class QnaCog(commands.Cog):
     @app_commands.describe(channel="고정 메시지를 설정할 채널", title="메시지 제목", content="메시지 내용")
     @app_commands.checks.has_permissions(manage_messages=True)
     async def set_pinned_message(self, interaction: Interaction, channel: TextChannel, title: str, content: str):
-        qna_channel = await self.qna_repo.get_channel_by_id(channel.id)
+        qna_channel = self.channels.get(channel.id)
         if not qna_channel:
             return await interaction.response.send_message(f"{channel.mention} 채널은 질문 채널로 먼저 등록해야 합니다.", ephemeral=True)
 
@@ -54,15 +78,16 @@ class QnaCog(commands.Cog):
 
         embed = Embed(title=title, description=content, color=discord.Color.blue())
         new_message = await channel.send(embed=embed)
+        self.last_message_ids[channel.id] = new_message.id
 
-        await self.qna_repo.update_pinned_message(channel.id, new_message.id, title, content)
+        await self._set_pinned_message(qna_channel, new_message.id, title, content)
         await interaction.response.send_message(f"{channel.mention} 채널에 고정 메시지를 설정했습니다.", ephemeral=True)
 
     @qna_command.command(name="고정삭제", description="고정 안내 메시지를 제거합니다.")
     @app_commands.describe(channel="고정 메시지를 삭제할 채널")
     @app_commands.checks.has_permissions(manage_messages=True)
     async def delete_pinned_message(self, interaction: Interaction, channel: TextChannel):
-        qna_channel = await self.qna_repo.get_channel_by_id(channel.id)
+        qna_channel = self.channels.get(channel.id)
         if not qna_channel or not qna_channel.pinned_message_id:
             return await interaction.response.send_message(f"{channel.mention} 채널에 설정된 고정 메시지가 없습니다.", ephemeral=True)
 
@@ -73,20 +98,73 @@ class QnaCog(commands.Cog):
             pass  # Message already deleted
 
         await self.qna_repo.remove_pinned_message(channel.id)
+        qna_channel.pinned_message_id = None
+        qna_channel.pinned_title = None
+        qna_channel.pinned_content = None
         await interaction.response.send_message(f"{channel.mention} 채널의 고정 메시지를 삭제했습니다.", ephemeral=True)
 
 
+    def _schedule_repost(self, channel: discord.TextChannel):
+        """
+        고정 메시지 재게시를 채널별로 디바운스합니다.
+        메시지가 올 때마다 마감 시각만 뒤로 미루므로, 연속된 질문이 끝난 뒤 한 번만 재게시됩니다.
+        """
+        self._repost_deadlines[channel.id] = asyncio.get_running_loop().time() + self.REPOST_DELAY
+        task = self._repost_tasks.get(channel.id)
+        if task is None or task.done():
+            self._repost_tasks[channel.id] = asyncio.create_task(self._repost_when_quiet(channel))
+
+    async def _repost_when_quiet(self, channel: discord.TextChannel):
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self._repost_deadlines.get(channel.id, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            qna_channel = self.channels.get(channel.id)
+            if not qna_channel or not qna_channel.pinned_title:
+                return
+            # 마지막 메시지가 이미 고정 메시지라면 다시 올릴 필요가 없습니다.
+            if self.last_message_ids.get(channel.id) == qna_channel.pinned_message_id:
+                return
+
+            try:
+                await self._repost_pinned_message(channel, qna_channel)
+            except discord.HTTPException as e:
+                print(f"[QnA] 고정 메시지 재게시 실패 (채널 ID: {channel.id}): {e}")
+                return
+            # 재게시하는 동안 새 메시지가 왔다면 마감 시각이 미뤄졌으므로 루프를 한 번 더 돕니다.
+
+    async def _repost_pinned_message(self, channel: discord.TextChannel, qna_channel: QnaChannel):
+        old_message_id = qna_channel.pinned_message_id
+        embed = Embed(title=qna_channel.pinned_title, description=qna_channel.pinned_content, color=discord.Color.blue())
+        new_msg = await channel.send(embed=embed)
+        self.last_message_ids[channel.id] = new_msg.id
+        await self._set_pinned_message(qna_channel, new_msg.id, qna_channel.pinned_title, qna_channel.pinned_content)
+
+        # 새 메시지를 먼저 올린 뒤 이전 메시지를 지우므로, 삭제 이벤트가 재게시를 다시 유발하지 않습니다.
+        if old_message_id:
+            try:
+                await channel.get_partial_message(old_message_id).delete()
+            except discord.NotFound:
+                pass  # Message already deleted
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot:
+        if message.guild is None or message.guild.id != self.bot.guild_id:
             return
 
-        if message.guild is None or message.guild.id != self.bot.guild_id:
+        # 봇 메시지를 포함한 모든 메시지로 질문 채널의 마지막 메시지를 추적합니다.
+        if message.channel.id in self.channels:
+            self.last_message_ids[message.channel.id] = message.id
+
+        if message.author.bot:
             return
 
         # Case 1: Message is in a thread within a QnA channel
         if isinstance(message.channel, discord.Thread):
-            qna_channel = await self.qna_repo.get_channel_by_id(message.channel.parent_id)
+            qna_channel = self.channels.get(message.channel.parent_id)
             if qna_channel:
                 if message.content == "!해결":
                     is_author = message.author.id == message.channel.owner_id
@@ -100,51 +178,35 @@ class QnaCog(commands.Cog):
                 return # Stop processing after handling thread command
 
         # Case 2: Message is in a QnA channel
-        qna_channel = await self.qna_repo.get_channel_by_id(message.channel.id)
+        qna_channel = self.channels.get(message.channel.id)
         if not qna_channel:
             return
 
-        # Repost pinned message if needed
+        # Repost pinned message once the channel goes quiet
         if qna_channel.pinned_message_id and qna_channel.pinned_title:
-            try:
-                # Check if the last message is the pinned one
-                async for last_message in message.channel.history(limit=1):
-                    if last_message.id != qna_channel.pinned_message_id:
-                        # If not, delete old and repost
-                        old_msg = await message.channel.fetch_message(qna_channel.pinned_message_id)
-                        await old_msg.delete()
-                        embed = Embed(title=qna_channel.pinned_title, description=qna_channel.pinned_content, color=discord.Color.blue())
-                        new_msg = await message.channel.send(embed=embed)
-                        await self.qna_repo.update_pinned_message(message.channel.id, new_msg.id, qna_channel.pinned_title, qna_channel.pinned_content)
-            except (discord.NotFound, discord.Forbidden):
-                # Pinned message was deleted manually, just repost
-                embed = Embed(title=qna_channel.pinned_title, description=qna_channel.pinned_content, color=discord.Color.blue())
-                new_msg = await message.channel.send(embed=embed)
-                await self.qna_repo.update_pinned_message(message.channel.id, new_msg.id, qna_channel.pinned_title, qna_channel.pinned_content)
+            self._schedule_repost(message.channel)
 
         # Create a thread for the user's question
-        # To prevent creating a thread for the bot's own pinned message repost
-        if message.author.id != self.bot.user.id:
-            thread = await message.create_thread(name=f"[{message.author.display_name}]님의 디코 질문")
-            await thread.send("✅ 질문이 등록되었습니다!\n해결되었다면 `!해결` 명령어를 사용해 질문을 닫아주세요.")
+        thread = await message.create_thread(name=f"[{message.author.display_name}]님의 디코 질문")
+        await thread.send("✅ 질문이 등록되었습니다!\n해결되었다면 `!해결` 명령어를 사용해 질문을 닫아주세요.")
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
-        if message.author.bot:
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id != self.bot.guild_id:
             return
 
-        if message.guild is None or message.guild.id != self.bot.guild_id:
+        qna_channel = self.channels.get(payload.channel_id)
+        if not qna_channel:
             return
 
-        qna_channel = await self.qna_repo.get_channel_by_id(message.channel.id)
-        if qna_channel and qna_channel.pinned_message_id == message.id:
-            # Pinned message was deleted, repost it.
-            try:
-                embed = Embed(title=qna_channel.pinned_title, description=qna_channel.pinned_content, color=discord.Color.blue())
-                new_msg = await message.channel.send(embed=embed)
-                await self.qna_repo.update_pinned_message(message.channel.id, new_msg.id, qna_channel.pinned_title, qna_channel.pinned_content)
-            except discord.Forbidden:
-                pass # Can't send message, probably permissions issue
+        if self.last_message_ids.get(payload.channel_id) == payload.message_id:
+            self.last_message_ids[payload.channel_id] = None
+
+        if qna_channel.pinned_message_id == payload.message_id and qna_channel.pinned_title:
+            # Pinned message was deleted manually, repost it.
+            channel = self.bot.get_channel(payload.channel_id)
+            if channel:
+                self._schedule_repost(channel)
 
 
 async def setup(bot: OverwatchBot):
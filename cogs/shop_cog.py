@@ -6,6 +6,7 @@ from discord.ext import commands
 import datetime
 
 from core import OverwatchBot
+from core.model import LedgerReason
 from core.utiles import money_to_string
 from view import ShopView, NicknameChangeModal
 import os
@@ -40,11 +41,16 @@ class ShopCog(commands.Cog, name="상점"):
         if user.balance < item.price:
             return await interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
 
-        # 구매 처리
-        await self.bot.db.users.update_balance(user.user_id, -item.price)
-
+        # 구매 처리: 재화 차감은 잔고 조건부(try_debit)로 실행하여, 동시에 여러 번 구매해도 잔고가 음수가 되지 않습니다.
         if item.item_type == "ITEM":
-            await self.bot.db.shop.add_to_inventory(user.user_id, item.id)
+            async with self.bot.db.transaction():
+                if await self.bot.db.users.try_debit(user.user_id, item.price, LedgerReason.PURCHASE, ref_id=item.id) is not None:
+                    await self.bot.db.shop.add_to_inventory(user.user_id, item.id)
+                    purchased = True
+                else:
+                    purchased = False
+            if not purchased:
+                return await interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
             message = f"아이템 **{item.name}**을(를) 구매하여 인벤토리에 추가했습니다."
             await interaction.response.send_message(message, ephemeral=True)
             await self.log_purchase(interaction.user, item.name, item.price)
@@ -52,37 +58,58 @@ class ShopCog(commands.Cog, name="상점"):
         elif item.item_type == "ROLE":
             role = interaction.guild.get_role(item.role_id)
             if not role:
-                await self.bot.db.users.update_balance(user.user_id, item.price)
                 return await interaction.response.send_message("역할을 찾을 수 없어 구매를 취소합니다.", ephemeral=True)
 
+            # 재화를 먼저 차감하고, 역할 부여(REST 호출)는 트랜잭션 밖에서 실행하여 쓰기 락을 오래 잡지 않도록 합니다.
+            if await self.bot.db.users.try_debit(user.user_id, item.price, LedgerReason.PURCHASE, ref_id=item.id) is None:
+                return await interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
             try:
                 await interaction.user.add_roles(role)
             except discord.Forbidden:
-                await self.bot.db.users.update_balance(user.user_id, item.price)
+                # 역할 부여에 실패하면 차감한 재화를 돌려줍니다.
+                await self.bot.db.users.update_balance(user.user_id, item.price, LedgerReason.REFUND, ref_id=item.id)
                 return await interaction.response.send_message("역할을 부여할 권한이 없습니다.", ephemeral=True)
 
             message = f"역할 **{role.name}**을(를) 구매하여 부여받았습니다."
+            temp_role = None
             if item.duration_days and item.duration_days > 0:
-                expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=item.duration_days)
-                await self.bot.db.shop.add_temporary_role(user.user_id, role.id, expires_at.isoformat())
-                message += f"\n이 역할은 **{item.duration_days}일** 후에 만료됩니다."
+                # 이미 보유 중인 기간제 역할이면 남은 기간에 이어서 연장됩니다.
+                temp_role = await self.bot.db.shop.add_temporary_role(
+                    user.user_id, role.id, datetime.timedelta(days=item.duration_days)
+                )
+            if temp_role:
+                expires_at = datetime.datetime.fromisoformat(temp_role.expires_at)
+                message += f"\n이 역할은 {discord.utils.format_dt(expires_at, 'F')}에 만료됩니다."
+                # EventCog의 만료 스케줄러에 새 만료 시간을 알립니다.
+                self.bot.dispatch("temporary_role_updated", temp_role)
             await interaction.response.send_message(message, ephemeral=True)
             await self.log_purchase(interaction.user, role.name, item.price)
 
         elif item.item_type == "NICKNAME_CHANGE":
 
             async def nickname_callback(modal_interaction, new_nickname):
+                # 닉네임 변경에 성공한 경우에만 재화를 차감합니다.
+                old_nickname = modal_interaction.user.nick
                 try:
                     await modal_interaction.user.edit(nick=new_nickname)
-                    await self.bot.db.users.update_display_name(user.user_id, new_nickname)
-                    await modal_interaction.response.send_message(f"닉네임을 성공적으로 '{new_nickname}'(으)로 변경했습니다.", ephemeral=True)
-                    await self.log_purchase(modal_interaction.user, "닉네임 변경권", item.price)
                 except discord.Forbidden:
-                    await self.bot.db.users.update_balance(user.user_id, item.price)  # 롤백
-                    await modal_interaction.response.send_message("닉네임을 변경할 권한이 없습니다.", ephemeral=True)
+                    return await modal_interaction.response.send_message("닉네임을 변경할 권한이 없습니다.", ephemeral=True)
                 except discord.HTTPException as e:
-                    await self.bot.db.users.update_balance(user.user_id, item.price)  # 롤백
-                    await modal_interaction.response.send_message(f"닉네임 변경 중 오류가 발생했습니다: {e}", ephemeral=True)
+                    return await modal_interaction.response.send_message(f"닉네임 변경 중 오류가 발생했습니다: {e}", ephemeral=True)
+
+                async with self.bot.db.transaction():
+                    debited = await self.bot.db.users.try_debit(user.user_id, item.price, LedgerReason.PURCHASE, ref_id=item.id) is not None
+                    if debited:
+                        await self.bot.db.users.update_display_name(user.user_id, new_nickname)
+                if not debited:
+                    # 모달을 입력하는 동안 잔고가 줄어든 경우 닉네임을 되돌립니다.
+                    try:
+                        await modal_interaction.user.edit(nick=old_nickname)
+                    except discord.HTTPException:
+                        pass
+                    return await modal_interaction.response.send_message("잔고가 부족합니다.", ephemeral=True)
+                await modal_interaction.response.send_message(f"닉네임을 성공적으로 '{new_nickname}'(으)로 변경했습니다.", ephemeral=True)
+                await self.log_purchase(modal_interaction.user, "닉네임 변경권", item.price)
 
             modal = NicknameChangeModal(nickname_callback)
             await interaction.response.send_modal(modal)
@@ -0,0 +1,78 @@
+import time
+import types
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional
+
+
+@dataclass
+class ExtensionTiming:
+    name: str
+    wall: float = 0.0             # load_extension 시작부터 끝까지의 시간 (초). 같은 단계의 다른 Cog 실행 시간이 섞입니다.
+    active: float = 0.0           # 이 확장의 코드가 실제로 실행된 시간 (다른 태스크에 양보한 동안은 제외)
+    cog_load: float = 0.0         # add_cog(cog_load 포함)의 시작부터 끝까지의 시간. await한 DB I/O를 포함하며, 대기 중 실행된 같은 단계 Cog의 시간이 섞일 수 있습니다.
+    cog_load_active: float = 0.0  # active 중 add_cog에 쓴 시간
+    error: Optional[str] = None
+
+    @property
+    def import_and_setup(self) -> float:
+        """모듈 import와 setup() 본문에 쓴 시간 (active에서 add_cog 부분을 뺀 값, 다른 Cog의 영향을 받지 않습니다)"""
+        return max(self.active - self.cog_load_active, 0.0)
+
+    @property
+    def cost(self) -> float:
+        """시작 시간에 대한 이 확장의 부담: import/setup 실행 시간 + cog_load 시간(I/O 대기 포함)"""
+        return self.import_and_setup + self.cog_load
+
+
+@types.coroutine
+def measure_active(coro: Coroutine[Any, Any, Any], record: Callable[[float], None]):
+    """
+    코루틴을 대신 구동하면서 한 단계(send/throw)마다 걸린 시간을 `record`로 넘깁니다.
+    await로 양보한 동안 다른 태스크가 실행한 시간은 포함되지 않으므로, asyncio.gather로 동시에 실행해도
+    코루틴 자신이 이벤트 루프를 점유한 시간만 잴 수 있습니다. (I/O 대기 시간은 포함되지 않습니다)
+    """
+    value, error = None, None
+    while True:
+        start = time.perf_counter()
+        try:
+            future = coro.throw(error) if error is not None else coro.send(value)
+        except StopIteration as e:
+            record(time.perf_counter() - start)
+            return e.value
+        except BaseException:
+            record(time.perf_counter() - start)
+            raise
+        record(time.perf_counter() - start)
+
+        try:
+            value, error = (yield future), None
+        except GeneratorExit:
+            coro.close()
+            raise
+        except BaseException as e:
+            value, error = None, e
+
+
+def load_levels(names: Iterable[str], dependencies: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    의존성을 위상 정렬하여 단계별 확장 목록을 반환합니다. 같은 단계의 확장끼리는 서로 의존하지 않으므로 동시에 로드할 수 있습니다.
+    존재하지 않는 확장에 의존하거나 순환 의존이 있으면 ValueError를 발생시킵니다.
+    """
+    names = sorted(names)
+    remaining = {name: set(dependencies.get(name, ())) for name in names}
+    for name, deps in remaining.items():
+        missing = deps.difference(remaining)
+        if missing:
+            raise ValueError(f"{name}이(가) 존재하지 않는 확장에 의존합니다: {', '.join(sorted(missing))}")
+
+    levels: List[List[str]] = []
+    while remaining:
+        level = [name for name, deps in remaining.items() if not deps]
+        if not level:
+            raise ValueError(f"확장 간 순환 의존이 있습니다: {', '.join(sorted(remaining))}")
+        levels.append(level)
+        for name in level:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(level)
+    return levels
@@ -0,0 +1,180 @@
+"""
+노동, 사다리타기, 슬롯머신의 배당표와 표본 추출, 오프라인 몬테카를로 시뮬레이터입니다.
+
+배당표는 데이터로 정의되며, 결과는 누적 가중치에 대한 이분 탐색(bisect)으로 뽑습니다.
+확률을 바꿀 때는 아래 표만 수정하고, 운영 반영 전에 시뮬레이터로 기대값을 확인합니다.
+
+    python -m core.game_odds --plays 20000000 --bet 1000
+
+시뮬레이터는 NumPy가 설치된 경우에만 동작합니다. (pip install -r requirements-dev.txt, 봇 실행에는 필요하지 않습니다)
+"""
+import argparse
+import bisect
+import itertools
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 시뮬레이터 전용 선택 의존성
+    np = None
+
+
+@dataclass(frozen=True)
+class Outcome:
+    label: str
+    weight: float                               # 상대 가중치 (합이 100일 필요는 없습니다)
+    multiplier: float = 0.0                     # 베팅 게임: 베팅금 대비 지급액 (원금 포함)
+    amount: Optional[Tuple[int, int]] = None    # 노동: 지급액 범위 [최소, 최대]
+    symbol: Optional[str] = None                # 슬롯머신: 결과로 보여줄 이모지 키
+
+
+class PayoutTable:
+    def __init__(self, name: str, outcomes: Sequence[Outcome]):
+        self.name = name
+        self.outcomes: Tuple[Outcome, ...] = tuple(outcomes)
+        self.cumulative: List[float] = list(itertools.accumulate(o.weight for o in self.outcomes))
+        self.total = self.cumulative[-1]
+
+    def sample(self, rng: random.Random = random) -> Outcome:
+        """누적 가중치에서 이분 탐색으로 결과 하나를 뽑습니다."""
+        return self.outcomes[bisect.bisect_right(self.cumulative, rng.random() * self.total)]
+
+    def sample_amount(self, rng: random.Random = random) -> Tuple[Outcome, int]:
+        """지급액 범위가 있는 표(노동)에서 결과와 지급액을 뽑습니다."""
+        outcome = self.sample(rng)
+        low, high = outcome.amount
+        return outcome, rng.randint(low, high)
+
+    def probability(self, outcome: Outcome) -> float:
+        return outcome.weight / self.total
+
+    @property
+    def expected_multiplier(self) -> float:
+        """베팅금 1당 기대 지급액 (원금 포함). 1보다 작으면 그만큼이 하우스 엣지입니다."""
+        return sum(o.weight * o.multiplier for o in self.outcomes) / self.total
+
+    @property
+    def expected_amount(self) -> float:
+        """노동 1회 기대 지급액 (randint의 양 끝을 포함한 균등 분포 기준)"""
+        return sum(o.weight * (o.amount[0] + o.amount[1]) / 2 for o in self.outcomes) / self.total
+
+
+LABOR_TABLE = PayoutTable("labor", [
+    Outcome("0~10", 49.99999, amount=(0, 10)),
+    Outcome("10~30", 30, amount=(10, 30)),
+    Outcome("30~50", 13, amount=(30, 50)),
+    Outcome("50~100", 5, amount=(50, 100)),
+    Outcome("100~500", 1.5, amount=(100, 500)),
+    Outcome("500~1000", 0.5, amount=(500, 1000)),
+    Outcome("1000~10000", 0.00001, amount=(1000, 10000)),
+])
+
+# 세 위치 중 하나를 맞히면 베팅금의 2배를 추가로 받습니다. (원금 포함 3배)
+LADDER_TABLE = PayoutTable("ladder", [
+    Outcome("lose", 2),
+    Outcome("win", 1, multiplier=3),
+])
+
+SLOT_TABLE = PayoutTable("slot_machine", [
+    Outcome("꽝", 80),
+    Outcome("메달", 10, multiplier=2, symbol="메달"),
+    Outcome("보석", 5, multiplier=3, symbol="보석"),
+    Outcome("달러", 2.5, multiplier=5, symbol="달러"),
+    Outcome("주머니", 2, multiplier=7, symbol="주머니"),
+    Outcome("100", 0.5, multiplier=10, symbol="100"),
+])
+
+# 게임 이름 -> (배당표, 쿨타임(시간)). 쿨타임은 EconomyCog와 같아야 합니다.
+GAMES = {
+    "labor": (LABOR_TABLE, 1),
+    "ladder": (LADDER_TABLE, 2),
+    "slot_machine": (SLOT_TABLE, 2),
+}
+
+
+@dataclass
+class SimulationResult:
+    game: str
+    plays: int
+    bet: int
+    mean_net: float            # 1회당 평균 재화 증감 (유저 기준)
+    variance: float            # 1회당 재화 증감의 분산
+    house_edge: Optional[float]  # 베팅 게임만: 1 - 평균 지급액 / 베팅금
+    money_per_hour: float      # 쿨타임마다 플레이하는 유저 1명이 시간당 만들어내는(음수면 소각하는) 재화
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+
+def simulate(table: PayoutTable, plays: int, bet: int = 1000, cooldown_hours: float = 1.0,
+             seed: Optional[int] = None, chunk_size: int = 1_000_000) -> SimulationResult:
+    """
+    배당표를 `plays`회 벡터 연산으로 시뮬레이션합니다. 메모리 사용량은 `chunk_size`에 비례합니다.
+    노동처럼 지급액 범위가 있는 표는 `bet`을 무시하고 지급액 그대로를 증감으로 봅니다.
+    """
+    if np is None:
+        raise RuntimeError("시뮬레이터를 사용하려면 numpy를 설치해야 합니다. (pip install -r requirements-dev.txt)")
+
+    rng = np.random.default_rng(seed)
+    cumulative = np.asarray(table.cumulative, dtype=np.float64)
+    is_labor = table.outcomes[0].amount is not None
+    if is_labor:
+        lows = np.array([o.amount[0] for o in table.outcomes], dtype=np.int64)
+        spans = np.array([o.amount[1] - o.amount[0] + 1 for o in table.outcomes], dtype=np.int64)
+    else:
+        payouts = np.array([int(bet * o.multiplier) for o in table.outcomes], dtype=np.int64)
+
+    total = 0.0
+    total_sq = 0.0
+    remaining = plays
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        # PayoutTable.sample과 같은 방식: 누적 가중치에 대한 이분 탐색
+        index = np.searchsorted(cumulative, rng.random(n) * table.total, side="right")
+        if is_labor:
+            net = lows[index] + (rng.random(n) * spans[index]).astype(np.int64)
+        else:
+            net = payouts[index] - bet
+        net = net.astype(np.float64)
+        total += net.sum()
+        total_sq += np.square(net).sum()
+        remaining -= n
+
+    mean = total / plays
+    variance = total_sq / plays - mean * mean
+    return SimulationResult(
+        game=table.name,
+        plays=plays,
+        bet=bet,
+        mean_net=mean,
+        variance=variance,
+        house_edge=None if is_labor else -mean / bet,
+        money_per_hour=mean / cooldown_hours,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="게임 배당표 몬테카를로 시뮬레이터")
+    parser.add_argument("--plays", type=int, default=10_000_000, help="게임별 시뮬레이션 횟수")
+    parser.add_argument("--bet", type=int, default=1000, help="베팅 게임의 베팅금")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--game", choices=sorted(GAMES), action="append", help="시뮬레이션할 게임 (기본: 전체)")
+    args = parser.parse_args()
+
+    for name in args.game or GAMES:
+        table, cooldown_hours = GAMES[name]
+        analytic = (f"기대 지급액 {table.expected_amount:.3f}" if table.outcomes[0].amount
+                    else f"기대 배율 {table.expected_multiplier:.4f}")
+        result = simulate(table, args.plays, bet=args.bet, cooldown_hours=cooldown_hours, seed=args.seed)
+        print(f"[{result.game}] {result.plays:,}회 ({analytic})")
+        print(f"  1회 평균 증감: {result.mean_net:+.3f}  표준편차: {result.std:.3f}  분산: {result.variance:.1f}")
+        if result.house_edge is not None:
+            print(f"  하우스 엣지: {result.house_edge:.3%}")
+        print(f"  유저 1명당 시간당 재화 증감: {result.money_per_hour:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
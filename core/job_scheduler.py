@@ -0,0 +1,199 @@
+import asyncio
+import datetime
+import inspect
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.local.repository.job_repository import JobRepository
+from core.model import JobRecord
+
+UTC = datetime.timezone.utc
+
+
+class Interval:
+    """`seconds`초마다 실행되는 주기입니다."""
+
+    def __init__(self, *, seconds: float = 0, minutes: float = 0, hours: float = 0):
+        self.delta = datetime.timedelta(seconds=seconds, minutes=minutes, hours=hours)
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        return dt + self.delta
+
+    def __str__(self) -> str:
+        return f"every {self.delta.total_seconds():g}s"
+
+
+class Daily:
+    """매일 지정한 시각(타임존 포함)에 실행되는 주기입니다."""
+
+    def __init__(self, at: datetime.time):
+        if at.tzinfo is None:
+            raise ValueError("Daily 작업의 시각에는 tzinfo가 필요합니다.")
+        self.at = at
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        local = dt.astimezone(self.at.tzinfo)
+        candidate = datetime.datetime.combine(local.date(), self.at.replace(tzinfo=None), tzinfo=self.at.tzinfo)
+        if candidate <= local:
+            candidate += datetime.timedelta(days=1)
+        return candidate.astimezone(UTC)
+
+    def __str__(self) -> str:
+        return f"daily {self.at.strftime('%H:%M%z')}"
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: "Interval | Daily"
+    callback: Callable[..., Awaitable[None]]
+    next_run_at: datetime.datetime
+    record: JobRecord
+    pass_due_at: bool = False  # 콜백이 `due_at` 인자를 받으면 실행 대상 예정 시각을 넘겨줍니다.
+    running: bool = False
+    runs: int = 0
+    durations: List[float] = field(default_factory=list)  # 최근 실행 소요 시간 (초)
+
+
+class JobScheduler:
+    """
+    모든 주기 작업을 하나의 태스크에서 실행하는 스케줄러입니다.
+
+    작업별 마지막 실행 시각은 `scheduled_jobs` 테이블에 저장되며, 다음 실행 시각은
+    마지막 실행 시각을 기준으로 계산합니다. 따라서 봇이 꺼져 있던 동안 놓친 작업은
+    시작 직후 한 번만(가장 최근에 놓친 예정 시각으로) 실행됩니다. 스케줄러는 가장 빠른 다음 실행 시각까지만 잠듭니다.
+    다음 실행 시각은 실제 실행 시각이 아니라 예정 시각을 기준으로 계산하므로, 놓친 작업을 따라잡아도
+    다음 예정 시각은 그대로 유지됩니다. 콜백이 `due_at` 인자를 받으면 실행 대상 예정 시각(UTC)을 넘겨줍니다.
+
+    사용 예 (Cog의 cog_load / cog_unload):
+        await self.bot.scheduler.register("birthday", Daily(datetime.time(8, 0, tzinfo=KST)), self.check_birthdays)
+        self.bot.scheduler.unregister("birthday")
+    """
+    RECENT_DURATIONS = 20
+
+    def __init__(self, repository: JobRepository, wait_until_ready: Optional[Callable[[], Awaitable[None]]] = None):
+        self.repository = repository
+        self._wait_until_ready = wait_until_ready
+        self._jobs: Dict[str, Job] = {}
+        self._records: Dict[str, JobRecord] = {}
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def jobs(self) -> List[Job]:
+        return sorted(self._jobs.values(), key=lambda j: j.next_run_at)
+
+    async def start(self) -> None:
+        """저장된 실행 기록을 불러오고 스케줄러 태스크를 시작합니다."""
+        self._records = {r.name: r for r in await self.repository.get_all_jobs()}
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def register(self, name: str, schedule: "Interval | Daily", callback: Callable[..., Awaitable[None]]) -> Job:
+        """
+        작업을 등록합니다. 실행 기록이 없는 Interval 작업은 즉시, Daily 작업은 다음 예정 시각에 실행됩니다.
+        마지막 실행 이후 예정 시각이 이미 지났다면 즉시 한 번 실행됩니다.
+        """
+        await self.repository.upsert_job(name, str(schedule))
+        record = self._records.get(name) or JobRecord(name=name, schedule=str(schedule))
+        record.schedule = str(schedule)
+        self._records[name] = record
+
+        now = datetime.datetime.now(UTC)
+        if record.last_run_at:
+            next_run_at = schedule.next_after(datetime.datetime.fromisoformat(record.last_run_at))
+            # 여러 번 놓쳤다면 가장 최근에 놓친 예정 시각으로 한 번만 실행합니다.
+            while schedule.next_after(next_run_at) <= now:
+                next_run_at = schedule.next_after(next_run_at)
+        elif isinstance(schedule, Interval):
+            next_run_at = now
+        else:
+            next_run_at = schedule.next_after(now)
+
+        job = Job(name=name, schedule=schedule, callback=callback, next_run_at=next_run_at, record=record,
+                  pass_due_at="due_at" in inspect.signature(callback).parameters)
+        self._jobs[name] = job
+        self._changed.set()
+        return job
+
+    def unregister(self, name: str) -> None:
+        self._jobs.pop(name, None)
+        task = self._running_tasks.pop(name, None)
+        if task:
+            task.cancel()
+        self._changed.set()
+
+    async def run_now(self, name: str) -> bool:
+        """예정 시각과 관계없이 작업을 즉시 실행합니다. 이미 실행 중이라 실행하지 않았으면 False를 반환합니다."""
+        job = self._jobs[name]
+        return await self._execute(job, datetime.datetime.now(UTC))
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._running_tasks.values()):
+            task.cancel()
+        self._running_tasks.clear()
+
+    async def _run(self) -> None:
+        if self._wait_until_ready:
+            await self._wait_until_ready()
+        while True:
+            self._changed.clear()
+            now = datetime.datetime.now(UTC)
+            for job in list(self._jobs.values()):
+                if not job.running and job.next_run_at <= now:
+                    self._running_tasks[job.name] = asyncio.create_task(self._execute(job, job.next_run_at))
+
+            pending = [j.next_run_at for j in self._jobs.values() if not j.running]
+            timeout = max((min(pending) - now).total_seconds(), 0) if pending else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: Job, due_at: datetime.datetime) -> bool:
+        if job.running:
+            return False
+        job.running = True
+        started_at = datetime.datetime.now(UTC)
+        lag = max((started_at - due_at).total_seconds(), 0.0)
+        start = time.perf_counter()
+        error = None
+        try:
+            await (job.callback(due_at=due_at) if job.pass_due_at else job.callback())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[Scheduler] 작업 '{job.name}' 실행 중 오류 발생: {error}")
+            traceback.print_exc()
+        finally:
+            duration = time.perf_counter() - start
+            job.running = False
+            job.runs += 1
+            job.durations = (job.durations + [duration])[-self.RECENT_DURATIONS:]
+            # 예정 시각을 기준으로 다음 실행 시각을 정합니다. (실행이 늦어져도 일정이 밀리지 않습니다)
+            next_run_at = job.schedule.next_after(due_at)
+            job.next_run_at = next_run_at if next_run_at > started_at else job.schedule.next_after(started_at)
+            job.record.last_run_at = started_at.isoformat()
+            job.record.last_duration = duration
+            job.record.last_lag = lag
+            job.record.last_error = error
+            if self._running_tasks.get(job.name) is asyncio.current_task():
+                del self._running_tasks[job.name]
+            self._changed.set()
+
+        try:
+            await self.repository.record_run(job.name, job.record.last_run_at, duration, lag, error)
+        except Exception as e:
+            print(f"[Scheduler] 작업 '{job.name}' 실행 기록 저장 실패: {e}")
+        return True
@@ -0,0 +1,86 @@
+import asyncio
+import datetime
+from typing import Dict, Optional, Tuple
+
+from core.local.repository import UserRepository
+
+
+class ActivityAggregator:
+    """
+    채팅 메시지 활동량과 메시지 보상을 메모리에 모아두었다가 한 번에 기록하는 write-behind 버퍼입니다.
+
+    `on_message`에서는 `record_message`로 카운트만 올리고, 실제 DB 쓰기는
+    `flush_interval`초마다 또는 대기 중인 메시지가 `max_pending`개를 넘을 때
+    `UserRepository.apply_message_activity`를 통해 하나의 트랜잭션으로 처리됩니다.
+    이미 존재하는 유저는 UserRepository의 유저 캐시로 판별하여, 신규 유저만 생성 쿼리에 포함합니다.
+    """
+    MESSAGE_REWARD = 2
+
+    def __init__(self, users: UserRepository, flush_interval: float = 10.0, max_pending: int = 500):
+        self.users = users
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._new_users: Dict[int, str] = {}                 # 캐시에 없는 유저 {user_id: display_name}
+        self._message_counts: Dict[Tuple[int, str], int] = {}  # {(user_id, activity_date): count}
+        self._pending = 0
+        self._flush_lock = asyncio.Lock()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._threshold_flush: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing.clear()
+            self._task = asyncio.create_task(self._run())
+
+    def record_message(self, user_id: int, display_name: str) -> None:
+        """메시지 1건을 버퍼에 기록합니다. DB에는 접근하지 않습니다."""
+        key = (user_id, datetime.date.today().isoformat())
+        if user_id in self._new_users or not self.users.note_display_name(user_id, display_name):
+            self._new_users[user_id] = display_name
+        self._message_counts[key] = self._message_counts.get(key, 0) + 1
+        self._pending += 1
+
+        if self._pending >= self.max_pending and (self._threshold_flush is None or self._threshold_flush.done()):
+            self._threshold_flush = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """버퍼에 쌓인 활동량을 하나의 트랜잭션으로 기록합니다."""
+        async with self._flush_lock:
+            if not self._message_counts and not self.users.has_pending_names:
+                return
+
+            new_users, self._new_users = self._new_users, {}
+            message_counts, self._message_counts = self._message_counts, {}
+            self._pending = 0
+
+            try:
+                await self.users.apply_message_activity(new_users, message_counts, self.MESSAGE_REWARD)
+            except Exception as e:
+                # 기록에 실패하면 다음 flush에서 다시 시도할 수 있도록 버퍼에 되돌립니다.
+                print(f"[Activity] 활동량 기록 중 오류 발생: {e}")
+                for user_id, name in new_users.items():
+                    self._new_users.setdefault(user_id, name)
+                for key, count in message_counts.items():
+                    self._message_counts[key] = self._message_counts.get(key, 0) + count
+                    self._pending += count
+
+    async def close(self) -> None:
+        """
+        주기 작업을 중지하고 남은 버퍼를 모두 기록합니다.
+        태스크를 취소하면 진행 중인 flush의 DB 쓰기가 중간에 끊겨 버퍼가 사라질 수 있으므로,
+        종료 신호만 보내고 진행 중인 flush가 끝나기를 기다립니다.
+        """
+        self._closing.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
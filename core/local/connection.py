@@ -0,0 +1,131 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+
+import aiosqlite
+
+from core.metrics import metrics, normalize_sql
+
+
+class ReadPool:
+    """
+    읽기 전용 aiosqlite 연결 풀입니다.
+
+    WAL 모드에서는 읽기 연결이 쓰기 연결을 기다리지 않으므로, 리더보드나 통계처럼
+    무거운 조회를 이 풀로 보내면 쓰기 경로(잔고 갱신, 활동량 기록 등)가 막히지 않습니다.
+    각 연결은 `query_only`로 열려 실수로 쓰기 쿼리를 실행하면 오류가 발생합니다.
+    """
+
+    def __init__(self, connections: List[aiosqlite.Connection]):
+        self._connections = connections
+        self._idle: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        for connection in connections:
+            self._idle.put_nowait(connection)
+
+    @classmethod
+    async def create(cls, db_path: str, size: int = 3) -> "ReadPool":
+        connections = []
+        for _ in range(size):
+            connection = await aiosqlite.connect(db_path)
+            connection.row_factory = aiosqlite.Row
+            await connection.execute("PRAGMA query_only = ON;")
+            connections.append(connection)
+        return cls(connections)
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def fetchone(self, sql: str, parameters: Iterable = ()) -> Optional[aiosqlite.Row]:
+        async with self.acquire() as connection:
+            start = time.perf_counter()
+            async with connection.execute(sql, parameters) as cursor:
+                row = await cursor.fetchone()
+            metrics.observe("sql", normalize_sql(sql), time.perf_counter() - start)
+            return row
+
+    async def fetchall(self, sql: str, parameters: Iterable = ()) -> List[aiosqlite.Row]:
+        async with self.acquire() as connection:
+            start = time.perf_counter()
+            async with connection.execute(sql, parameters) as cursor:
+                rows = list(await cursor.fetchall())
+            metrics.observe("sql", normalize_sql(sql), time.perf_counter() - start)
+            return rows
+
+    async def close(self) -> None:
+        for connection in self._connections:
+            await connection.close()
+
+
+class WriteConnection:
+    """
+    쓰기용 aiosqlite 연결 래퍼입니다.
+
+    모든 쓰기는 `transaction()` 안에서 실행되어야 합니다. 트랜잭션은 연결 단위 락으로 직렬화되며,
+    같은 태스크 안에서 중첩된 `transaction()`은 가장 바깥 트랜잭션에 합류하므로
+    여러 레포지토리 호출이 하나의 커밋(또는 롤백)으로 묶입니다.
+    """
+
+    def __init__(self, connection: aiosqlite.Connection):
+        self._connection = connection
+        self._lock = asyncio.Lock()
+        self._owner: Optional[asyncio.Task] = None
+        self._rollback_callbacks: List[Callable[[], None]] = []
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._owner is not None and self._owner is asyncio.current_task()
+
+    async def execute(self, sql: str, parameters: Optional[Iterable[Any]] = None) -> aiosqlite.Cursor:
+        start = time.perf_counter()
+        try:
+            return await self._connection.execute(sql, parameters)
+        finally:
+            metrics.observe("sql", normalize_sql(sql), time.perf_counter() - start)
+
+    async def executemany(self, sql: str, parameters: Iterable[Iterable[Any]]) -> aiosqlite.Cursor:
+        start = time.perf_counter()
+        try:
+            return await self._connection.executemany(sql, parameters)
+        finally:
+            metrics.observe("sql", normalize_sql(sql), time.perf_counter() - start)
+
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """현재 트랜잭션이 롤백될 때 호출할 콜백을 등록합니다. (메모리 캐시 되돌리기 용도)"""
+        if self.in_transaction:
+            self._rollback_callbacks.append(callback)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["WriteConnection"]:
+        if self.in_transaction:
+            # 이미 현재 태스크가 연 트랜잭션이 있으면 그대로 합류합니다.
+            yield self
+            return
+
+        async with self._lock:
+            self._owner = asyncio.current_task()
+            try:
+                yield self
+                start = time.perf_counter()
+                await self._connection.commit()
+                metrics.observe("sql", "COMMIT", time.perf_counter() - start)
+            except BaseException:
+                await self._connection.rollback()
+                for callback in self._rollback_callbacks:
+                    callback()
+                raise
+            finally:
+                self._owner = None
+                self._rollback_callbacks = []
+
+    async def close(self) -> None:
+        await self._connection.close()
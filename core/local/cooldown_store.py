@@ -0,0 +1,93 @@
+import asyncio
+import datetime
+from typing import Dict, Optional, Tuple
+
+from core.local.repository.cooldown_repository import CooldownRepository
+from core.utiles import ExpiryQueue
+
+
+class CooldownStore:
+    """
+    명령어 쿨타임을 메모리에 보관하고 SQLite에 일괄 저장하는 저장소입니다.
+
+    조회와 설정은 dict 기반이라 O(1)이며, 끝난 쿨타임은 만료 순서 힙(`ExpiryQueue`)에서
+    주기적으로 정리됩니다. 변경된 쿨타임은 `flush_interval`초마다 한 번의 트랜잭션으로 저장되고,
+    시작 시 `load`로 아직 끝나지 않은 쿨타임을 불러오므로 재시작이나 Cog 리로드로 초기화되지 않습니다.
+    """
+
+    def __init__(self, repository: CooldownRepository, flush_interval: float = 30.0):
+        self.repository = repository
+        self.flush_interval = flush_interval
+
+        self._expiries: ExpiryQueue[Tuple[str, int]] = ExpiryQueue()   # {(command, user_id): expires_at}
+        self._dirty: Dict[Tuple[str, int], datetime.datetime] = {}     # 아직 저장되지 않은 변경분
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows = await self.repository.get_active_cooldowns(now.isoformat())
+        for command, user_id, expires_at in rows:
+            self._expiries.push((command, user_id), datetime.datetime.fromisoformat(expires_at))
+        print(f"[Cooldown] {len(rows)}개의 쿨타임을 DB에서 불러왔습니다.")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def remaining(self, command: str, user_id: int) -> float:
+        """남은 쿨타임(초)을 반환합니다. 쿨타임이 없으면 0"""
+        expires_at = self._expiries.get((command, user_id))
+        if expires_at is None:
+            return 0.0
+        return max((expires_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+    def set(self, command: str, user_id: int, duration: datetime.timedelta) -> None:
+        key = (command, user_id)
+        expires_at = datetime.datetime.now(datetime.timezone.utc) + duration
+        self._expiries.push(key, expires_at)
+        self._dirty[key] = expires_at
+
+    def reset(self, command: str, user_id: int) -> None:
+        """쿨타임을 즉시 해제합니다."""
+        key = (command, user_id)
+        self._expiries.discard(key)
+        self._dirty[key] = datetime.datetime.now(datetime.timezone.utc)
+
+    def sweep(self) -> int:
+        """끝난 쿨타임을 메모리에서 제거합니다."""
+        return len(self._expiries.pop_due(datetime.datetime.now(datetime.timezone.utc)))
+
+    async def flush(self) -> None:
+        """변경된 쿨타임을 저장하고 끝난 쿨타임을 정리합니다."""
+        async with self._flush_lock:
+            self.sweep()
+            dirty, self._dirty = self._dirty, {}
+            now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            entries = [(command, user_id, expires_at.isoformat()) for (command, user_id), expires_at in dirty.items()]
+            try:
+                await self.repository.save_cooldowns(entries, now_iso)
+            except Exception as e:
+                # 저장에 실패하면 다음 flush에서 다시 시도할 수 있도록 되돌립니다.
+                print(f"[Cooldown] 쿨타임 저장 중 오류 발생: {e}")
+                for key, expires_at in dirty.items():
+                    self._dirty.setdefault(key, expires_at)
+
+    async def close(self) -> None:
+        """주기 작업을 중지하고 남은 변경분을 저장합니다."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -9,29 +9,48 @@ from core.local.repository.auto_vc_repository import AutoVcRepository
 from core.local.repository.moderation_repository import ModerationRepository
 from core.local.repository.role_message_repository import RoleMessageRepository
 from core.local.repository.qna_repository import QnaRepository
+from core.local.repository.voice_session_repository import VoiceSessionRepository
+from core.local.repository.job_repository import JobRepository
+from core.local.repository.cooldown_repository import CooldownRepository
+from core.local.repository.ledger_repository import LedgerRepository
+from core.local.repository.meta_repository import MetaRepository
+from core.local.activity_aggregator import ActivityAggregator
+from core.local.cooldown_store import CooldownStore
+from core.local.connection import ReadPool, WriteConnection
 
 DB_PATH = './database.db'
+SCHEMA_DIR = os.path.dirname(os.path.abspath(__file__))
+READ_POOL_SIZE = 3
 
 class DatabaseManager:
-    DB_VERSION = 1
-
-    def __init__(self, connection: aiosqlite.Connection):
-        self._db = connection
-        self.users = UserRepository(self._db)
-        self.shop = ShopRepository(self._db)
-        self.moderation = ModerationRepository(self._db)
+    DB_VERSION = 6
+
+    def __init__(self, connection: aiosqlite.Connection, readers: ReadPool):
+        self._db = WriteConnection(connection)
+        self._readers = readers
+        self.ledger = LedgerRepository(self._db, self._readers)
+        self.users = UserRepository(self._db, self._readers, self.ledger)
+        self.shop = ShopRepository(self._db, self._readers)
+        self.moderation = ModerationRepository(self._db, self._readers)
         self.auto_vc = AutoVcRepository(self._db)
         self.role_message = RoleMessageRepository(self._db)
         self.qna = QnaRepository(self._db)
+        self.voice_sessions = VoiceSessionRepository(self._db)
+        self.jobs = JobRepository(self._db, self._readers)
+        self.meta = MetaRepository(self._db, self._readers)
+        self.activity = ActivityAggregator(self.users)
+        self.cooldowns = CooldownStore(CooldownRepository(self._db, self._readers))
 
     @classmethod
-    async def create(cls):
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        connection = await aiosqlite.connect(DB_PATH)
+    async def create(cls, db_path: str = DB_PATH):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        connection = await aiosqlite.connect(db_path)
         connection.row_factory = aiosqlite.Row
+        # WAL 모드: 쓰기 연결 하나와 읽기 전용 연결 풀이 서로를 막지 않고 동시에 동작합니다.
+        await connection.execute("PRAGMA journal_mode = WAL;")
         await connection.execute("PRAGMA foreign_keys = ON;")
 
-        with open('./core/local/schema.sql', 'r') as f:
+        with open(os.path.join(SCHEMA_DIR, 'schema.sql'), 'r') as f:
             await connection.executescript(f.read())
         await connection.commit()
 
@@ -44,7 +63,13 @@ class DatabaseManager:
         elif current_version > cls.DB_VERSION:
             raise Exception(f"⚠️ DB version ({current_version}) is newer than supported version ({cls.DB_VERSION})")
 
-        return cls(connection)
+        readers = await ReadPool.create(db_path, size=READ_POOL_SIZE)
+        manager = cls(connection, readers)
+        await manager.users.preload_cache()
+        manager.activity.start()
+        await manager.cooldowns.load()
+        manager.cooldowns.start()
+        return manager
 
     @staticmethod
     async def _get_db_version(connection: aiosqlite.Connection) -> int:
@@ -83,7 +108,7 @@ class DatabaseManager:
             - 항상 테스트 환경에서 먼저 적용해보는 것이 좋습니다.
         """
         for version in range(current_version + 1, cls.DB_VERSION + 1):
-            migration_file = f'./core/local/migrations/{version}.sql'
+            migration_file = os.path.join(SCHEMA_DIR, 'migrations', f'{version}.sql')
             if not os.path.exists(migration_file):
                 raise Exception(f"Migration file {migration_file} not found.")
 
@@ -94,5 +119,19 @@ class DatabaseManager:
         await connection.execute("UPDATE db_meta SET value = ? WHERE key = 'version'", (str(cls.DB_VERSION),))
         await connection.commit()
 
+    def transaction(self):
+        """
+        여러 레포지토리 호출을 하나의 작업 단위로 묶습니다.
+
+        사용 예:
+            async with bot.db.transaction():
+                if await bot.db.users.try_debit(user_id, item.price, LedgerReason.PURCHASE, ref_id=item.id) is not None:
+                    await bot.db.shop.add_to_inventory(user_id, item.id)
+
+        블록 안의 쓰기는 블록이 끝날 때 한 번만 커밋되며, 예외가 발생하면 모두 롤백됩니다.
+        """
+        return self._db.transaction()
+
     async def close(self):
+        await self._readers.close()
         await self._db.close()
\ No newline at end of file
@@ -0,0 +1,9 @@
+-- 누적 활동량 롤업 테이블 (activity_totals)
+-- 테이블과 인덱스는 schema.sql에서 생성되므로, 기존 daily_activity 기록으로 롤업을 채웁니다.
+INSERT OR REPLACE INTO activity_totals (user_id, message_count, voice_seconds, points)
+SELECT user_id,
+       SUM(message_count),
+       SUM(voice_seconds),
+       SUM(message_count) + SUM(voice_seconds) / 60
+FROM daily_activity
+GROUP BY user_id;
@@ -0,0 +1,5 @@
+-- 유저의 서버 재적 여부 (리더보드에서 서버를 떠난 유저를 제외하기 위함)
+-- 봇 시작 시 길드 멤버 목록과 일괄 동기화되며, 입장/퇴장 이벤트로 갱신됩니다.
+ALTER TABLE users ADD COLUMN in_guild INTEGER NOT NULL DEFAULT 1;
+
+CREATE INDEX IF NOT EXISTS idx_users_in_guild_balance ON users (in_guild, balance DESC);
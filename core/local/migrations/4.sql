@@ -0,0 +1,15 @@
+-- 같은 유저/역할의 중복 기간제 역할은 가장 늦은 만료 시간만 남깁니다.
+DELETE FROM temporary_roles
+WHERE id NOT IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, role_id ORDER BY expires_at DESC, id DESC) AS rn
+        FROM temporary_roles
+    )
+    WHERE rn = 1
+);
+
+-- 재구매 시 기존 행의 만료 시간을 연장(upsert)하기 위한 유니크 인덱스
+CREATE UNIQUE INDEX IF NOT EXISTS idx_temporary_roles_user_role ON temporary_roles (user_id, role_id);
+
+-- 만료 스케줄러가 시작할 때 만료 순서대로 불러오기 위한 인덱스
+CREATE INDEX IF NOT EXISTS idx_temporary_roles_expires_at ON temporary_roles (expires_at);
@@ -0,0 +1,13 @@
+-- 레포지토리 조회 쿼리가 전체 테이블 스캔을 하지 않도록 보조 인덱스를 추가합니다.
+
+-- 생일 축하 조회 (get_users_with_birthday): 생일을 등록한 유저만 인덱싱합니다.
+CREATE INDEX IF NOT EXISTS idx_users_birthday ON users (birthday) WHERE birthday IS NOT NULL;
+
+-- 처벌 기록 조회 (get_user_logs): user_id로 찾고 created_at 순으로 정렬
+CREATE INDEX IF NOT EXISTS idx_moderation_logs_user_created ON moderation_logs (user_id, created_at);
+
+-- 누적 경고 횟수 (get_user_warring): 테이블 접근 없이 인덱스만으로 합계를 계산합니다.
+CREATE INDEX IF NOT EXISTS idx_moderation_logs_user_action ON moderation_logs (user_id, action, count);
+
+-- 인벤토리 조회 (get_user_inventory)
+CREATE INDEX IF NOT EXISTS idx_user_inventory_user_item ON user_inventory (user_id, shop_item_id);
@@ -0,0 +1,4 @@
+-- 잔고 원장 도입 이전의 잔고를 원장 ID 0 시점의 스냅샷으로 기록합니다.
+-- 이후의 잔고 변경은 모두 balance_ledger에 남으므로, 스냅샷 + 원장 합계로 현재 잔고를 검증할 수 있습니다.
+INSERT OR IGNORE INTO balance_snapshots (user_id, ledger_id, balance, created_at)
+SELECT user_id, 0, balance, CAST(strftime('%s', 'now') AS INTEGER) FROM users WHERE balance != 0;
@@ -1,7 +1,8 @@
-import aiosqlite
 from typing import Optional, List
 from dataclasses import dataclass
 
+from core.local.connection import WriteConnection
+
 @dataclass
 class AutoVcGenerator:
     generator_channel_id: int
@@ -10,16 +11,16 @@ class AutoVcGenerator:
     guild_id: int
 
 class AutoVcRepository:
-    def __init__(self, db: aiosqlite.Connection):
+    def __init__(self, db: WriteConnection):
         self.db = db
 
     async def add_generator(self, generator_channel_id: int, category_id: int, base_name: str, guild_id: int) -> None:
-        await self.db.execute(
-            "INSERT OR REPLACE INTO auto_vc_generators (generator_channel_id, category_id, base_name, guild_id) "
-            "VALUES (?, ?, ?, ?)",
-            (generator_channel_id, category_id, base_name, guild_id)
-        )
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT OR REPLACE INTO auto_vc_generators (generator_channel_id, category_id, base_name, guild_id) "
+                "VALUES (?, ?, ?, ?)",
+                (generator_channel_id, category_id, base_name, guild_id)
+            )
 
     async def get_generator(self, generator_channel_id: int) -> Optional[AutoVcGenerator]:
         cursor = await self.db.execute("SELECT * FROM auto_vc_generators WHERE generator_channel_id = ?", (generator_channel_id,))
@@ -32,21 +33,31 @@ class AutoVcRepository:
         return [AutoVcGenerator(**row) for row in rows]
 
     async def remove_generator(self, generator_channel_id: int) -> None:
-        await self.db.execute("DELETE FROM auto_vc_generators WHERE generator_channel_id = ?", (generator_channel_id,))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute("DELETE FROM auto_vc_generators WHERE generator_channel_id = ?", (generator_channel_id,))
 
     # --- Managed Channels --- #
 
     async def add_managed_channel(self, channel_id: int, owner_id: int, guild_id: int, generator_channel_id: int) -> None:
-        await self.db.execute(
-            "INSERT INTO managed_auto_vc_channels (channel_id, owner_id, guild_id, generator_channel_id) VALUES (?, ?, ?, ?)",
-            (channel_id, owner_id, guild_id, generator_channel_id)
-        )
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO managed_auto_vc_channels (channel_id, owner_id, guild_id, generator_channel_id) VALUES (?, ?, ?, ?)",
+                (channel_id, owner_id, guild_id, generator_channel_id)
+            )
 
     async def remove_managed_channel(self, channel_id: int) -> None:
-        await self.db.execute("DELETE FROM managed_auto_vc_channels WHERE channel_id = ?", (channel_id,))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute("DELETE FROM managed_auto_vc_channels WHERE channel_id = ?", (channel_id,))
+
+    async def remove_managed_channels(self, channel_ids: List[int]) -> None:
+        """여러 관리 채널을 하나의 트랜잭션으로 삭제합니다."""
+        if not channel_ids:
+            return
+        async with self.db.transaction():
+            await self.db.executemany(
+                "DELETE FROM managed_auto_vc_channels WHERE channel_id = ?",
+                [(channel_id,) for channel_id in channel_ids]
+            )
 
     async def get_all_managed_channels(self) -> List[int]:
         cursor = await self.db.execute("SELECT channel_id FROM managed_auto_vc_channels")
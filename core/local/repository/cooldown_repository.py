@@ -0,0 +1,26 @@
+from typing import List, Tuple
+from core.local.connection import ReadPool, WriteConnection
+
+
+class CooldownRepository:
+    def __init__(self, db: WriteConnection, reader: ReadPool):
+        self.db = db
+        self.reader = reader
+
+    async def get_active_cooldowns(self, now_iso: str) -> List[Tuple[str, int, str]]:
+        """아직 끝나지 않은 쿨타임을 가져옵니다. [(command, user_id, expires_at)]"""
+        rows = await self.reader.fetchall(
+            "SELECT command, user_id, expires_at FROM cooldowns WHERE expires_at > ?", (now_iso,)
+        )
+        return [(r['command'], r['user_id'], r['expires_at']) for r in rows]
+
+    async def save_cooldowns(self, entries: List[Tuple[str, int, str]], now_iso: str) -> None:
+        """변경된 쿨타임을 저장하고, 만료된 쿨타임을 함께 정리합니다."""
+        async with self.db.transaction():
+            if entries:
+                await self.db.executemany(
+                    "INSERT INTO cooldowns (command, user_id, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(command, user_id) DO UPDATE SET expires_at = excluded.expires_at",
+                    entries
+                )
+            await self.db.execute("DELETE FROM cooldowns WHERE expires_at <= ?", (now_iso,))
@@ -0,0 +1,29 @@
+from typing import List, Optional
+from core.local.connection import ReadPool, WriteConnection
+from core.model import JobRecord
+
+
+class JobRepository:
+    def __init__(self, db: WriteConnection, reader: ReadPool):
+        self.db = db
+        self.reader = reader
+
+    async def get_all_jobs(self) -> List[JobRecord]:
+        rows = await self.reader.fetchall("SELECT * FROM scheduled_jobs")
+        return [JobRecord(**dict(r)) for r in rows]
+
+    async def upsert_job(self, name: str, schedule: str) -> None:
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO scheduled_jobs (name, schedule) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET schedule = excluded.schedule "
+                "WHERE schedule != excluded.schedule",
+                (name, schedule)
+            )
+
+    async def record_run(self, name: str, last_run_at: str, duration: float, lag: float, error: Optional[str]) -> None:
+        async with self.db.transaction():
+            await self.db.execute(
+                "UPDATE scheduled_jobs SET last_run_at = ?, last_duration = ?, last_lag = ?, last_error = ? WHERE name = ?",
+                (last_run_at, duration, lag, error, name)
+            )
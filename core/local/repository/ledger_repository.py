@@ -0,0 +1,107 @@
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from core.local.connection import ReadPool, WriteConnection
+from core.model import BalanceAudit, LedgerEntry, LedgerReason
+
+
+class LedgerRepository:
+    """
+    잔고 변경 원장(balance_ledger)과 잔고 스냅샷(balance_snapshots)을 관리합니다.
+
+    원장은 추가만 하며, `record`/`record_many`는 잔고를 바꾸는 호출자의 트랜잭션 안에서 실행되어
+    잔고 변경과 함께 커밋되거나 롤백됩니다. users.balance는 그대로 O(1)로 읽히고,
+    원장은 "이 돈이 어디서 왔는지"를 추적하는 감사 용도로만 사용됩니다.
+    스냅샷은 주기적으로 기록되어, 감사 시 마지막 스냅샷 이후의 원장만 합산하면 됩니다.
+    """
+
+    def __init__(self, db: WriteConnection, reader: ReadPool):
+        self.db = db
+        self.reader = reader
+
+    async def record(self, user_id: int, delta: int, reason: LedgerReason, ref_id: Optional[int] = None) -> None:
+        await self.db.execute(
+            "INSERT INTO balance_ledger (user_id, delta, reason, ref_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (user_id, delta, int(reason), ref_id, int(time.time()))
+        )
+
+    async def record_many(self, entries: Iterable[Tuple[int, int]], reason: LedgerReason) -> None:
+        """(user_id, delta) 목록을 같은 사유로 executemany 한 번에 기록합니다."""
+        now = int(time.time())
+        await self.db.executemany(
+            "INSERT INTO balance_ledger (user_id, delta, reason, ref_id, created_at) VALUES (?, ?, ?, NULL, ?)",
+            [(user_id, delta, int(reason), now) for user_id, delta in entries]
+        )
+
+    async def take_snapshot(self) -> int:
+        """
+        마지막 스냅샷 이후 원장에 기록이 있는 유저의 현재 잔고를 스냅샷으로 남깁니다.
+        쓰기 트랜잭션 안에서 실행되므로 잔고와 원장 ID가 같은 시점을 가리킵니다. 기록한 유저 수를 반환합니다.
+        """
+        async with self.db.transaction():
+            cursor = await self.db.execute("SELECT MAX(id) FROM balance_ledger")
+            last_id = (await cursor.fetchone())[0]
+            cursor = await self.db.execute("SELECT COALESCE(MAX(ledger_id), 0) FROM balance_snapshots")
+            prev_id = (await cursor.fetchone())[0]
+            if last_id is None or last_id <= prev_id:
+                return 0
+
+            cursor = await self.db.execute(
+                "INSERT INTO balance_snapshots (user_id, ledger_id, balance, created_at) "
+                "SELECT user_id, ?, balance, ? FROM users "
+                "WHERE user_id IN (SELECT user_id FROM balance_ledger WHERE id > ? AND id <= ?)",
+                (last_id, int(time.time()), prev_id, last_id)
+            )
+            count = cursor.rowcount
+        print(f"[Ledger] {count}명의 잔고 스냅샷을 기록했습니다. (원장 ID {last_id})")
+        return count
+
+    async def audit_user(self, user_id: int) -> Optional[BalanceAudit]:
+        """유저의 잔고가 마지막 스냅샷 + 이후 원장 합계와 일치하는지 확인합니다. 유저가 없으면 None"""
+        row = await self.reader.fetchone(
+            "SELECT u.balance, COALESCE(s.ledger_id, 0) AS ledger_id, COALESCE(s.balance, 0) AS snapshot_balance, "
+            "(SELECT COALESCE(SUM(delta), 0) FROM balance_ledger l WHERE l.user_id = u.user_id AND l.id > COALESCE(s.ledger_id, 0)) AS ledger_sum, "
+            "(SELECT COUNT(*) FROM balance_ledger l WHERE l.user_id = u.user_id AND l.id > COALESCE(s.ledger_id, 0)) AS entries "
+            "FROM users u LEFT JOIN balance_snapshots s ON s.user_id = u.user_id "
+            "AND s.ledger_id = (SELECT MAX(ledger_id) FROM balance_snapshots WHERE user_id = u.user_id) "
+            "WHERE u.user_id = ?",
+            (user_id,)
+        )
+        if not row:
+            return None
+        return BalanceAudit(
+            user_id=user_id,
+            balance=row['balance'],
+            expected=row['snapshot_balance'] + row['ledger_sum'],
+            snapshot_ledger_id=row['ledger_id'],
+            entries_since_snapshot=row['entries'],
+        )
+
+    async def find_mismatches(self, limit: int = 20) -> List[BalanceAudit]:
+        """모든 유저를 감사하여 잔고가 원장과 맞지 않는 유저를 반환합니다."""
+        rows = await self.reader.fetchall(
+            "WITH a AS ("
+            "  SELECT u.user_id, u.balance, COALESCE(s.ledger_id, 0) AS ledger_id, "
+            "  COALESCE(s.balance, 0) + (SELECT COALESCE(SUM(delta), 0) FROM balance_ledger l "
+            "                            WHERE l.user_id = u.user_id AND l.id > COALESCE(s.ledger_id, 0)) AS expected "
+            "  FROM users u LEFT JOIN balance_snapshots s ON s.user_id = u.user_id "
+            "  AND s.ledger_id = (SELECT MAX(ledger_id) FROM balance_snapshots WHERE user_id = u.user_id)"
+            ") "
+            "SELECT * FROM a WHERE balance != expected LIMIT ?",
+            (limit,)
+        )
+        return [
+            BalanceAudit(user_id=r['user_id'], balance=r['balance'], expected=r['expected'],
+                         snapshot_ledger_id=r['ledger_id'])
+            for r in rows
+        ]
+
+    async def get_recent_entries(self, user_id: int, limit: int = 10) -> List[LedgerEntry]:
+        rows = await self.reader.fetchall(
+            "SELECT * FROM balance_ledger WHERE user_id = ? ORDER BY id DESC LIMIT ?", (user_id, limit)
+        )
+        return [
+            LedgerEntry(id=r['id'], user_id=r['user_id'], delta=r['delta'], reason=LedgerReason(r['reason']),
+                        ref_id=r['ref_id'], created_at=r['created_at'])
+            for r in rows
+        ]
@@ -0,0 +1,22 @@
+from typing import Optional
+from core.local.connection import ReadPool, WriteConnection
+
+
+class MetaRepository:
+    """db_meta 테이블의 키-값 설정을 읽고 씁니다. ('version' 키는 DatabaseManager가 관리합니다)"""
+
+    def __init__(self, db: WriteConnection, reader: ReadPool):
+        self.db = db
+        self.reader = reader
+
+    async def get(self, key: str) -> Optional[str]:
+        row = await self.reader.fetchone("SELECT value FROM db_meta WHERE key = ?", (key,))
+        return row['value'] if row else None
+
+    async def set(self, key: str, value: str) -> None:
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO db_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
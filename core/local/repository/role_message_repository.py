@@ -1,19 +1,19 @@
 import json
 from typing import Optional, List
 
-import aiosqlite
+from core.local.connection import WriteConnection
 
 from core.model.role_message_models import RoleMessage, RoleButton
 
 
 class RoleMessageRepository:
-    def __init__(self, db: aiosqlite.Connection):
+    def __init__(self, db: WriteConnection):
         self.db = db
 
     async def create_role_message(self, guild_id: int, channel_id: int, message_id: int, content: str, color: str) -> None:
         query = "INSERT INTO role_messages (guild_id, channel_id, message_id, content, color, role_buttons) VALUES (?, ?, ?, ?, ?, ?)"
-        await self.db.execute(query, (guild_id, channel_id, message_id, content, color, json.dumps([])))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(query, (guild_id, channel_id, message_id, content, color, json.dumps([])))
 
     async def get_by_channel_id(self, channel_id: int) -> Optional[RoleMessage]:
         query = "SELECT * FROM role_messages WHERE channel_id = ?"
@@ -29,16 +29,16 @@ class RoleMessageRepository:
 
     async def update_message(self, channel_id: int, content: str, color: str) -> None:
         query = "UPDATE role_messages SET content = ?, color = ? WHERE channel_id = ?"
-        await self.db.execute(query, (content, color, channel_id))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(query, (content, color, channel_id))
 
     async def update_buttons(self, channel_id: int, buttons: List[RoleButton]) -> None:
         buttons_json = json.dumps([b.__dict__ for b in buttons])
         query = "UPDATE role_messages SET role_buttons = ? WHERE channel_id = ?"
-        await self.db.execute(query, (buttons_json, channel_id))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(query, (buttons_json, channel_id))
 
     async def delete_role_message(self, channel_id: int) -> None:
         query = "DELETE FROM role_messages WHERE channel_id = ?"
-        await self.db.execute(query, (channel_id,))
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(query, (channel_id,))
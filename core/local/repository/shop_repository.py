@@ -1,30 +1,31 @@
-import aiosqlite
-from typing import Optional, List
+import datetime
+from typing import Optional, List, Tuple
+from core.local.connection import ReadPool, WriteConnection
 from core.model import ShopItem, InventoryItem, TemporaryRole
 
 class ShopRepository:
-    def __init__(self, db: aiosqlite.Connection):
+    def __init__(self, db: WriteConnection, reader: ReadPool):
         self.db = db
+        self.reader = reader
 
     async def add_item(self, **kwargs) -> ShopItem:
         keys = ', '.join(kwargs.keys())
         placeholders = ', '.join('?' * len(kwargs))
-        cursor = await self.db.execute(
-            f"INSERT INTO shop_items ({keys}) VALUES ({placeholders}) RETURNING *",
-            tuple(kwargs.values())
-        )
-        row = await cursor.fetchone()
-        await self.db.commit()
+        async with self.db.transaction():
+            cursor = await self.db.execute(
+                f"INSERT INTO shop_items ({keys}) VALUES ({placeholders}) RETURNING *",
+                tuple(kwargs.values())
+            )
+            row = await cursor.fetchone()
         return ShopItem(**dict(row))
 
     async def remove_item_by_name(self, name: str) -> bool:
-        cursor = await self.db.execute("DELETE FROM shop_items WHERE name = ?", (name,))
-        await self.db.commit()
+        async with self.db.transaction():
+            cursor = await self.db.execute("DELETE FROM shop_items WHERE name = ?", (name,))
         return cursor.rowcount > 0
 
     async def get_all_items(self) -> List[ShopItem]:
-        cursor = await self.db.execute("SELECT * FROM shop_items ORDER BY price")
-        rows = await cursor.fetchall()
+        rows = await self.reader.fetchall("SELECT * FROM shop_items ORDER BY price")
         return [ShopItem(**dict(r)) for r in rows]
 
     async def get_item_by_id(self, item_id: int) -> Optional[ShopItem]:
@@ -38,38 +39,60 @@ class ShopRepository:
         return ShopItem(**dict(row)) if row else None
 
     async def get_user_inventory(self, user_id: int) -> List[InventoryItem]:
-        cursor = await self.db.execute(
+        rows = await self.reader.fetchall(
             "SELECT s.name, COUNT(i.id) as count FROM user_inventory i "
             "JOIN shop_items s ON i.shop_item_id = s.id "
             "WHERE i.user_id = ? GROUP BY s.name",
             (user_id,)
         )
-        rows = await cursor.fetchall()
         return [InventoryItem(name=r['name'], count=r['count']) for r in rows]
 
     async def add_to_inventory(self, user_id: int, shop_item_id: int):
-        await self.db.execute(
-            "INSERT INTO user_inventory (user_id, shop_item_id) VALUES (?, ?)",
-            (user_id, shop_item_id)
-        )
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO user_inventory (user_id, shop_item_id) VALUES (?, ?)",
+                (user_id, shop_item_id)
+            )
 
-    async def add_temporary_role(self, user_id: int, role_id: int, expires_at: str):
-        await self.db.execute(
-            "INSERT INTO temporary_roles (user_id, role_id, expires_at) VALUES (?, ?, ?)",
-            (user_id, role_id, expires_at)
-        )
-        await self.db.commit()
+    async def add_temporary_role(self, user_id: int, role_id: int, duration: datetime.timedelta) -> TemporaryRole:
+        """
+        기간제 역할을 추가합니다. 이미 보유 중인 역할이면 남은 기간에 `duration`을 더해 만료 시간을 연장합니다.
+        """
+        async with self.db.transaction():
+            cursor = await self.db.execute(
+                "SELECT expires_at FROM temporary_roles WHERE user_id = ? AND role_id = ?", (user_id, role_id)
+            )
+            row = await cursor.fetchone()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            start = max(now, datetime.datetime.fromisoformat(row['expires_at'])) if row else now
+            cursor = await self.db.execute(
+                "INSERT INTO temporary_roles (user_id, role_id, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, role_id) DO UPDATE SET expires_at = excluded.expires_at "
+                "RETURNING *",
+                (user_id, role_id, (start + duration).isoformat())
+            )
+            row = await cursor.fetchone()
+        return TemporaryRole(**dict(row))
 
-    async def get_expired_roles(self, now_iso: str) -> List[TemporaryRole]:
-        cursor = await self.db.execute(
-            "SELECT * FROM temporary_roles WHERE expires_at <= ?", (now_iso,)
-        )
-        rows = await cursor.fetchall()
+    async def get_all_temporary_roles(self) -> List[TemporaryRole]:
+        """모든 기간제 역할을 만료 시간 순으로 가져옵니다."""
+        rows = await self.reader.fetchall("SELECT * FROM temporary_roles ORDER BY expires_at")
         return [TemporaryRole(**dict(r)) for r in rows]
 
-    async def remove_temporary_roles_by_ids(self, ids: List[int]):
-        if not ids: return
-        placeholders = ', '.join('?' * len(ids))
-        await self.db.execute(f"DELETE FROM temporary_roles WHERE id IN ({placeholders})", ids)
-        await self.db.commit()
\ No newline at end of file
+    async def get_temporary_role(self, user_id: int, role_id: int) -> Optional[TemporaryRole]:
+        row = await self.reader.fetchone(
+            "SELECT * FROM temporary_roles WHERE user_id = ? AND role_id = ?", (user_id, role_id)
+        )
+        return TemporaryRole(**dict(row)) if row else None
+
+    async def remove_expired_temporary_roles(self, keys: List[Tuple[int, int]], now_iso: str):
+        """
+        만료된 기간제 역할을 삭제합니다. keys: [(user_id, role_id)]
+        처리 중에 연장된 역할은 `expires_at` 조건으로 보호되어 삭제되지 않습니다.
+        """
+        if not keys: return
+        async with self.db.transaction():
+            await self.db.executemany(
+                "DELETE FROM temporary_roles WHERE user_id = ? AND role_id = ? AND expires_at <= ?",
+                [(user_id, role_id, now_iso) for user_id, role_id in keys]
+            )
@@ -1,27 +1,132 @@
-import aiosqlite
-from typing import Optional, List
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple
 import datetime
-from core.model import User, ActivityLog, ActivityStats, ActivityLeaderboardEntry
+from core.local.connection import ReadPool, WriteConnection
+from core.local.repository.ledger_repository import LedgerRepository
+from core.metrics import metrics
+from core.model import User, ActivityLog, ActivityStats, ActivityLeaderboardEntry, UserCacheInfo, LedgerReason
 
 
 class UserRepository:
-    def __init__(self, db: aiosqlite.Connection):
+    """
+    유저 정보와 잔고를 관리합니다.
+    잔고를 바꾸는 모든 메서드는 같은 트랜잭션 안에서 `LedgerRepository`에 변경 사유를 함께 기록합니다.
+    """
+
+    def __init__(self, db: WriteConnection, reader: ReadPool, ledger: LedgerRepository, cache_size: int = 5000):
         self.db = db
+        self.reader = reader
+        self.ledger = ledger
+        self.cache_size = cache_size
+        # DB에 존재하는 것이 확인된 유저의 닉네임 LRU 캐시 {user_id: display_name}
+        self._known_users: "OrderedDict[int, str]" = OrderedDict()
+        # 아직 DB에 반영되지 않은 닉네임 변경 {user_id: display_name}
+        self._pending_names: Dict[int, str] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
 
-    async def get_or_create_user(self, user_id: int, display_name: str) -> User:
-        await self.db.execute(
-            "INSERT OR IGNORE INTO users (user_id, display_name) VALUES (?, ?)",
-            (user_id, display_name)
-        )
-        await self.db.execute(
-            "UPDATE users SET display_name = ? WHERE user_id = ?",
-            (display_name, user_id)
+    async def preload_cache(self) -> None:
+        """봇 시작 시 유저 캐시를 한 번의 쿼리로 채웁니다."""
+        cursor = await self.db.execute("SELECT user_id, display_name FROM users LIMIT ?", (self.cache_size,))
+        rows = await cursor.fetchall()
+        for row in rows:
+            self._known_users[row['user_id']] = row['display_name']
+        print(f"[UserCache] {len(self._known_users)}명의 유저 정보를 캐시에 불러왔습니다.")
+
+    def cache_info(self) -> UserCacheInfo:
+        return UserCacheInfo(
+            hits=self._cache_hits,
+            misses=self._cache_misses,
+            size=len(self._known_users),
+            capacity=self.cache_size
         )
-        cursor = await self.db.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        row = await cursor.fetchone()
-        await self.db.commit()
+
+    def _remember_user(self, user_id: int, display_name: str) -> None:
+        self._known_users[user_id] = display_name
+        self._known_users.move_to_end(user_id)
+        if len(self._known_users) > self.cache_size:
+            self._known_users.popitem(last=False)
+
+    def note_display_name(self, user_id: int, display_name: str) -> bool:
+        """
+        이미 DB에 존재하는 유저인지 캐시로 확인합니다.
+        캐시에 있는 유저의 닉네임이 바뀌었다면 다음 `flush_display_names`에서 일괄 갱신되도록 기록합니다.
+        캐시에 없는 유저라면 False를 반환하며, 호출자가 직접 유저를 생성해야 합니다.
+        """
+        cached_name = self._known_users.get(user_id)
+        if cached_name is None:
+            self._cache_misses += 1
+            metrics.inc("cache", "users:miss")
+            return False
+
+        self._cache_hits += 1
+        metrics.inc("cache", "users:hit")
+        self._known_users.move_to_end(user_id)
+        if cached_name != display_name:
+            self._known_users[user_id] = display_name
+            self._pending_names[user_id] = display_name
+        return True
+
+    @property
+    def has_pending_names(self) -> bool:
+        return bool(self._pending_names)
+
+    async def flush_display_names(self) -> None:
+        """캐시에 모인 닉네임 변경 내역을 executemany 한 번으로 기록합니다."""
+        if not self._pending_names:
+            return
+        async with self.db.transaction():
+            await self._write_pending_names()
+
+    async def _write_pending_names(self) -> None:
+        """
+        밀린 닉네임 변경을 현재 트랜잭션에 기록합니다.
+        트랜잭션이 롤백되면 변경 내역을 다시 대기열에 되돌려 다음 flush에서 재시도합니다.
+        """
+        pending, self._pending_names = self._pending_names, {}
+        try:
+            await self.db.executemany(
+                "UPDATE users SET display_name = ? WHERE user_id = ?",
+                [(name, user_id) for user_id, name in pending.items()]
+            )
+        except Exception:
+            self._restore_pending_names(pending)
+            raise
+        self.db.on_rollback(lambda: self._restore_pending_names(pending))
+
+    def _restore_pending_names(self, pending: Dict[int, str]) -> None:
+        for user_id, name in pending.items():
+            self._pending_names.setdefault(user_id, name)
+
+    async def get_or_create_user(self, user_id: int, display_name: str) -> User:
+        if self.note_display_name(user_id, display_name):
+            # 이미 존재하는 유저는 쓰기 없이 읽기 연결에서 조회만 합니다. (닉네임 변경은 일괄 반영)
+            # 아직 커밋되지 않은 트랜잭션 안에서 추가된 유저라 보이지 않으면 아래의 추가 경로를 탑니다.
+            row = await self.reader.fetchone("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            if row:
+                return User(user_id=row['user_id'], display_name=display_name, balance=row['balance'])
+        return await self._upsert_user(user_id, display_name)
+
+    async def _upsert_user(self, user_id: int, display_name: str) -> User:
+        """캐시에 없는 유저를 추가(또는 닉네임 갱신)하고 캐시에 기록합니다."""
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO users (user_id, display_name) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET display_name = excluded.display_name "
+                "WHERE display_name != excluded.display_name",
+                (user_id, display_name)
+            )
+            cursor = await self.db.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            row = await cursor.fetchone()
+        self._pending_names.pop(user_id, None)
+        self._remember_user(user_id, display_name)
         return User(user_id=row['user_id'], display_name=row['display_name'], balance=row['balance'])
 
+    async def ensure_user(self, user_id: int, display_name: str) -> None:
+        """유저가 존재하도록 보장합니다. 캐시에 있는 유저는 DB에 접근하지 않습니다."""
+        if not self.note_display_name(user_id, display_name):
+            await self._upsert_user(user_id, display_name)
+
     async def get_user(self, user_id: int) -> Optional[User]:
         cursor = await self.db.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
         row = await cursor.fetchone()
@@ -29,75 +134,146 @@ class UserRepository:
             return None
         return User(user_id=row['user_id'], display_name=row['display_name'], balance=row['balance'])
 
-    async def update_balance(self, user_id: int, amount_change: int) -> int:
-        cursor = await self.db.execute(
-            "UPDATE users SET balance = balance + ? WHERE user_id = ? RETURNING balance",
-            (amount_change, user_id)
-        )
-        new_balance = await cursor.fetchone()
-        await self.db.commit()
+    async def update_balance(self, user_id: int, amount_change: int, reason: LedgerReason,
+                             ref_id: Optional[int] = None) -> int:
+        async with self.db.transaction():
+            cursor = await self.db.execute(
+                "UPDATE users SET balance = balance + ? WHERE user_id = ? RETURNING balance",
+                (amount_change, user_id)
+            )
+            new_balance = await cursor.fetchone()
+            await self.ledger.record(user_id, amount_change, reason, ref_id)
         return new_balance[0]
 
+    async def try_debit(self, user_id: int, amount: int, reason: LedgerReason, payout: int = 0,
+                        ref_id: Optional[int] = None) -> Optional[int]:
+        """
+        잔고가 `amount` 이상일 때만 `amount`를 차감하고 `payout`을 지급합니다. (베팅금 차감과 당첨금 지급을 한 문장으로 처리)
+        잔고 확인과 변경이 하나의 UPDATE로 실행되므로 동시에 실행된 명령어가 잔고를 음수로 만들 수 없습니다.
+        성공하면 변경된 잔고를, 잔고가 부족하면 None을 반환합니다.
+        """
+        async with self.db.transaction():
+            cursor = await self.db.execute(
+                "UPDATE users SET balance = balance - ? + ? WHERE user_id = ? AND balance >= ? RETURNING balance",
+                (amount, payout, user_id, amount)
+            )
+            row = await cursor.fetchone()
+            if row:
+                await self.ledger.record(user_id, payout - amount, reason, ref_id)
+        return row[0] if row else None
+
+    async def transfer(self, sender_id: int, receiver_id: int, amount: int) -> Optional[int]:
+        """
+        보내는 유저의 잔고가 충분할 때만 송금합니다. 두 유저 모두 존재해야 합니다.
+        성공하면 보내는 유저의 변경된 잔고를, 잔고가 부족하면 None을 반환합니다.
+        """
+        async with self.db.transaction():
+            sender_balance = await self.try_debit(sender_id, amount, LedgerReason.TRANSFER, ref_id=receiver_id)
+            if sender_balance is None:
+                return None
+            await self.db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, receiver_id))
+            await self.ledger.record(receiver_id, amount, LedgerReason.TRANSFER, sender_id)
+        return sender_balance
+
     async def get_balance_leaderboard(self, limit: int = 10) -> List[User]:
-        cursor = await self.db.execute("SELECT * FROM users ORDER BY balance DESC LIMIT ?", (limit,))
-        rows = await cursor.fetchall()
+        rows = await self.reader.fetchall(
+            "SELECT * FROM users WHERE in_guild = 1 ORDER BY balance DESC LIMIT ?", (limit,)
+        )
         return [User(user_id=r['user_id'], display_name=r['display_name'], balance=r['balance']) for r in rows]
 
-    async def log_message_activity(self, user_id: int):
-        today = datetime.date.today().isoformat()
-        await self.db.execute(
-            "INSERT INTO daily_activity (user_id, activity_date, message_count) VALUES (?, ?, 1) "
-            "ON CONFLICT(user_id, activity_date) DO UPDATE SET message_count = message_count + 1",
-            (user_id, today)
-        )
-        await self.update_balance(user_id, 2)
+    async def apply_message_activity(self, new_users: Dict[int, str],
+                                     message_counts: Dict[Tuple[int, str], int], reward_per_message: int) -> None:
+        """
+        ActivityAggregator가 모아둔 메시지 활동량을 하나의 트랜잭션으로 기록합니다.
+        신규 유저 생성, 밀린 닉네임 변경, 일일/누적 활동량 upsert, 메시지 보상 지급과 원장 기록을 각각 executemany 한 번으로 처리합니다.
+        """
+        totals: Dict[int, int] = {}
+        for (user_id, _), count in message_counts.items():
+            totals[user_id] = totals.get(user_id, 0) + count
+
+        async with self.db.transaction():
+            if new_users:
+                await self.db.executemany(
+                    "INSERT INTO users (user_id, display_name) VALUES (?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET display_name = excluded.display_name "
+                    "WHERE display_name != excluded.display_name",
+                    list(new_users.items())
+                )
+            await self._write_pending_names()
+            await self.db.executemany(
+                "INSERT INTO daily_activity (user_id, activity_date, message_count) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, activity_date) DO UPDATE SET message_count = message_count + excluded.message_count",
+                [(user_id, activity_date, count) for (user_id, activity_date), count in message_counts.items()]
+            )
+            await self.db.executemany(
+                "INSERT INTO activity_totals (user_id, message_count, points) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "message_count = message_count + excluded.message_count, "
+                "points = message_count + excluded.message_count + voice_seconds / 60",
+                [(user_id, count, count) for user_id, count in totals.items()]
+            )
+            rewards = [(user_id, count * reward_per_message) for user_id, count in totals.items()]
+            await self.db.executemany(
+                "UPDATE users SET balance = balance + ? WHERE user_id = ?",
+                [(reward, user_id) for user_id, reward in rewards]
+            )
+            await self.ledger.record_many(rewards, LedgerReason.MESSAGE)
+
+        for user_id, display_name in new_users.items():
+            self._remember_user(user_id, display_name)
 
     async def log_voice_activity(self, user_id: int, duration: int):
         today = datetime.date.today().isoformat()
-        cursor = await self.db.execute(
-            "SELECT voice_seconds FROM daily_activity WHERE user_id = ? AND activity_date = ?", (user_id, today)
-        )
-        current_seconds = (await cursor.fetchone() or (0,))[0]
+        async with self.db.transaction():
+            cursor = await self.db.execute(
+                "SELECT voice_seconds FROM daily_activity WHERE user_id = ? AND activity_date = ?", (user_id, today)
+            )
+            current_seconds = (await cursor.fetchone() or (0,))[0]
 
-        total_seconds = current_seconds + duration
-        new_rewards = ((total_seconds // 3600) - (current_seconds // 3600)) * 600
+            total_seconds = current_seconds + duration
+            new_rewards = ((total_seconds // 3600) - (current_seconds // 3600)) * 600
 
-        if new_rewards > 0:
-            await self.update_balance(user_id, new_rewards)
+            if new_rewards > 0:
+                await self.update_balance(user_id, new_rewards, LedgerReason.VOICE)
 
-        await self.db.execute(
-            "INSERT INTO daily_activity (user_id, activity_date, voice_seconds) VALUES (?, ?, ?) "
-            "ON CONFLICT(user_id, activity_date) DO UPDATE SET voice_seconds = voice_seconds + ?",
-            (user_id, today, duration, duration)
-        )
-        await self.db.commit()
+            await self.db.execute(
+                "INSERT INTO daily_activity (user_id, activity_date, voice_seconds) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, activity_date) DO UPDATE SET voice_seconds = voice_seconds + ?",
+                (user_id, today, duration, duration)
+            )
+            await self.db.execute(
+                "INSERT INTO activity_totals (user_id, voice_seconds, points) VALUES (?, ?, ? / 60) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "voice_seconds = voice_seconds + excluded.voice_seconds, "
+                "points = message_count + (voice_seconds + excluded.voice_seconds) / 60",
+                (user_id, duration, duration)
+            )
 
     async def get_activity_stats(self, user_id: int, start_date: str, end_date: str) -> ActivityStats:
-        cursor = await self.db.execute(
+        row = await self.reader.fetchone(
             "SELECT SUM(message_count), SUM(voice_seconds) FROM daily_activity "
             "WHERE user_id = ? AND activity_date BETWEEN ? AND ?",
             (user_id, start_date, end_date)
         )
-        row = await cursor.fetchone()
         return ActivityStats(
             total_messages=row[0] or 0,
             total_voice_minutes=(row[1] or 0) // 60
         )
 
     async def get_activity_leaderboard(self, limit: int = 10) -> List[ActivityLeaderboardEntry]:
-        cursor = await self.db.execute(
-            "SELECT u.user_id, u.display_name, "
-            "COALESCE(SUM(a.message_count), 0) AS messages, "
-            "COALESCE(SUM(a.voice_seconds) / 60, 0) AS voice_minutes, "
-            "COALESCE(SUM(a.message_count), 0) + COALESCE(SUM(a.voice_seconds) / 60, 0) AS points "
-            "FROM users u "
-            "LEFT JOIN daily_activity a ON u.user_id = a.user_id "
-            "GROUP BY u.user_id "
-            "ORDER BY points DESC "
+        # activity_totals 롤업의 points 인덱스를 따라 상위 N명만 읽습니다.
+        # CROSS JOIN은 SQLite에서 조인 순서를 고정하여 points 인덱스를 바깥 루프로 사용하게 합니다.
+        rows = await self.reader.fetchall(
+            "SELECT t.user_id, u.display_name, "
+            "t.message_count AS messages, "
+            "t.voice_seconds / 60 AS voice_minutes "
+            "FROM activity_totals t "
+            "CROSS JOIN users u ON u.user_id = t.user_id "
+            "WHERE u.in_guild = 1 "
+            "ORDER BY t.points DESC "
             "LIMIT ?",
             (limit,)
         )
-        rows = await cursor.fetchall()
         return [
             ActivityLeaderboardEntry(
                 user_id=r["user_id"],
@@ -108,27 +284,97 @@ class UserRepository:
             for r in rows
         ]
 
+    async def set_guild_membership(self, user_id: int, in_guild: bool) -> None:
+        async with self.db.transaction():
+            await self.db.execute(
+                "UPDATE users SET in_guild = ? WHERE user_id = ?",
+                (int(in_guild), user_id)
+            )
+
+    async def sync_guild_members(self, member_ids: List[int]) -> None:
+        """
+        현재 길드 멤버 목록으로 users.in_guild를 일괄 동기화합니다.
+        멤버 ID를 임시 테이블에 한 번에 넣고, 값이 달라진 행만 갱신합니다.
+        """
+        async with self.db.transaction():
+            await self.db.execute("CREATE TEMP TABLE IF NOT EXISTS guild_members (user_id INTEGER PRIMARY KEY)")
+            await self.db.execute("DELETE FROM temp.guild_members")
+            await self.db.executemany(
+                "INSERT OR IGNORE INTO temp.guild_members (user_id) VALUES (?)",
+                [(member_id,) for member_id in member_ids]
+            )
+            await self.db.execute(
+                "UPDATE users SET in_guild = 0 "
+                "WHERE in_guild = 1 AND user_id NOT IN (SELECT user_id FROM temp.guild_members)"
+            )
+            await self.db.execute(
+                "UPDATE users SET in_guild = 1 "
+                "WHERE in_guild = 0 AND user_id IN (SELECT user_id FROM temp.guild_members)"
+            )
+
+    async def rebuild_activity_totals(self, batch_size: int = 500) -> int:
+        """
+        daily_activity 기록으로 activity_totals 롤업을 다시 계산합니다.
+        유저 ID 순으로 batch_size명씩 나누어 각각 별도의 트랜잭션으로 처리하므로,
+        재계산 중에도 다른 쓰기 작업이 오래 막히지 않습니다. 재계산한 유저 수를 반환합니다.
+        """
+        rebuilt = 0
+        last_user_id = -1
+        while True:
+            rows = await self.reader.fetchall(
+                "SELECT DISTINCT user_id FROM daily_activity WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                (last_user_id, batch_size)
+            )
+            if not rows:
+                break
+
+            user_ids = [r['user_id'] for r in rows]
+            placeholders = ', '.join('?' * len(user_ids))
+            async with self.db.transaction():
+                await self.db.execute(
+                    "INSERT OR REPLACE INTO activity_totals (user_id, message_count, voice_seconds, points) "
+                    "SELECT user_id, SUM(message_count), SUM(voice_seconds), "
+                    "SUM(message_count) + SUM(voice_seconds) / 60 "
+                    f"FROM daily_activity WHERE user_id IN ({placeholders}) GROUP BY user_id",
+                    user_ids
+                )
+            rebuilt += len(user_ids)
+            last_user_id = user_ids[-1]
+
+        async with self.db.transaction():
+            await self.db.execute(
+                "DELETE FROM activity_totals WHERE user_id NOT IN (SELECT user_id FROM daily_activity)"
+            )
+        return rebuilt
+
     async def reset_all_balances(self) -> None:
-        await self.db.execute("UPDATE users SET balance = 0")
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT INTO balance_ledger (user_id, delta, reason, ref_id, created_at) "
+                "SELECT user_id, -balance, ?, NULL, CAST(strftime('%s', 'now') AS INTEGER) FROM users WHERE balance != 0",
+                (int(LedgerReason.RESET),)
+            )
+            await self.db.execute("UPDATE users SET balance = 0 WHERE balance != 0")
 
     async def set_birthday(self, user_id: int, birthday: str) -> None:
-        await self.db.execute(
-            "UPDATE users SET birthday = ? WHERE user_id = ?",
-            (birthday, user_id)
-        )
-        await self.db.commit()
+        async with self.db.transaction():
+            await self.db.execute(
+                "UPDATE users SET birthday = ? WHERE user_id = ?",
+                (birthday, user_id)
+            )
 
     async def get_users_with_birthday(self, today: str) -> List[User]:
-        cursor = await self.db.execute(
+        rows = await self.reader.fetchall(
             "SELECT * FROM users WHERE birthday = ?", (today,)
         )
-        rows = await cursor.fetchall()
         return [User(user_id=r['user_id'], display_name=r['display_name'], balance=r['balance'], birthday=r['birthday']) for r in rows]
 
     async def update_display_name(self, user_id: int, new_display_name: str) -> None:
-        await self.db.execute(
-            "UPDATE users SET display_name = ? WHERE user_id = ?",
-            (new_display_name, user_id)
-        )
-        await self.db.commit()
\ No newline at end of file
+        async with self.db.transaction():
+            await self.db.execute(
+                "UPDATE users SET display_name = ? WHERE user_id = ?",
+                (new_display_name, user_id)
+            )
+        self._pending_names.pop(user_id, None)
+        if user_id in self._known_users:
+            self._remember_user(user_id, new_display_name)
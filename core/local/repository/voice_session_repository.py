@@ -0,0 +1,42 @@
+from typing import Dict
+
+from core.local.connection import WriteConnection
+
+
+class VoiceSessionRepository:
+    def __init__(self, db: WriteConnection):
+        self.db = db
+
+    async def start_session(self, user_id: int, started_at: str) -> None:
+        async with self.db.transaction():
+            await self.db.execute(
+                "INSERT OR REPLACE INTO voice_sessions (user_id, started_at, credited_until) VALUES (?, ?, ?)",
+                (user_id, started_at, started_at)
+            )
+
+    async def end_session(self, user_id: int) -> None:
+        async with self.db.transaction():
+            await self.db.execute("DELETE FROM voice_sessions WHERE user_id = ?", (user_id,))
+
+    async def get_all_sessions(self) -> Dict[int, str]:
+        """저장된 세션별로 daily_activity에 정산된 마지막 시각을 반환합니다. {user_id: credited_until}"""
+        cursor = await self.db.execute("SELECT user_id, credited_until FROM voice_sessions")
+        rows = await cursor.fetchall()
+        return {row['user_id']: row['credited_until'] for row in rows}
+
+    async def checkpoint_sessions(self, credited_until: Dict[int, str]) -> None:
+        """세션별로 daily_activity에 정산된 시각을 갱신합니다. {user_id: credited_until}"""
+        async with self.db.transaction():
+            await self.db.executemany(
+                "UPDATE voice_sessions SET credited_until = ? WHERE user_id = ?",
+                [(until, user_id) for user_id, until in credited_until.items()]
+            )
+
+    async def replace_all_sessions(self, started_at: Dict[int, str]) -> None:
+        """저장된 세션을 모두 지우고 주어진 세션으로 교체합니다. {user_id: started_at}"""
+        async with self.db.transaction():
+            await self.db.execute("DELETE FROM voice_sessions")
+            await self.db.executemany(
+                "INSERT INTO voice_sessions (user_id, started_at, credited_until) VALUES (?, ?, ?)",
+                [(user_id, started, started) for user_id, started in started_at.items()]
+            )
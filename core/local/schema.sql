@@ -1,6 +1,6 @@
 -- 데이터베이스의 버전을 저장하는 테이블
 CREATE TABLE IF NOT EXISTS db_meta (
-    key TEXT PRIMARY KEY,                  -- version
+    key TEXT PRIMARY KEY,                  -- version, command_tree:{application_id}:{guild_id} 등
     value TEXT NOT NULL                    -- version name (1)
 );
 
@@ -52,6 +52,64 @@ CREATE TABLE IF NOT EXISTS daily_activity (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
+-- 유저별 누적 활동량 (daily_activity의 합계를 쓰기 시점에 함께 갱신하는 롤업 테이블)
+CREATE TABLE IF NOT EXISTS activity_totals (
+    user_id INTEGER PRIMARY KEY,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    voice_seconds INTEGER NOT NULL DEFAULT 0,
+    points INTEGER NOT NULL DEFAULT 0,      -- message_count + voice_seconds / 60
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_activity_totals_points ON activity_totals (points DESC);
+
+-- 진행 중인 음성 채널 세션 (재시작 시 복구 및 주기적 정산용)
+CREATE TABLE IF NOT EXISTS voice_sessions (
+    user_id INTEGER PRIMARY KEY,           -- Discord 유저 ID
+    started_at TEXT NOT NULL,              -- 세션 시작 시간 (ISO 8601)
+    credited_until TEXT NOT NULL,          -- daily_activity에 정산된 마지막 시간 (ISO 8601)
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- 주기 작업(JobScheduler)의 마지막 실행 기록
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    name TEXT PRIMARY KEY,                 -- 작업 이름
+    schedule TEXT NOT NULL,                -- 실행 주기 설명 (예: 'every 600s', 'daily 08:00+09:00')
+    last_run_at TEXT,                      -- 마지막 실행 시작 시간 (ISO 8601)
+    last_duration REAL,                    -- 마지막 실행 소요 시간 (초)
+    last_lag REAL,                         -- 예정 시각 대비 실행 지연 (초)
+    last_error TEXT                        -- 마지막 실행 오류 (성공 시 NULL)
+);
+
+-- 명령어 쿨타임 (CooldownStore가 주기적으로 일괄 저장)
+CREATE TABLE IF NOT EXISTS cooldowns (
+    command TEXT NOT NULL,                 -- 명령어 이름
+    user_id INTEGER NOT NULL,              -- Discord 유저 ID
+    expires_at TEXT NOT NULL,              -- 쿨타임 종료 시간 (ISO 8601)
+    PRIMARY KEY (command, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_cooldowns_expires_at ON cooldowns (expires_at);
+
+-- 잔고 변경 원장 (추가 전용, 잔고를 바꾸는 트랜잭션 안에서 함께 기록)
+CREATE TABLE IF NOT EXISTS balance_ledger (
+    id INTEGER PRIMARY KEY,                -- 기록 순서 (rowid)
+    user_id INTEGER NOT NULL,              -- Discord 유저 ID
+    delta INTEGER NOT NULL,                -- 잔고 변화량
+    reason INTEGER NOT NULL,               -- 변경 사유 코드 (LedgerReason)
+    ref_id INTEGER,                        -- 관련 ID (송금 상대, 상품 ID, 지급한 관리자 등)
+    created_at INTEGER NOT NULL            -- 기록 시간 (Unix 초)
+);
+CREATE INDEX IF NOT EXISTS idx_balance_ledger_user ON balance_ledger (user_id, id, delta);
+
+-- 잔고 스냅샷 (ledger_id까지의 원장이 반영된 잔고, 감사 시 이후 원장만 합산)
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    user_id INTEGER NOT NULL,              -- Discord 유저 ID
+    ledger_id INTEGER NOT NULL,            -- 스냅샷에 반영된 마지막 원장 ID
+    balance INTEGER NOT NULL,              -- 해당 시점의 잔고
+    created_at INTEGER NOT NULL,           -- 스냅샷 시간 (Unix 초)
+    PRIMARY KEY (user_id, ledger_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_balance_snapshots_ledger_id ON balance_snapshots (ledger_id);
+
 -- 처벌 내역을 기록하는 테이블
 CREATE TABLE IF NOT EXISTS moderation_logs (
     case_id INTEGER PRIMARY KEY AUTOINCREMENT, -- 사건 ID
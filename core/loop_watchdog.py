@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from core.metrics import metrics
+
+
+@dataclass
+class Stall:
+    started_at: datetime.datetime
+    duration: float               # 마지막 하트비트부터 루프가 다시 응답할 때까지의 시간 (초), 멈춘 동안에는 감지 시점까지의 시간
+    task: Optional[str]           # 멈춘 시점에 실행 중이던 태스크 (코루틴 이름)
+    stack: List[str] = field(default_factory=list)  # 루프 스레드의 스택 (바깥 -> 안쪽)
+    ongoing: bool = True
+
+
+class LoopWatchdog:
+    """
+    이벤트 루프 지연을 계속 측정하고, 루프를 막은 코드의 스택을 잡아두는 감시기입니다.
+
+    루프 안의 하트비트 태스크가 `interval`초마다 시각을 기록하고, 별도 스레드가 그 시각을 확인합니다.
+    하트비트가 `threshold`초 넘게 늦어지면 스레드가 `sys._current_frames()`로 루프 스레드의 현재 스택과
+    실행 중인 태스크(`asyncio.current_task(loop)`)를 기록합니다. (루프가 막혀 있는 동안에도 스레드는 동작합니다)
+    가장 오래 멈춘 `keep`개의 기록을 보관하며, 지연 시간 분포는 metrics의 'loop_lag' 히스토그램에 쌓입니다.
+    멈춘 시간은 루프가 마지막으로 응답한 하트비트 시각부터 재는 상한값이며, 실제보다 최대 `interval`만큼 길 수 있습니다.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, keep: int = 10, stack_depth: int = 15):
+        self.interval = interval
+        self.threshold = threshold
+        self.keep = keep
+        self.stack_depth = stack_depth
+        self.stall_count = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._worst: List[Stall] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """실행 중인 이벤트 루프 안에서 호출해야 합니다."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    def worst_stalls(self) -> List[Stall]:
+        with self._lock:
+            return sorted(self._worst, key=lambda s: s.duration, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._worst = []
+            self.stall_count = 0
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            metrics.observe("loop_lag", "event_loop", max(now - expected, 0.0))
+            self._last_beat = now
+
+    def _watch(self) -> None:
+        stall: Optional[Stall] = None
+        stalled_beat = 0.0
+        while not self._stop.wait(self.interval / 2):
+            beat = self._last_beat
+            late = time.monotonic() - beat - self.interval
+
+            if stall is not None:
+                if beat != stalled_beat:
+                    # 하트비트가 다시 뛰었으므로 멈춤이 끝났습니다.
+                    stall.duration = beat - stalled_beat
+                    stall.ongoing = False
+                    print(f"[Watchdog] 이벤트 루프가 {stall.duration:.3f}초 동안 멈췄습니다. (task: {stall.task})")
+                    self._trim()
+                    stall = None
+                else:
+                    stall.duration = time.monotonic() - stalled_beat
+                continue
+
+            if late > self.threshold:
+                stall = self._capture(time.monotonic() - beat)
+                stalled_beat = beat
+
+    def _capture(self, elapsed: float) -> Stall:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-self.stack_depth:] if frame else []
+        # loop를 명시하면 다른 스레드에서도 그 루프에서 실행 중인 태스크를 조회할 수 있습니다.
+        task = asyncio.current_task(self._loop)
+        task_name = None
+        if task is not None:
+            coro = task.get_coro()
+            task_name = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+        stall = Stall(
+            started_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=elapsed),
+            duration=elapsed,
+            task=task_name,
+            stack=[line.rstrip() for line in stack],
+        )
+        with self._lock:
+            self.stall_count += 1
+            self._worst.append(stall)
+        return stall
+
+    def _trim(self) -> None:
+        """멈춤의 길이가 확정된 뒤 가장 짧은 기록부터 버려 `keep`개를 남깁니다. (진행 중인 기록은 남깁니다)"""
+        with self._lock:
+            while len(self._worst) > self.keep:
+                finished = [s for s in self._worst if not s.ongoing]
+                if not finished:
+                    break
+                self._worst.remove(min(finished, key=lambda s: s.duration))
@@ -0,0 +1,141 @@
+"""
+봇 전역에서 공유하는 가벼운 지연 시간 히스토그램과 카운터입니다.
+
+리스너(`OverwatchBot._run_event`), 앱 명령어(`MetricsCommandTree._call`), SQL(`WriteConnection`/`ReadPool`),
+디스코드 REST 요청(`http.request`)이 여기에 기록됩니다. 기록은 고정 버킷에 대한 bisect와 정수 증가뿐이므로
+핫 패스에 넣어도 부담이 거의 없습니다. `!stats`로 상위 항목을 보고, `METRICS_FILE` 환경 변수를 설정하면
+주기적으로 Prometheus 텍스트 형식으로 파일에 기록합니다.
+"""
+import bisect
+import functools
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# 히스토그램 버킷 상한 (초). 마지막 +Inf 버킷은 암묵적으로 존재합니다.
+BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """공백을 합치고 리터럴과 IN (?, ?, ...) 목록을 접어서, 같은 쿼리가 하나의 키로 모이도록 합니다."""
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+@dataclass
+class Histogram:
+    counts: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    count: int = 0
+    sum: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """버킷 상한으로 근사한 분위수입니다. 마지막 버킷에 속하면 관측된 최댓값을 반환합니다."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+
+class Metrics:
+    """
+    이름 있는 히스토그램과 카운터의 모음입니다. 키는 (계열, 라벨)이며,
+    계열은 'listener', 'app_command', 'sql', 'rest'처럼 고정된 몇 가지만 사용합니다.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.started_at = time.time()
+
+    def observe(self, family: str, label: str, seconds: float) -> None:
+        histogram = self.histograms.get((family, label))
+        if histogram is None:
+            histogram = self.histograms[(family, label)] = Histogram()
+        histogram.observe(seconds)
+
+    def inc(self, family: str, label: str, amount: int = 1) -> None:
+        key = (family, label)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def top(self, family: str, limit: int = 10, by: str = "sum") -> List[Tuple[str, Histogram]]:
+        """계열 안에서 누적 시간(sum), 최댓값(max), 호출 수(count) 등의 기준으로 상위 항목을 반환합니다."""
+        entries = [(label, h) for (f, label), h in self.histograms.items() if f == family]
+        entries.sort(key=lambda e: getattr(e[1], by), reverse=True)
+        return entries[:limit]
+
+    def counter_values(self, family: str) -> Dict[str, int]:
+        return {label: value for (f, label), value in self.counters.items() if f == family}
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+        self.started_at = time.time()
+
+    def to_prometheus(self, prefix: str = "overwatch") -> str:
+        lines: List[str] = []
+        for family in sorted({f for f, _ in self.histograms}):
+            name = f"{prefix}_{family}_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for (f, label), h in sorted(self.histograms.items()):
+                if f != family:
+                    continue
+                escaped = _escape_label(label)
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + (float("inf"),), h.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{name="{escaped}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{name="{escaped}"}} {h.sum}')
+                lines.append(f'{name}_count{{name="{escaped}"}} {h.count}')
+
+        for family in sorted({f for f, _ in self.counters}):
+            name = f"{prefix}_{family}_total"
+            lines.append(f"# TYPE {name} counter")
+            for (f, label), value in sorted(self.counters.items()):
+                if f == family:
+                    lines.append(f'{name}{{name="{_escape_label(label)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Prometheus 텍스트 형식으로 파일에 기록합니다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓰인 파일을 보지 않습니다."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 봇 전역에서 공유하는 레지스트리
+metrics = Metrics()
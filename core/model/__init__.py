@@ -1,4 +1,6 @@
 from .shop_models import ShopItem, InventoryItem, TemporaryRole
-from .user_models import User, ActivityLog, ActivityStats, ActivityLeaderboardEntry
+from .user_models import User, ActivityLog, ActivityStats, ActivityLeaderboardEntry, UserCacheInfo
 from .moderation_models import ModerationLog
-from .role_message_models import RoleButton, RoleMessage
\ No newline at end of file
+from .role_message_models import RoleButton, RoleMessage
+from .job_models import JobRecord
+from .ledger_models import LedgerReason, LedgerEntry, BalanceAudit
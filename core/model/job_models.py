@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class JobRecord:
+    name: str
+    schedule: str
+    last_run_at: Optional[str] = None
+    last_duration: Optional[float] = None
+    last_lag: Optional[float] = None
+    last_error: Optional[str] = None
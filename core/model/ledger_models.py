@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+
+class LedgerReason(IntEnum):
+    """balance_ledger.reason에 저장되는 잔고 변경 사유 코드입니다. 값은 DB에 저장되므로 바꾸지 않습니다."""
+    LABOR = 1
+    LADDER = 2
+    SLOT = 3
+    TRANSFER = 4
+    PURCHASE = 5
+    BUMP = 6
+    VOICE = 7
+    MESSAGE = 8
+    ADMIN_GRANT = 9
+    REFUND = 10
+    RESET = 11
+
+@dataclass
+class LedgerEntry:
+    id: int
+    user_id: int
+    delta: int
+    reason: LedgerReason
+    ref_id: Optional[int]
+    created_at: int  # Unix 시간 (초)
+
+@dataclass
+class BalanceAudit:
+    user_id: int
+    balance: int           # users.balance
+    expected: int          # 마지막 스냅샷 + 이후 원장 합계
+    snapshot_ledger_id: int
+    entries_since_snapshot: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.balance == self.expected
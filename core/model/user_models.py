@@ -25,4 +25,17 @@ class ActivityLeaderboardEntry:
     user_id: int
     display_name: str
     total_messages: int
-    total_voice_minutes: int
\ No newline at end of file
+    total_voice_minutes: int
+
+
+@dataclass
+class UserCacheInfo:
+    hits: int
+    misses: int
+    size: int
+    capacity: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -1,19 +1,55 @@
+import asyncio
+import hashlib
+import json
 import os
+import time
 import traceback
 
 import aiosqlite
 import discord
+from discord import app_commands
 from discord.ext import commands
 
+import cogs
+from cogs import COG_DEPENDENCIES
+from core.extension_loader import ExtensionTiming, load_levels, measure_active
 from core.local.database_manager import DatabaseManager
+from core.job_scheduler import Interval, JobScheduler
+from core.loop_watchdog import LoopWatchdog
+from core.metrics import metrics
+
+METRICS_DUMP_INTERVAL = 60  # METRICS_FILE이 설정된 경우 Prometheus 형식으로 기록하는 간격 (초)
+STARTUP_REPORT_SIZE = 5     # 시작 시 출력할 가장 느린 Cog 수
+
+
+class MetricsCommandTree(app_commands.CommandTree):
+    """앱 명령어 처리 시간을 명령어 이름별 히스토그램으로 기록하는 CommandTree입니다."""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        start = time.perf_counter()
+        try:
+            await super()._call(interaction)
+        finally:
+            command = interaction.command
+            name = command.qualified_name if command else "unknown"
+            metrics.observe("app_command", name, time.perf_counter() - start)
+            if interaction.command_failed:
+                metrics.inc("app_command_failures", name)
+
 
 class OverwatchBot(commands.Bot):
 
     def __init__(self, *args, **kwargs):
+        kwargs.setdefault("tree_cls", MetricsCommandTree)
         super().__init__(*args, **kwargs)
         self.db: DatabaseManager | None = None
+        self.scheduler: JobScheduler | None = None
+        self.watchdog = LoopWatchdog()
+        self.extension_timings: dict[str, ExtensionTiming] = {}
+        self.extension_levels: list[tuple[list[str], float]] = []  # (동시에 로드한 확장 목록, 단계 전체 시간)
         self.guild_id = int(os.getenv("GUILD_ID"))
         print(self.guild_id)
+        self._instrument_http()
 
 
         """
@@ -26,45 +62,162 @@ class OverwatchBot(commands.Bot):
                 return False
             return True
 
+    def _instrument_http(self) -> None:
+        """디스코드 REST 요청을 라우트(메서드 + 경로 템플릿)별로 계측합니다. 429 재시도 시간도 포함됩니다."""
+        request = self.http.request
+
+        async def timed_request(route, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await request(route, **kwargs)
+            except discord.HTTPException as e:
+                metrics.inc("rest_errors", f"{route.method} {route.path} {e.status}")
+                raise
+            finally:
+                metrics.observe("rest", f"{route.method} {route.path}", time.perf_counter() - start)
+
+        self.http.request = timed_request
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        # 모든 이벤트 리스너(Cog 리스너 포함)는 이 메서드를 거치므로 여기서 리스너별 처리 시간을 기록합니다.
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            metrics.observe("listener", coro.__qualname__, time.perf_counter() - start)
+
+    async def _dump_metrics(self) -> None:
+        await asyncio.to_thread(metrics.write_prometheus, os.getenv("METRICS_FILE"))
+
     async def setup_hook(self) -> None:
         """
         봇이 디스코드에 로그인하기 전에 비동기적으로 실행되는 초기화 함수입니다.
         DB 연결, 테이블 생성, Cog 로딩 등을 처리하기에 가장 적합한 위치입니다.
         """
+        # 이벤트 루프 지연 감시: DB 초기화와 Cog 로딩 중의 멈춤도 잡을 수 있도록 가장 먼저 시작합니다.
+        self.watchdog.start()
+
         # 1. DatabaseManager 인스턴스 생성 및 DB 연결/초기화
         #    DatabaseManager.create()는 aiosqlite 연결 및 스키마 실행을 담당합니다.
         print("Connecting to the database...")
         self.db = await DatabaseManager.create()
         print("Database connected and schema verified.")
 
+        # 주기 작업 스케줄러: Cog들이 cog_load에서 작업을 등록하므로 Cog 로딩 전에 시작합니다.
+        self.scheduler = JobScheduler(self.db.jobs, self.wait_until_ready)
+        await self.scheduler.start()
+        # 잔고 감사 시 합산할 원장 범위를 줄이기 위해 주기적으로 잔고 스냅샷을 남깁니다.
+        await self.scheduler.register("balance_snapshot", Interval(hours=1), self.db.ledger.take_snapshot)
+        if os.getenv("METRICS_FILE"):
+            await self.scheduler.register("metrics_dump", Interval(seconds=METRICS_DUMP_INTERVAL), self._dump_metrics)
+
         # 2. Cogs 폴더에서 Cog 파일들을 동적으로 로드
         print("Loading cogs...")
-        for filename in os.listdir("./cogs"):
-            # .py로 끝나고, __init__.py가 아닌 파일만 대상으로 함
-            if filename.endswith(".py") and not filename.startswith("__"):
-                try:
-                    # 파일명에서 .py를 제거하여 모듈 경로 생성 (e.g., cogs.economy)
-                    await self.load_extension(f'cogs.{filename[:-3]}')
-                    print(f'✅ Successfully loaded cog: {filename}')
-                except Exception as e:
-                    # Cog 로딩 중 에러 발생 시 콘솔에 출력
-                    print(f'❌ Failed to load cog {filename}: {e}')
-                    # traceback을 함께 출력하면 디버깅에 더 용이합니다.
-                    # import traceback
-                    # traceback.print_exc()
+        await self.load_cogs()
 
         # 3. 애플리케이션 커맨드(슬래시 커맨드)를 지정된 길드에 동기화
         #    개발 중에는 특정 길드에만 동기화하여 빠른 테스트가 가능합니다.
         #    전역 커맨드로 배포할 경우 이 부분을 수정해야 합니다.
-        print("Syncing command tree...")
+        #    명령어 구성이 마지막 동기화 때와 같으면 REST 호출 없이 건너뜁니다.
+        await self.sync_commands()
+
+    async def load_cogs(self) -> None:
+        """
+        cogs 폴더의 확장을 COG_DEPENDENCIES에 따라 단계별로 나누어, 같은 단계의 확장은 동시에 로드합니다.
+        확장별 소요 시간은 extension_timings에, 단계별 전체 시간은 extension_levels에 남기고,
+        끝나면 부담(import/setup 실행 시간 + cog_load 시간)이 가장 큰 Cog들을 출력합니다.
+        """
+        # .py로 끝나고, __init__.py가 아닌 파일만 대상으로 함 (e.g., economy_cog.py -> economy_cog)
+        names = [f[:-3] for f in os.listdir(os.path.dirname(cogs.__file__)) if f.endswith(".py") and not f.startswith("__")]
+        self.extension_timings = {}
+        self.extension_levels = []
+        failed: set[str] = set()
+
+        start = time.perf_counter()
+        for level in load_levels(names, COG_DEPENDENCIES):
+            level_start = time.perf_counter()
+            await asyncio.gather(*(self._load_cog(name, failed) for name in level))
+            self.extension_levels.append((level, time.perf_counter() - level_start))
+        elapsed = time.perf_counter() - start
+
+        print(f"Loaded {len(names) - len(failed)}/{len(names)} cogs in {elapsed:.3f}s "
+              f"({len(self.extension_levels)} concurrent levels). Slowest:")
+        timings = sorted(self.extension_timings.values(), key=lambda t: t.cost, reverse=True)
+        for timing in timings[:STARTUP_REPORT_SIZE]:
+            print(f"  {timing.name}: {timing.cost * 1000:.1f}ms "
+                  f"(import/setup {timing.import_and_setup * 1000:.1f}ms, cog_load {timing.cog_load * 1000:.1f}ms)")
+
+    async def _load_cog(self, name: str, failed: set[str]) -> None:
+        timing = self.extension_timings[f"cogs.{name}"] = ExtensionTiming(f"cogs.{name}")
+        failed_deps = [dep for dep in COG_DEPENDENCIES.get(name, ()) if dep in failed]
+        if failed_deps:
+            failed.add(name)
+            timing.error = f"skipped: {', '.join(failed_deps)} failed to load"
+            print(f'❌ Skipped cog {name}: {timing.error}')
+            return
+
+        def record(seconds: float) -> None:
+            timing.active += seconds
+
+        start = time.perf_counter()
+        try:
+            await measure_active(self.load_extension(timing.name), record)
+            print(f'✅ Successfully loaded cog: {name}')
+        except Exception as e:
+            # Cog 로딩 중 에러 발생 시 traceback과 함께 콘솔에 출력
+            failed.add(name)
+            timing.error = str(e)
+            print(f'❌ Failed to load cog {name}: {e}')
+            traceback.print_exception(e)
+        finally:
+            timing.wall = time.perf_counter() - start
+            metrics.observe("extension", timing.name, timing.cost)
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs) -> None:
+        # cog_load는 add_cog 안에서 실행되므로, 확장별 시간 중 Cog 초기화에 쓴 부분을 여기서 따로 잽니다.
+        # 전체 시간(cog_load)은 await한 DB I/O를 포함하고, 실행 시간(cog_load_active)은 import/setup 시간 계산에 씁니다.
+        timing = self.extension_timings.get(cog.__module__)
+        if timing is None:
+            return await super().add_cog(cog, **kwargs)
+
+        def record(seconds: float) -> None:
+            timing.cog_load_active += seconds
+
+        start = time.perf_counter()
+        try:
+            await measure_active(super().add_cog(cog, **kwargs), record)
+        finally:
+            timing.cog_load += time.perf_counter() - start
+
+    def command_tree_fingerprint(self, guild: discord.abc.Snowflake) -> str:
+        """길드에 등록될 명령어 트리를 직렬화한 값의 sha256입니다. 명령어 순서와 관계없이 같은 값이 나옵니다."""
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+            key=lambda c: (c.get("type", 1), c["name"])
+        )
+        serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    async def sync_commands(self, force: bool = False) -> bool:
+        """
+        전역 명령어를 길드로 복사하고, 지문이 DB에 저장된 값과 다르거나 `force`일 때만 `tree.sync`를 호출합니다.
+        동기화했으면 True를 반환합니다.
+        """
         guild_obj = discord.Object(id=self.guild_id)
         self.tree.clear_commands(guild=guild_obj)
-        # await self.tree.sync(guild=guild_obj)
-        # print("Clear command tree.")
-
         self.tree.copy_global_to(guild=guild_obj)
+
+        fingerprint = self.command_tree_fingerprint(guild_obj)
+        meta_key = f"command_tree:{self.application_id}:{self.guild_id}"
+        if not force and await self.db.meta.get(meta_key) == fingerprint:
+            print(f"Command tree unchanged ({fingerprint[:12]}), skipping sync.")
+            return False
+
+        print("Syncing command tree...")
         await self.tree.sync(guild=guild_obj)
-        print("Command tree synced.")
+        await self.db.meta.set(meta_key, fingerprint)
+        print(f"Command tree synced ({fingerprint[:12]}).")
+        return True
 
     async def on_ready(self):
         """
@@ -78,9 +231,16 @@ class OverwatchBot(commands.Bot):
 
     async def close(self):
         """
-        봇이 종료될 때 호출됩니다. DB 연결을 안전하게 닫습니다.
+        봇이 종료될 때 호출됩니다. 버퍼에 남은 활동량을 기록한 뒤 DB 연결을 안전하게 닫습니다.
         """
+        if self.scheduler:
+            await self.scheduler.close()
         if self.db:
+            await self.db.activity.close()
+            print("Pending activity flushed.")
+            await self.db.cooldowns.close()
+            print("Pending cooldowns saved.")
             await self.db.close()
             print("Database connection closed.")
+        await self.watchdog.close()
         await super().close()
@@ -0,0 +1,391 @@
+"""
+게이트웨이 이벤트 재생 벤치마크입니다.
+
+합성한 `discord.Message`, `VoiceState`, `Interaction` 대역(MagicMock(spec=...))을 실제 Cog 리스너
+(`EventCog`, `QnaCog`, `AutoVcCog`)와 슬래시 명령어 콜백에 흘려보내고, 리스너별 처리량(events/sec)과
+p50/p99 지연 시간을 출력합니다. DB는 임시 SQLite 파일을 사용하며, REST 호출은 모두 mock이 받아
+호출 횟수만 셉니다. 디스코드에 연결하지 않으므로 토큰이 필요 없습니다.
+
+    python -m core.test.gateway_bench --messages 20000 --voice 2000 --commands 2000
+
+명령어 콜백은 `app_commands` 체크(권한, 쿨타임 데코레이터)를 거치지 않고 직접 호출합니다.
+슬롯머신은 연출용 `asyncio.sleep(1.8)`이 지연 시간을 지배하므로 측정 대상에서 제외합니다.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+from discord.http import HTTPClient
+
+GUILD_ID = 1000
+QNA_CHANNEL_ID = 2000
+GENERATOR_CHANNEL_ID = 3000
+CATEGORY_ID = 3001
+TEXT_CHANNEL_ID = 4000
+VOICE_CHANNEL_ID = 4001
+
+EXTENSIONS = ["cogs.event_cog", "cogs.qna_cog", "cogs.auto_vc_cog", "cogs.economy_cog"]
+
+
+@dataclass
+class HandlerStats:
+    name: str
+    latencies: List[float] = field(default_factory=list)  # 초
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def events_per_sec(self) -> float:
+        total = sum(self.latencies)
+        return self.count / total if total else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    events: int
+    wall_time: float
+    rest_calls: int
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.wall_time if self.wall_time else 0.0
+
+
+class FakeRest:
+    """mock 채널/멤버의 비동기 메서드를 REST 엔드포인트처럼 세는 대역입니다."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def endpoint(self, name: str, result: Optional[Callable] = None) -> AsyncMock:
+        async def call(*args, **kwargs):
+            self.calls[name] += 1
+            return result(*args, **kwargs) if result else None
+        return AsyncMock(side_effect=call)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+
+class GatewayBench:
+    def __init__(self, users: int = 500, seed: int = 0):
+        self.user_count = users
+        self.random = random.Random(seed)
+        self.rest = FakeRest()
+        self.stats: Dict[str, HandlerStats] = {}
+        self.scenarios: List[ScenarioResult] = []
+        self._ids = itertools.count(10_000_000)
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.bot = None
+        self.last_created_channel: Optional[MagicMock] = None
+        self._voice_states: Dict[Optional[int], MagicMock] = {}
+        self._channel_pool: List[MagicMock] = []
+
+    # --- 준비 ---
+
+    async def setup(self) -> None:
+        os.environ.setdefault("GUILD_ID", str(GUILD_ID))
+        # 봇 모듈은 GUILD_ID 환경 변수를 읽으므로 설정한 뒤에 불러옵니다.
+        from core import OverwatchBot
+        from core.job_scheduler import JobScheduler
+        from core.local.database_manager import DatabaseManager
+
+        bot = OverwatchBot(command_prefix="!", intents=discord.Intents.all(), help_command=None)
+        bot.guild_id = GUILD_ID
+        bot.http = MagicMock(spec=HTTPClient)
+        bot.db = await DatabaseManager.create(db_path=os.path.join(self._tmpdir.name, "bench.db"))
+        # 스케줄러는 시작하지 않고 등록만 받습니다. (주기 작업은 측정 대상이 아닙니다)
+        bot.scheduler = JobScheduler(bot.db.jobs)
+        self.bot = bot
+
+        self.guild = self._make_guild()
+        self.members = [self._make_member(next(self._ids)) for _ in range(self.user_count)]
+        for member in self.members:
+            await bot.db.users.get_or_create_user(member.id, member.display_name)
+        await bot.db.qna.add_channel(QNA_CHANNEL_ID, GUILD_ID)
+        await bot.db.auto_vc.add_generator(GENERATOR_CHANNEL_ID, CATEGORY_ID, "통화방", GUILD_ID)
+
+        for extension in EXTENSIONS:
+            await bot.load_extension(extension)
+
+    async def teardown(self) -> None:
+        bot = self.bot
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+        await bot.db.activity.close()
+        await bot.db.cooldowns.close()
+        await bot.db.close()
+        self._tmpdir.cleanup()
+
+    def _make_guild(self) -> MagicMock:
+        guild = MagicMock(spec=discord.Guild)
+        guild.id = GUILD_ID
+        self.channels: Dict[int, MagicMock] = {}
+        guild.get_channel.side_effect = self.channels.get
+
+        self.category = MagicMock(spec=discord.CategoryChannel)
+        self.category.id = CATEGORY_ID
+        self.category.position = 10
+        self.category.voice_channels = []
+        self.category.create_voice_channel = self.rest.endpoint("create_voice_channel", self._create_voice_channel)
+        self.channels[CATEGORY_ID] = self.category
+
+        self.text_channel = self._make_text_channel(TEXT_CHANNEL_ID, guild)
+        self.qna_channel = self._make_text_channel(QNA_CHANNEL_ID, guild)
+        self.voice_channel = self._make_voice_channel(VOICE_CHANNEL_ID)
+        self.generator_channel = self._make_voice_channel(GENERATOR_CHANNEL_ID)
+        return guild
+
+    def _make_text_channel(self, channel_id: int, guild: MagicMock) -> MagicMock:
+        channel = MagicMock(spec=discord.TextChannel)
+        channel.id = channel_id
+        channel.guild = guild
+        channel.send = self.rest.endpoint("channel.send", lambda *a, **k: self._make_sent_message())
+        self.channels[channel_id] = channel
+        return channel
+
+    def _make_voice_channel(self, channel_id: int, position: int = 0) -> MagicMock:
+        channel = MagicMock(spec=discord.VoiceChannel)
+        channel.id = channel_id
+        channel.position = position
+        channel.members = []
+        channel.delete = self.rest.endpoint("channel.delete")
+        self.channels[channel_id] = channel
+        return channel
+
+    def _create_voice_channel(self, name: str, **kwargs) -> MagicMock:
+        # 미리 만들어 둔 채널을 꺼내 mock 생성 비용이 AutoVcCog의 지연 시간에 섞이지 않게 합니다.
+        channel = self._channel_pool.pop() if self._channel_pool else self._make_voice_channel(next(self._ids))
+        self.channels[channel.id] = channel
+        channel.position = kwargs.get("position", 0)
+        channel.name = name
+        self.last_created_channel = channel
+        return channel
+
+    def _make_sent_message(self) -> MagicMock:
+        message = MagicMock(spec=discord.Message)
+        message.id = next(self._ids)
+        return message
+
+    def _make_member(self, user_id: int) -> MagicMock:
+        member = MagicMock(spec=discord.Member)
+        member.id = user_id
+        member.bot = False
+        member.display_name = f"user{user_id}"
+        member.mention = f"<@{user_id}>"
+        member.guild = self.guild
+        member.move_to = self.rest.endpoint("member.move_to")
+        member.send = self.rest.endpoint("member.send")
+        return member
+
+    def _make_message(self, author: MagicMock, channel: MagicMock) -> MagicMock:
+        message = MagicMock(spec=discord.Message)
+        message.id = next(self._ids)
+        message.author = author
+        message.guild = self.guild
+        message.channel = channel
+        message.content = "벤치마크 메시지"
+        message.interaction = None
+        message.create_thread = self.rest.endpoint("create_thread", lambda *a, **k: self._make_thread())
+        return message
+
+    def _make_thread(self) -> MagicMock:
+        thread = MagicMock(spec=discord.Thread)
+        thread.send = self.rest.endpoint("thread.send")
+        return thread
+
+    def _voice_state(self, channel: Optional[MagicMock]) -> MagicMock:
+        # 리스너는 VoiceState.channel만 읽으므로 채널별로 하나를 재사용합니다.
+        key = channel.id if channel is not None else None
+        state = self._voice_states.get(key)
+        if state is None:
+            state = self._voice_states[key] = MagicMock(spec=discord.VoiceState)
+            state.channel = channel
+        return state
+
+    def _make_interaction(self, member: MagicMock) -> MagicMock:
+        interaction = MagicMock(spec=discord.Interaction)
+        interaction.user = member
+        interaction.guild = self.guild
+        interaction.response = MagicMock(spec=discord.InteractionResponse)
+        interaction.response.send_message = self.rest.endpoint("interaction.send_message")
+        interaction.response.defer = self.rest.endpoint("interaction.defer")
+        interaction.followup = MagicMock(spec=discord.Webhook)
+        interaction.followup.send = self.rest.endpoint("followup.send")
+        interaction.edit_original_response = self.rest.endpoint("interaction.edit_original_response")
+        return interaction
+
+    # --- 실행 ---
+
+    async def _dispatch(self, event: str, *args) -> None:
+        """봇에 등록된 `on_{event}` 리스너를 차례로 실행하며 리스너별 지연 시간을 기록합니다."""
+        for listener in self.bot.extra_events.get(f"on_{event}", []):
+            await self._timed(listener.__qualname__, listener(*args))
+
+    async def _timed(self, name: str, coro) -> None:
+        stats = self.stats.setdefault(name, HandlerStats(name))
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            stats.errors += 1
+            if stats.errors == 1:
+                print(f"[Bench] {name} 실행 중 오류 발생: {type(e).__name__}: {e}")
+        stats.latencies.append(time.perf_counter() - start)
+
+    async def _scenario(self, name: str, events: int, run) -> None:
+        """`run`의 전체 소요 시간을 잽니다. mock 생성 비용이 섞이지 않도록 이벤트는 미리 만들어 둡니다."""
+        rest_before = self.rest.total
+        start = time.perf_counter()
+        await run()
+        self.scenarios.append(ScenarioResult(name, events, time.perf_counter() - start, self.rest.total - rest_before))
+
+    async def run_messages(self, count: int, qna_ratio: float = 0.05) -> None:
+        messages = [
+            self._make_message(
+                self.random.choice(self.members),
+                self.qna_channel if self.random.random() < qna_ratio else self.text_channel
+            )
+            for _ in range(count)
+        ]
+
+        async def run():
+            for message in messages:
+                await self._dispatch("message", message)
+            # 버퍼에 모인 활동량 기록도 메시지 처리 비용에 포함합니다.
+            await self._timed("ActivityAggregator.flush", self.bot.db.activity.flush())
+        await self._scenario("messages", count, run)
+
+    async def run_voice(self, cycles: int) -> None:
+        """입장/퇴장과 자동 통화방 생성(생성기 입장 -> 새 채널로 이동 -> 퇴장)을 번갈아 재생합니다."""
+        events = 0
+        for _ in range(cycles // 2):
+            channel = self._make_voice_channel(next(self._ids))
+            del self.channels[channel.id]
+            self._channel_pool.append(channel)
+        for channel in (None, self.voice_channel, self.generator_channel):
+            self._voice_state(channel)
+
+        async def run():
+            nonlocal events
+            for i in range(cycles):
+                member = self.random.choice(self.members)
+                if i % 2 == 0:
+                    path = [None, self.voice_channel, None]
+                else:
+                    self.last_created_channel = None
+                    await self._voice_update(member, None, self.generator_channel)
+                    events += 1
+                    # AutoVcCog가 만든 채널로 옮겨진 뒤 퇴장합니다.
+                    path = [self.generator_channel, self.last_created_channel, None]
+                for before, after in zip(path, path[1:]):
+                    await self._voice_update(member, before, after)
+                    events += 1
+        await self._scenario("voice", 0, run)
+        self.scenarios[-1].events = events
+
+    async def _voice_update(self, member, before, after) -> None:
+        if before is not None and member in before.members:
+            before.members.remove(member)
+        if after is not None:
+            after.members.append(member)
+        await self._dispatch("voice_state_update", member, self._voice_state(before), self._voice_state(after))
+
+    async def run_commands(self, count: int) -> None:
+        from core.model import LedgerReason
+
+        tree = self.bot.tree
+        balance = tree.get_command("잔고")
+        transfer = tree.get_command("송금")
+        labor = tree.get_command("노동")
+        ladder = tree.get_command("사다리타기")
+        for member in self.members:
+            await self.bot.db.users.update_balance(member.id, 1_000_000, LedgerReason.ADMIN_GRANT)
+        positions = [discord.app_commands.Choice(name=p, value=p) for p in ("좌", "중", "우")]
+
+        calls = []
+        for i in range(count):
+            member = self.random.choice(self.members)
+            kind = i % 4
+            if kind == 0:
+                calls.append((balance, member, (None,)))
+            elif kind == 1:
+                calls.append((transfer, member, (self.random.choice(self.members), 100)))
+            elif kind == 2:
+                calls.append((labor, member, ()))
+            else:
+                calls.append((ladder, member, (100, self.random.choice(positions))))
+        interactions = [self._make_interaction(member) for _, member, _ in calls]
+
+        async def run():
+            for (command, member, args), interaction in zip(calls, interactions):
+                # 쿨타임이 걸린 명령어도 매번 측정되도록 호출 전에 쿨타임을 해제합니다.
+                if self.bot.db.cooldowns.remaining(command.callback.__name__, member.id) > 0:
+                    self.bot.db.cooldowns.reset(command.callback.__name__, member.id)
+                await self._timed(f"/{command.name}", command.callback(command.binding, interaction, *args))
+        await self._scenario("commands", count, run)
+
+    # --- 보고 ---
+
+    def report(self) -> str:
+        lines = [f"{'scenario':<12} {'events':>8} {'wall(s)':>9} {'events/s':>10} {'REST':>7}"]
+        for s in self.scenarios:
+            lines.append(f"{s.name:<12} {s.events:>8} {s.wall_time:>9.3f} {s.events_per_sec:>10.1f} {s.rest_calls:>7}")
+        lines.append("")
+        lines.append(f"{'handler':<42} {'calls':>7} {'events/s':>10} {'p50(ms)':>9} {'p99(ms)':>9} {'errors':>7}")
+        for st in sorted(self.stats.values(), key=lambda s: s.name):
+            lines.append(
+                f"{st.name:<42} {st.count:>7} {st.events_per_sec:>10.1f} "
+                f"{st.percentile(0.5) * 1000:>9.3f} {st.percentile(0.99) * 1000:>9.3f} {st.errors:>7}"
+            )
+        return "\n".join(lines)
+
+
+async def run_benchmark(messages: int = 5000, voice: int = 500, commands: int = 1000,
+                        users: int = 500, seed: int = 0) -> GatewayBench:
+    bench = GatewayBench(users=users, seed=seed)
+    await bench.setup()
+    try:
+        await bench.run_messages(messages)
+        await bench.run_voice(voice)
+        await bench.run_commands(commands)
+    finally:
+        await bench.teardown()
+    return bench
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="게이트웨이 이벤트 재생 벤치마크")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--voice", type=int, default=500, help="음성 입장/퇴장 사이클 수")
+    parser.add_argument("--commands", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bench = asyncio.run(run_benchmark(args.messages, args.voice, args.commands, args.users, args.seed))
+    print(bench.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+cogs 폴더의 모든 확장이 import되고 봇에 추가되는지 확인합니다.
+(Cog 메서드 이름 규칙 위반처럼 import 시점에만 드러나는 오류로 Cog 하나가 통째로 빠지는 것을 막습니다)
+"""
+import asyncio
+import os
+from unittest.mock import MagicMock
+
+import discord
+from discord.http import HTTPClient
+
+import cogs
+
+# Cog 생성자가 읽는 채널 ID 환경 변수
+CHANNEL_ENV_VARS = (
+    "BOOST_MESSAGE_SEND_CHANNEL", "BIRTH_DAY_MESSAGE_SEND_CHANNEL", "DELETE_MESSAGE_SEND_CHANNEL",
+    "SHOP_LOG_CHANNEL", "MODERATION_MESSAGE_SEND_CHANNEL",
+)
+
+
+async def _load_all(db_path: str):
+    from core import OverwatchBot
+    from core.job_scheduler import JobScheduler
+    from core.local.database_manager import DatabaseManager
+
+    bot = OverwatchBot(command_prefix="!", intents=discord.Intents.all(), help_command=None)
+    bot.http = MagicMock(spec=HTTPClient)
+    bot.db = await DatabaseManager.create(db_path=db_path)
+    # 스케줄러는 시작하지 않고 등록만 받습니다.
+    bot.scheduler = JobScheduler(bot.db.jobs)
+    try:
+        await bot.load_cogs()
+        return dict(bot.extension_timings), set(bot.extensions)
+    finally:
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+        await bot.db.activity.close()
+        await bot.db.cooldowns.close()
+        await bot.db.close()
+
+
+def test_every_cog_loads(tmp_path, monkeypatch):
+    monkeypatch.setenv("GUILD_ID", "1")
+    for name in CHANNEL_ENV_VARS:
+        monkeypatch.setenv(name, "1")
+
+    timings, loaded = asyncio.run(_load_all(str(tmp_path / "database.db")))
+
+    expected = {
+        f"cogs.{f[:-3]}" for f in os.listdir(os.path.dirname(cogs.__file__))
+        if f.endswith(".py") and not f.startswith("__")
+    }
+    errors = {name: t.error for name, t in timings.items() if t.error}
+    assert not errors, f"로드에 실패한 Cog: {errors}"
+    assert loaded == expected
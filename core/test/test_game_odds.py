@@ -0,0 +1,79 @@
+"""
+배당표가 EconomyCog에 있던 기존 확률(누적 구간 비교)과 같은지, 표본 추출이 그 확률을 따르는지 확인합니다.
+"""
+import random
+
+import pytest
+
+from core.game_odds import LABOR_TABLE, LADDER_TABLE, SLOT_TABLE, PayoutTable, simulate
+
+# 배당표 도입 전 EconomyCog의 확률 (%), 지급 범위 또는 배율
+PREVIOUS_ODDS = {
+    LABOR_TABLE: {
+        "0~10": (49.99999, (0, 10)),
+        "10~30": (30, (10, 30)),
+        "30~50": (13, (30, 50)),
+        "50~100": (5, (50, 100)),
+        "100~500": (1.5, (100, 500)),
+        "500~1000": (0.5, (500, 1000)),
+        "1000~10000": (0.00001, (1000, 10000)),
+    },
+    # 좌/중/우 중 하나를 맞히면 베팅금 + 베팅금의 2배
+    LADDER_TABLE: {
+        "lose": (200 / 3, 0),
+        "win": (100 / 3, 3),
+    },
+    SLOT_TABLE: {
+        "꽝": (80, 0),
+        "메달": (10, 2),
+        "보석": (5, 3),
+        "달러": (2.5, 5),
+        "주머니": (2, 7),
+        "100": (0.5, 10),
+    },
+}
+SAMPLES = 200_000
+
+
+@pytest.mark.parametrize("table", PREVIOUS_ODDS, ids=lambda t: t.name)
+def test_weights_match_previous_odds(table: PayoutTable):
+    expected = PREVIOUS_ODDS[table]
+    assert [o.label for o in table.outcomes] == list(expected)
+    for outcome in table.outcomes:
+        percent, payout = expected[outcome.label]
+        assert table.probability(outcome) * 100 == pytest.approx(percent, abs=1e-4)
+        assert (outcome.amount if outcome.amount else outcome.multiplier) == payout
+
+
+@pytest.mark.parametrize("table", PREVIOUS_ODDS, ids=lambda t: t.name)
+def test_sampled_distribution(table: PayoutTable):
+    rng = random.Random(1234)
+    counts = {o.label: 0 for o in table.outcomes}
+    for _ in range(SAMPLES):
+        counts[table.sample(rng).label] += 1
+
+    for outcome in table.outcomes:
+        p = table.probability(outcome)
+        # 이항 분포 기준 5 표준편차 이내
+        tolerance = 5 * (SAMPLES * p * (1 - p)) ** 0.5 + 1
+        assert abs(counts[outcome.label] - SAMPLES * p) <= tolerance, outcome.label
+
+
+def test_sample_amount_stays_in_range():
+    rng = random.Random(1234)
+    for _ in range(10_000):
+        outcome, amount = LABOR_TABLE.sample_amount(rng)
+        assert outcome.amount[0] <= amount <= outcome.amount[1]
+
+
+def test_simulate_matches_expected_values():
+    pytest.importorskip("numpy")
+    slot = simulate(SLOT_TABLE, 2_000_000, bet=1000, seed=1234)
+    assert slot.house_edge == pytest.approx(1 - SLOT_TABLE.expected_multiplier, abs=0.005)
+
+    ladder = simulate(LADDER_TABLE, 2_000_000, bet=1000, seed=1234)
+    assert ladder.house_edge == pytest.approx(0, abs=0.005)
+
+    labor = simulate(LABOR_TABLE, 2_000_000, seed=1234, cooldown_hours=1)
+    assert labor.house_edge is None
+    assert labor.mean_net == pytest.approx(LABOR_TABLE.expected_amount, rel=0.02)
@@ -0,0 +1,27 @@
+"""
+게이트웨이 벤치마크 하네스가 실제 Cog 리스너와 명령어 콜백을 오류 없이 구동하는지 작은 규모로 확인합니다.
+처리량 수치는 환경에 따라 달라지므로 검사하지 않습니다.
+"""
+import asyncio
+
+from core.test.gateway_bench import run_benchmark
+
+EXPECTED_HANDLERS = {
+    "EventCog.on_message",
+    "QnaCog.on_message",
+    "EventCog.on_voice_state_update",
+    "AutoVcCog.on_voice_state_update",
+    "ActivityAggregator.flush",
+    "/잔고", "/송금", "/노동", "/사다리타기",
+}
+
+
+def test_benchmark_drives_every_handler_without_errors():
+    bench = asyncio.run(run_benchmark(messages=200, voice=20, commands=40, users=20))
+
+    assert EXPECTED_HANDLERS <= set(bench.stats)
+    errors = {name: s.errors for name, s in bench.stats.items() if s.errors}
+    assert not errors, f"리스너 실행 중 오류 발생: {errors}"
+    # 자동 통화방은 사이클마다 생성되고 퇴장 시 삭제되어야 합니다.
+    assert bench.rest.calls["create_voice_channel"] == 10
+    assert bench.rest.calls["channel.delete"] == 10
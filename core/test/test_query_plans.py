@@ -0,0 +1,263 @@
+"""
+레포지토리가 실행하는 모든 SQL의 쿼리 플랜을 검사합니다.
+
+임시 DB에 대해 각 레포지토리 메서드를 실제로 호출하면서 `set_trace_callback`으로 실행된 SQL을 수집하고,
+수집한 문장마다 `EXPLAIN QUERY PLAN`을 실행해 큰 테이블을 인덱스 없이 스캔하는 쿼리가 있으면 실패합니다.
+"""
+import asyncio
+import datetime
+import inspect
+import sqlite3
+from typing import List, Tuple
+
+import pytest
+
+from core.local.database_manager import DatabaseManager
+from core.local.repository import UserRepository, ShopRepository
+from core.local.repository.auto_vc_repository import AutoVcRepository
+from core.local.repository.moderation_repository import ModerationRepository
+from core.local.repository.qna_repository import QnaRepository
+from core.local.repository.role_message_repository import RoleMessageRepository
+from core.local.repository.voice_session_repository import VoiceSessionRepository
+from core.local.repository.job_repository import JobRepository
+from core.local.repository.cooldown_repository import CooldownRepository
+from core.local.repository.ledger_repository import LedgerRepository
+from core.local.repository.meta_repository import MetaRepository
+from core.model import LedgerReason, RoleButton
+
+# DatabaseManager 속성 이름 -> 레포지토리 클래스
+REPOSITORIES = {
+    "users": UserRepository,
+    "shop": ShopRepository,
+    "moderation": ModerationRepository,
+    "auto_vc": AutoVcRepository,
+    "role_message": RoleMessageRepository,
+    "qna": QnaRepository,
+    "voice_sessions": VoiceSessionRepository,
+    "jobs": JobRepository,
+    "cooldowns": CooldownRepository,
+    "ledger": LedgerRepository,
+    "meta": MetaRepository,
+}
+
+# 행 수가 설정 개수 수준에 머무는 테이블은 전체 스캔을 허용합니다.
+SMALL_TABLES = {
+    "db_meta", "shop_items", "auto_vc_generators", "managed_auto_vc_channels",
+    "role_messages", "qna_channels", "voice_sessions", "scheduled_jobs",
+}
+
+# 전체 데이터를 의도적으로 훑는 관리/배치 작업입니다.
+FULL_SCAN_ALLOWED = {
+    "users.preload_cache",
+    "users.reset_all_balances",
+    "users.sync_guild_members",
+    "users.rebuild_activity_totals",
+    "ledger.find_mismatches",
+    "shop.get_all_temporary_roles",        # 시작 시 만료 일정 전체를 불러옵니다.
+    # 인덱스 순서로 읽다가 LIMIT에서 멈추는 상위 N개 조회입니다.
+    "users.get_activity_leaderboard",
+}
+
+# 트레이스에 함께 잡히지만 플랜 검사 대상이 아닌 문장
+SKIPPED_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA", "SAVEPOINT", "RELEASE")
+
+
+class SqlRecorder:
+    def __init__(self):
+        self.current = None
+        self.statements: List[Tuple[str, str]] = []
+        self.called = set()
+
+    def trace(self, sql: str):
+        if self.current:
+            self.statements.append((self.current, sql))
+
+    async def run(self, name: str, coro):
+        self.current = name
+        self.called.add(name)
+        try:
+            return await coro
+        finally:
+            self.current = None
+
+
+async def _attach(db: DatabaseManager, recorder: SqlRecorder):
+    await db._db._connection.set_trace_callback(recorder.trace)
+    for connection in db._readers._connections:
+        await connection.set_trace_callback(recorder.trace)
+
+
+async def _exercise_repositories(db: DatabaseManager, r: SqlRecorder):
+    today = datetime.date.today().isoformat()
+    now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    # --- users ---
+    users = db.users
+    await r.run("users.preload_cache", users.preload_cache())
+    for user_id in range(1, 6):
+        await r.run("users.get_or_create_user", users.get_or_create_user(user_id, f"user{user_id}"))
+    users.note_display_name(1, "renamed")
+    await r.run("users.flush_display_names", users.flush_display_names())
+    await r.run("users.get_user", users.get_user(1))
+    await r.run("users.update_balance", users.update_balance(1, 100, LedgerReason.ADMIN_GRANT, ref_id=2))
+    await r.run("users.ensure_user", users.ensure_user(99, "ensured"))
+    await r.run("users.try_debit", users.try_debit(1, 50, LedgerReason.SLOT, payout=10))
+    await r.run("users.transfer", users.transfer(1, 2, 10))
+    await r.run("users.get_balance_leaderboard", users.get_balance_leaderboard(10))
+    await r.run("users.apply_message_activity",
+                users.apply_message_activity({6: "user6"}, {(1, today): 3, (6, today): 1}, 2))
+    await r.run("users.log_voice_activity", users.log_voice_activity(1, 120))
+    await r.run("users.get_activity_stats", users.get_activity_stats(1, today, today))
+    await r.run("users.get_activity_leaderboard", users.get_activity_leaderboard(10))
+    await r.run("users.set_guild_membership", users.set_guild_membership(2, False))
+    await r.run("users.sync_guild_members", users.sync_guild_members([1, 2, 3]))
+    await r.run("users.rebuild_activity_totals", users.rebuild_activity_totals(batch_size=2))
+    await r.run("users.set_birthday", users.set_birthday(1, "01-01"))
+    await r.run("users.get_users_with_birthday", users.get_users_with_birthday("01-01"))
+    await r.run("users.update_display_name", users.update_display_name(1, "user1"))
+
+    # --- ledger (잔고 변경 원장, reset_all_balances 전에 실행하여 스냅샷 이후 기록이 남도록 합니다) ---
+    ledger = db.ledger
+    await r.run("ledger.record", ledger.record(1, 5, LedgerReason.LABOR))
+    await r.run("ledger.record_many", ledger.record_many([(1, 1), (2, 1)], LedgerReason.MESSAGE))
+    await r.run("ledger.take_snapshot", ledger.take_snapshot())
+    await r.run("users.update_balance", users.update_balance(1, 10, LedgerReason.LABOR))
+    await r.run("ledger.audit_user", ledger.audit_user(1))
+    await r.run("ledger.find_mismatches", ledger.find_mismatches())
+    await r.run("ledger.get_recent_entries", ledger.get_recent_entries(1))
+    await r.run("users.reset_all_balances", users.reset_all_balances())
+
+    # --- shop ---
+    shop = db.shop
+    item = await r.run("shop.add_item", shop.add_item(item_type="ITEM", name="item", price=10))
+    await r.run("shop.get_all_items", shop.get_all_items())
+    await r.run("shop.get_item_by_id", shop.get_item_by_id(item.id))
+    await r.run("shop.get_item_by_name", shop.get_item_by_name("item"))
+    await r.run("shop.add_to_inventory", shop.add_to_inventory(1, item.id))
+    await r.run("shop.get_user_inventory", shop.get_user_inventory(1))
+    await r.run("shop.add_temporary_role", shop.add_temporary_role(1, 10, datetime.timedelta(days=1)))
+    await r.run("shop.get_all_temporary_roles", shop.get_all_temporary_roles())
+    await r.run("shop.get_temporary_role", shop.get_temporary_role(1, 10))
+    await r.run("shop.remove_expired_temporary_roles", shop.remove_expired_temporary_roles([(1, 10)], now_iso))
+    await r.run("shop.remove_item_by_name", shop.remove_item_by_name("item"))
+
+    # --- moderation ---
+    moderation = db.moderation
+    await r.run("moderation.add_warning", moderation.add_warning(1, 2, "reason", 1))
+    await r.run("moderation.add_ban", moderation.add_ban(1, 2, "reason"))
+    await r.run("moderation.get_user_logs", moderation.get_user_logs(1))
+    await r.run("moderation.get_user_warring", moderation.get_user_warring(1))
+
+    # --- auto_vc ---
+    auto_vc = db.auto_vc
+    await r.run("auto_vc.add_generator", auto_vc.add_generator(100, 200, "VC", 1))
+    await r.run("auto_vc.get_generator", auto_vc.get_generator(100))
+    await r.run("auto_vc.get_all_generators", auto_vc.get_all_generators(1))
+    await r.run("auto_vc.add_managed_channel", auto_vc.add_managed_channel(300, 1, 1, 100))
+    await r.run("auto_vc.get_all_managed_channels", auto_vc.get_all_managed_channels())
+    await r.run("auto_vc.get_channel_owner", auto_vc.get_channel_owner(300))
+    await r.run("auto_vc.remove_managed_channel", auto_vc.remove_managed_channel(300))
+    await r.run("auto_vc.remove_managed_channels", auto_vc.remove_managed_channels([300, 301]))
+    await r.run("auto_vc.remove_generator", auto_vc.remove_generator(100))
+
+    # --- role_message ---
+    role_message = db.role_message
+    await r.run("role_message.create_role_message", role_message.create_role_message(1, 400, 401, "content", "#3498DB"))
+    await r.run("role_message.get_by_channel_id", role_message.get_by_channel_id(400))
+    await r.run("role_message.get_all", role_message.get_all())
+    await r.run("role_message.update_message", role_message.update_message(400, "changed", "#FFFFFF"))
+    await r.run("role_message.update_buttons", role_message.update_buttons(400, [RoleButton(1, "label", "😀")]))
+    await r.run("role_message.delete_role_message", role_message.delete_role_message(400))
+
+    # --- qna ---
+    qna = db.qna
+    await r.run("qna.add_channel", qna.add_channel(500, 1))
+    await r.run("qna.get_channel_by_id", qna.get_channel_by_id(500))
+    await r.run("qna.get_all_channels", qna.get_all_channels())
+    await r.run("qna.update_pinned_message", qna.update_pinned_message(500, 501, "title", "content"))
+    await r.run("qna.remove_pinned_message", qna.remove_pinned_message(500))
+    await r.run("qna.remove_channel", qna.remove_channel(500))
+
+    # --- voice_sessions ---
+    voice_sessions = db.voice_sessions
+    await r.run("voice_sessions.start_session", voice_sessions.start_session(1, now_iso))
+    await r.run("voice_sessions.checkpoint_sessions", voice_sessions.checkpoint_sessions({1: now_iso}))
+    await r.run("voice_sessions.get_all_sessions", voice_sessions.get_all_sessions())
+    await r.run("voice_sessions.replace_all_sessions", voice_sessions.replace_all_sessions({1: now_iso}))
+    await r.run("voice_sessions.end_session", voice_sessions.end_session(1))
+
+    # --- jobs ---
+    jobs = db.jobs
+    await r.run("jobs.upsert_job", jobs.upsert_job("job", "every 60s"))
+    await r.run("jobs.get_all_jobs", jobs.get_all_jobs())
+    await r.run("jobs.record_run", jobs.record_run("job", now_iso, 0.1, 0.0, None))
+
+    # --- meta ---
+    meta = db.meta
+    await r.run("meta.set", meta.set("command_tree:1:1", "fingerprint"))
+    await r.run("meta.get", meta.get("command_tree:1:1"))
+
+    # --- cooldowns ---
+    cooldowns = db.cooldowns.repository
+    await r.run("cooldowns.save_cooldowns", cooldowns.save_cooldowns([("labor", 1, now_iso)], now_iso))
+    await r.run("cooldowns.get_active_cooldowns", cooldowns.get_active_cooldowns(now_iso))
+
+
+async def _collect_statements(db_path: str) -> SqlRecorder:
+    recorder = SqlRecorder()
+    db = await DatabaseManager.create(db_path=db_path)
+    try:
+        await _attach(db, recorder)
+        await _exercise_repositories(db, recorder)
+    finally:
+        await db.activity.close()
+        await db.cooldowns.close()
+        await db.close()
+    return recorder
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory) -> Tuple[SqlRecorder, str]:
+    db_path = str(tmp_path_factory.mktemp("query_plans") / "database.db")
+    return asyncio.run(_collect_statements(db_path)), db_path
+
+
+def _full_scans(connection: sqlite3.Connection, sql: str) -> List[str]:
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        # SEARCH는 인덱스로 범위를 좁힌 접근입니다. SCAN은 "USING [COVERING] INDEX"가 붙어도 인덱스 전체를 읽습니다.
+        if not detail.startswith("SCAN "):
+            continue
+        target = detail.split()[1]
+        if target in SMALL_TABLES or target == "CONSTANT":
+            continue
+        scans.append(detail)
+    return scans
+
+
+def test_every_repository_method_is_exercised(recorded):
+    recorder, _ = recorded
+    missing = []
+    for attr, repository_cls in REPOSITORIES.items():
+        for name, _ in inspect.getmembers(repository_cls, inspect.iscoroutinefunction):
+            if not name.startswith("_") and f"{attr}.{name}" not in recorder.called:
+                missing.append(f"{attr}.{name}")
+    assert not missing, f"쿼리 플랜 검사에 포함되지 않은 레포지토리 메서드: {missing}"
+
+
+def test_no_full_scans_on_large_tables(recorded):
+    recorder, db_path = recorded
+    violations = []
+    seen = set()
+    with sqlite3.connect(db_path) as connection:
+        for method, sql in recorder.statements:
+            if method in FULL_SCAN_ALLOWED or sql.lstrip().upper().startswith(SKIPPED_PREFIXES):
+                continue
+            if (method, sql) in seen:
+                continue
+            seen.add((method, sql))
+            for scan in _full_scans(connection, sql):
+                violations.append(f"{method}: {scan}\n    {sql}")
+    assert not violations, "인덱스 없이 전체 스캔하는 쿼리:\n" + "\n".join(violations)
@@ -1 +1,3 @@
-from .formatteres import money_to_string
\ No newline at end of file
+from .formatteres import money_to_string
+from .number_allocator import NumberAllocator
+from .expiry_queue import ExpiryQueue
@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class ExpiryQueue(Generic[K]):
+    """
+    키별 만료 시각을 보관하는 최소 힙 기반 스케줄러입니다.
+
+    같은 키를 다시 `push`하면 만료 시각이 갱신되고, 힙에 남은 이전 항목은 꺼낼 때 무시됩니다.
+    `wait_due`는 가장 이른 만료 시각까지만 잠들며, 그보다 이른 항목이 추가되면 즉시 깨어납니다.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime.datetime, int, K]] = []
+        self._deadlines: Dict[K, datetime.datetime] = {}
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def push(self, key: K, deadline: datetime.datetime) -> None:
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        self._changed.set()
+
+    def get(self, key: K) -> Optional[datetime.datetime]:
+        """키의 현재 만료 시각을 반환합니다. 없으면 None"""
+        return self._deadlines.get(key)
+
+    def discard(self, key: K) -> None:
+        self._deadlines.pop(key, None)
+
+    def peek(self) -> Optional[datetime.datetime]:
+        """가장 이른 만료 시각을 반환합니다. 무효화된 항목은 이 때 정리됩니다."""
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime.datetime) -> List[K]:
+        """`now` 시점까지 만료된 키를 모두 꺼냅니다."""
+        due = []
+        while (deadline := self.peek()) is not None and deadline <= now:
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
+
+    async def wait_due(self) -> List[K]:
+        """다음 만료 시각까지 기다렸다가 만료된 키 목록을 반환합니다."""
+        while True:
+            self._changed.clear()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            due = self.pop_due(now)
+            if due:
+                return due
+
+            deadline = self.peek()
+            timeout = (deadline - now).total_seconds() if deadline else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,59 @@
+import bisect
+import heapq
+from typing import Iterable, List, Optional
+
+
+class NumberAllocator:
+    """
+    1부터 시작하는 번호 중 비어 있는 가장 작은 번호를 O(log n)에 할당합니다.
+
+    반납된 번호는 최소 힙에, 사용 중인 번호는 정렬된 리스트에 보관하므로
+    새 번호가 기존 번호들 사이 어디에 들어가는지도 `bisect`로 바로 찾을 수 있습니다.
+    """
+
+    def __init__(self, used: Iterable[int] = ()):
+        self._used: List[int] = sorted({n for n in used if n > 0})
+        self._next = self._used[-1] + 1 if self._used else 1
+        used_set = set(self._used)
+        self._free: List[int] = [n for n in range(1, self._next) if n not in used_set]
+        heapq.heapify(self._free)
+
+    def __contains__(self, number: int) -> bool:
+        index = bisect.bisect_left(self._used, number)
+        return index < len(self._used) and self._used[index] == number
+
+    def __len__(self) -> int:
+        return len(self._used)
+
+    def allocate(self) -> int:
+        """비어 있는 가장 작은 번호를 할당합니다."""
+        while self._free:
+            number = heapq.heappop(self._free)
+            if number not in self:
+                break
+        else:
+            number = self._next
+            self._next += 1
+        bisect.insort(self._used, number)
+        return number
+
+    def release(self, number: int) -> None:
+        """번호를 반납합니다. 사용 중이 아닌 번호는 무시합니다."""
+        index = bisect.bisect_left(self._used, number)
+        if index == len(self._used) or self._used[index] != number:
+            return
+        del self._used[index]
+        if number == self._next - 1:
+            self._next -= 1
+        else:
+            heapq.heappush(self._free, number)
+
+    def predecessor(self, number: int) -> Optional[int]:
+        """`number`보다 작은 사용 중인 번호 중 가장 큰 번호를 반환합니다."""
+        index = bisect.bisect_left(self._used, number)
+        return self._used[index - 1] if index > 0 else None
+
+    def successor(self, number: int) -> Optional[int]:
+        """`number`보다 큰 사용 중인 번호 중 가장 작은 번호를 반환합니다."""
+        index = bisect.bisect_right(self._used, number)
+        return self._used[index] if index < len(self._used) else None